@@ -1,62 +1,100 @@
 import os
-from flask import Flask
+import weakref
+from flask import Flask, request
 from flask_cors import CORS
 from flask_jwt_extended import JWTManager
-from dotenv import load_dotenv
+from werkzeug.middleware.proxy_fix import ProxyFix
 
 from config import Config
 from models import db
 from flask_migrate import Migrate
+from services.token_blocklist import get_revocation_cache
+
+# Importing this module does no work: create_app() builds the app, wsgi.py calls it
+# for gunicorn, and the schema is created explicitly with `flask --app app init-db`.
+# (config.py already loads .env, including the JWT secret.)
+jwt = JWTManager()
+migrate = Migrate()
+
+# Apps built in this process, so their connection pools can be reset after a fork
+_apps = weakref.WeakSet()
+
+
+def create_app(config=Config):
+    # 1. Create app and load configuration
+    app = Flask(__name__)
+    app.config.from_object(config)
+    hops = app.config.get('PROXY_FIX_HOPS', 0)
+    if hops:
+        # Client address and scheme from the proxies' X-Forwarded-* headers (rate limits, redirects)
+        app.wsgi_app = ProxyFix(app.wsgi_app, x_for=hops, x_proto=hops)
+
+    # 2. Initialize Extensions
+    jwt.init_app(app)
+    db.init_app(app)
+    migrate.init_app(app, db)
+    CORS(app)
+
+    from services.query_counter import install_query_counter
+    from services.metrics import install_metrics
+    from services.serialization import install_json_provider
+    from services.compression import install_compression
+    from commands import register_commands
+    install_query_counter(app)
+    install_metrics(app)
+    install_json_provider(app)
+    # After install_metrics, so its hook runs first and metrics count the bytes sent
+    install_compression(app)
+    register_commands(app)
+
+    @app.route('/')
+    def home():
+        return {"message": "Job Portal API is Live!"}, 200
+
+    # 3. Import and Register Blueprints (imported here so `import app` stays cheap)
+    from routes.auth import auth_bp
+    from routes.jobs import jobs_bp
+    from routes.applications import apps_bp
+    from routes.seekers import seeker_bp
+
+    app.register_blueprint(auth_bp, url_prefix='/auth')
+    app.register_blueprint(jobs_bp, url_prefix='/jobs')
+    app.register_blueprint(apps_bp, url_prefix='/applications')
+    app.register_blueprint(seeker_bp, url_prefix='/seeker')
+
+    _apps.add(app)
+    return app
+
+
+@jwt.token_verification_loader
+def check_token_scope(jwt_header, jwt_payload):
+    # Scoped tokens (see POST /applications/events/token) only open their own endpoint
+    return jwt_payload.get("scope") is None or request.endpoint == "applications.application_events"
 
-# 1. Load env and create app
-load_dotenv()
-app = Flask(__name__)
-app.config.from_object(Config)
-
-# 2. Critical: Ensure the Secret Key is set in config
-app.config["JWT_SECRET_KEY"] = os.getenv("JWT_SECRET_KEY")
-
-# 3. Initialize Extensions
-jwt = JWTManager(app) 
-db.init_app(app)
-migrate = Migrate(app, db)
-CORS(app)
-
-@app.route('/')
-def home():
-    return {"message": "Job Portal API is Live!"}, 200
-
-# --- ADD THIS HERE FOR RENDER FREE TIER ---
-with app.app_context():
-    try:
-        db.create_all()
-        print("✅ Database tables synced!")
-    except Exception as e:
-        print(f"⚠️ Could not create tables: {e}")
-# ------------------------------------------
-
-# 4. Import and Register Blueprints
-from routes.auth import auth_bp
-from routes.jobs import jobs_bp
-from routes.applications import apps_bp
-from routes.seekers import seeker_bp
-
-app.register_blueprint(auth_bp, url_prefix='/auth')
-app.register_blueprint(jobs_bp, url_prefix='/jobs')
-app.register_blueprint(apps_bp, url_prefix='/applications')
-app.register_blueprint(seeker_bp, url_prefix='/seeker')
-
-from models import TokenBlocklist
 
 @jwt.token_in_blocklist_loader
 def check_if_token_revoked(jwt_header, jwt_payload):
+    # Served from the in-process revocation cache; the database is only asked on a miss
     jti = jwt_payload["jti"]
-    token = TokenBlocklist.query.filter_by(jti=jti).first()
-    return token is not None
+    return get_revocation_cache().is_revoked(jti, jwt_payload.get("exp"))
+
+
+def _dispose_engines_after_fork():
+    # With `gunicorn --preload` the master may have opened pooled connections; a forked
+    # worker must not reuse its parent's sockets. close=False leaves them open for the
+    # parent and gives the child an empty pool of its own.
+    for app in list(_apps):
+        with app.app_context():
+            for engine in db.engines.values():
+                engine.dispose(close=False)
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_dispose_engines_after_fork)
 
 if __name__ == "__main__":
     # This block only runs during LOCAL development
-    app.run(debug=True)
+    create_app().run(debug=True)
 
 # import os
 # from flask import Flask
@@ -0,0 +1,117 @@
+"""Autocomplete prefix index: build time, memory and suggestion latency on synthetic postings.
+
+Builds services.autocomplete.PrefixIndex in memory (no database) from the distinct
+titles and locations of --jobs synthetic postings with their counts (what the
+GROUP BY at startup returns), then times suggest() for prefixes of 1-8 characters
+taken from real values, and add() for new postings.
+
+    python benchmarks/autocomplete.py --jobs 1000000
+"""
+import argparse
+import itertools
+import random
+import statistics
+import string
+import time
+import tracemalloc
+from collections import Counter
+
+import common  # noqa: F401  (puts the project on sys.path)
+from services.autocomplete import PrefixIndex
+
+LEVELS = ["", "Junior", "Senior", "Staff", "Lead", "Principal", "Associate", "Head of", "Intern", "Trainee"]
+ROLES = ["Engineer", "Developer", "Nurse", "Driver", "Analyst", "Designer", "Manager", "Accountant",
+         "Teacher", "Technician", "Consultant", "Scientist", "Cashier", "Chef", "Electrician", "Architect",
+         "Administrator", "Specialist", "Coordinator", "Recruiter"]
+
+
+def synthetic_postings(count, seed):
+    rng = random.Random(seed)
+    word = lambda: "".join(rng.choices(string.ascii_lowercase, k=rng.randint(4, 9))).capitalize()  # noqa: E731
+    skills = [word() for _ in range(400)]
+    teams = [word() for _ in range(3000)]
+    cities = [word() for _ in range(20000)]
+    regions = [word() for _ in range(200)]
+    # Zipf-like: a few common values and a long tail, like real postings
+    skill_weights = list(itertools.accumulate(1 / (rank + 1) for rank in range(len(skills))))
+    team_weights = list(itertools.accumulate(1 / (rank + 1) for rank in range(len(teams))))
+    city_weights = list(itertools.accumulate(1 / (rank + 1) for rank in range(len(cities))))
+    for _ in range(count):
+        title = " ".join(filter(None, (rng.choice(LEVELS), rng.choices(skills, cum_weights=skill_weights)[0],
+                                       rng.choice(ROLES))))
+        if rng.random() < 0.3:
+            title += f" - {rng.choices(teams, cum_weights=team_weights)[0]}"
+        city = rng.choices(cities, cum_weights=city_weights)[0]
+        location = "Remote" if rng.random() < 0.1 else f"{city}, {regions[hash(city) % len(regions)]}"
+        yield title, location
+
+
+def percentile(timings, fraction):
+    return timings[min(len(timings) - 1, int(len(timings) * fraction))]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--jobs", type=int, default=1000000)
+    parser.add_argument("--queries", type=int, default=20000)
+    parser.add_argument("--adds", type=int, default=2000)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    titles, locations = Counter(), Counter()
+    for title, location in synthetic_postings(args.jobs, args.seed):
+        titles[title] += 1
+        locations[location] += 1
+
+    for field, counts in (("title", titles), ("location", locations)):
+        started = time.perf_counter()
+        index = PrefixIndex()
+        index.build(counts.items())
+        elapsed = time.perf_counter() - started
+        # Memory from a second build, so tracing does not slow down the timed one
+        tracemalloc.start()
+        traced = PrefixIndex()
+        traced.build(counts.items())
+        retained, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        del traced
+        print(f"{field}: {len(index.keys)} distinct values, {len(index.entries)} entries, built in {elapsed:.2f}s, "
+              f"{retained / 2 ** 20:.1f} MB retained (peak {peak / 2 ** 20:.1f} MB), "
+              f"{len(index.top)} wide prefixes ranked in advance")
+
+        rng = random.Random(args.seed + 1)
+        sample = rng.choices(index.keys, k=args.queries)
+        prefixes = []
+        for key in sample:
+            words = key.split()
+            word = " ".join(words[rng.randrange(len(words)):])
+            prefixes.append(word[:rng.randint(1, 8)])
+
+        for label in ("cold", "warm"):
+            timings = []
+            for prefix in prefixes:
+                started = time.perf_counter()
+                index.suggest(prefix, 10)
+                timings.append((time.perf_counter() - started) * 1000)
+            timings.sort()
+            print(f"  suggest ({label}): p50 {statistics.median(timings):.3f} ms, p99 {percentile(timings, 0.99):.3f} ms, "
+                  f"max {timings[-1]:.3f} ms, {len(index.top)} cached prefixes")
+
+        new_value = lambda i: rng.choice(index.keys) if i % 2 else f"{rng.choice(LEVELS)} New Role {i}"  # noqa: E731
+        timings = []
+        for i in range(args.adds):
+            value = new_value(i)
+            started = time.perf_counter()
+            index.add(value)
+            timings.append((time.perf_counter() - started) * 1000)
+        timings.sort()
+        print(f"  add one posting (half new values): p50 {statistics.median(timings):.3f} ms, "
+              f"p99 {percentile(timings, 0.99):.3f} ms")
+        batch = [(new_value(i), 1) for i in range(args.adds, args.adds + 10000)]
+        started = time.perf_counter()
+        index.add_many(batch)
+        print(f"  add_many 10000 postings (bulk import sync): {(time.perf_counter() - started) * 1000:.0f} ms")
+
+
+if __name__ == "__main__":
+    main()
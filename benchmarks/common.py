@@ -0,0 +1,33 @@
+import os
+import sys
+
+# Shared setup for the benchmark scripts: everything lives under benchmarks/.data
+# unless --database-url / --upload-folder point somewhere else (e.g. a local MySQL).
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+DATA_DIR = os.path.join(BENCH_DIR, ".data")
+DEFAULT_DATABASE_URL = f"sqlite:///{os.path.join(DATA_DIR, 'bench.db')}"
+DEFAULT_UPLOAD_FOLDER = os.path.join(DATA_DIR, "resumes")
+DEFAULT_SECRET = "benchmark-secret-key-of-sufficient-length"
+BENCH_PASSWORD = "benchmark"
+
+sys.path.insert(0, os.path.dirname(BENCH_DIR))
+
+
+def add_common_arguments(parser):
+    parser.add_argument("--database-url", default=os.environ.get("BENCH_DATABASE_URL", DEFAULT_DATABASE_URL))
+    parser.add_argument("--upload-folder", default=DEFAULT_UPLOAD_FOLDER)
+
+
+def load_app(args, **overrides):
+    # Environment first: config.py reads it at import time
+    os.makedirs(DATA_DIR, exist_ok=True)
+    os.environ["DATABASE_URL"] = args.database_url
+    os.environ.setdefault("JWT_SECRET_KEY", DEFAULT_SECRET)
+    os.environ.setdefault("GENERATION_DIR", os.path.join(DATA_DIR, "generations"))
+    os.environ.setdefault("METRICS_DIR", os.path.join(DATA_DIR, "metrics"))
+
+    from app import create_app
+    from config import Config
+    # Absolute, so the generator and a separately started server agree on file paths
+    overrides["UPLOAD_FOLDER"] = os.path.abspath(args.upload_folder)
+    return create_app(type("BenchmarkConfig", (Config,), overrides))
@@ -0,0 +1,163 @@
+"""Populate a database with a reproducible synthetic dataset.
+
+The same --seed always produces the same users, jobs and applications, so runs on
+different branches are comparable. Rows are written with multi-row INSERTs in chunks.
+
+    python benchmarks/generate.py --reset --jobs 1000000 --applications 10000000
+    python benchmarks/generate.py --database-url mysql+pymysql://user:pw@localhost/bench --reset
+"""
+import argparse
+import io
+import random
+import time
+from datetime import datetime, timedelta
+
+from common import BENCH_PASSWORD, add_common_arguments, load_app
+
+TITLE_WORDS = ["Software", "Backend", "Frontend", "Data", "Senior", "Junior", "Staff", "Cloud",
+               "Mobile", "Security", "Platform", "Machine Learning", "QA", "DevOps", "Product"]
+ROLES = ["Engineer", "Developer", "Analyst", "Scientist", "Manager", "Designer", "Architect", "Intern"]
+SKILLS = ["python", "flask", "django", "sql", "mysql", "postgres", "react", "vue", "aws", "docker",
+          "kubernetes", "java", "spring", "go", "rust", "typescript", "pandas", "spark", "linux", "redis"]
+LOCATIONS = ["Remote", "Bangalore", "Hyderabad", "Pune", "Chennai", "Mumbai", "Delhi", "London",
+             "Berlin", "New York", "San Francisco", "Toronto", "Singapore", "Sydney"]
+STATUSES = ["pending"] * 7 + ["rejected"] * 2 + ["accepted"]
+
+
+def chunked_insert(db, table, rows, chunk_size):
+    # rows is a generator; never materialize more than one chunk
+    total = 0
+    chunk = []
+    for row in rows:
+        chunk.append(row)
+        if len(chunk) >= chunk_size:
+            db.session.execute(table.insert(), chunk)
+            db.session.commit()
+            total += len(chunk)
+            chunk = []
+    if chunk:
+        db.session.execute(table.insert(), chunk)
+        db.session.commit()
+        total += len(chunk)
+    return total
+
+
+def user_rows(args, password_hash):
+    for i in range(1, args.employers + 1):
+        yield {"id": i, "email": f"employer{i}@bench.test", "password": password_hash, "role": "employer"}
+    for i in range(1, args.seekers + 1):
+        yield {"id": args.employers + i, "email": f"seeker{i}@bench.test", "password": password_hash,
+               "role": "seeker"}
+
+
+def job_rows(args, rng):
+    for job_id in range(1, args.jobs + 1):
+        title = f"{rng.choice(TITLE_WORDS)} {rng.choice(ROLES)}"
+        skills = ", ".join(rng.sample(SKILLS, 4))
+        yield {
+            "id": job_id,
+            "title": title,
+            "description": f"We are hiring a {title.lower()} with experience in {skills}.",
+            "location": rng.choice(LOCATIONS),
+            "employer_id": rng.randint(1, args.employers),
+        }
+
+
+def application_rows(args, rng):
+    # Every seeker applies to a similar number of distinct jobs, so (user, job) pairs
+    # are unique without holding a set of 10M pairs in memory
+    per_seeker, extra = divmod(args.applications, args.seekers)
+    now = datetime.utcnow()
+    app_id = 0
+    for i in range(1, args.seekers + 1):
+        count = min(per_seeker + (1 if i <= extra else 0), args.jobs)
+        for job_id in rng.sample(range(1, args.jobs + 1), count):
+            app_id += 1
+            yield {
+                "id": app_id,
+                "user_id": args.employers + i,
+                "job_id": job_id,
+                "status": rng.choice(STATUSES),
+                "applied_on": now - timedelta(seconds=rng.randint(0, 90 * 24 * 3600)),
+            }
+
+
+def resume_pdf(rng, seeker_number):
+    # Minimal uncompressed PDF the text extractor can read; unique per seeker
+    words = " ".join(rng.sample(SKILLS, 8) + [f"seeker{seeker_number}"])
+    return (b"%PDF-1.4\n1 0 obj\n<< /Length 0 >>\nstream\nBT /F1 12 Tf ("
+            + words.encode() + b") Tj ET\nendstream\nendobj\n%%EOF\n")
+
+
+def add_resumes(args, rng, db):
+    from models import User
+    from services.resume_text import extract_pending, register_resume
+    from services.storage import store_resume
+
+    for i in range(1, args.resumes + 1):
+        path, sha256 = store_resume(io.BytesIO(resume_pdf(rng, i)), "pdf")
+        register_resume(sha256)
+        db.session.query(User).filter(User.id == args.employers + i).update({"resume_path": path})
+        db.session.commit()
+    extracted = 0
+    while extracted < args.resumes:
+        done = extract_pending(1000)
+        if not done:
+            break
+        extracted += done
+    return extracted
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    add_common_arguments(parser)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--employers", type=int, default=200)
+    parser.add_argument("--seekers", type=int, default=5000)
+    parser.add_argument("--jobs", type=int, default=20000)
+    parser.add_argument("--applications", type=int, default=100000)
+    parser.add_argument("--resumes", type=int, default=500, help="seekers that get an uploaded resume")
+    parser.add_argument("--chunk-size", type=int, default=5000)
+    parser.add_argument("--reset", action="store_true", help="drop and recreate all tables first")
+    args = parser.parse_args()
+    args.resumes = min(args.resumes, args.seekers)
+
+    app = load_app(args)
+    from sqlalchemy import text
+    from werkzeug.security import generate_password_hash
+    from models import db, Application, Job, User
+    from services import app_counters
+
+    rng = random.Random(args.seed)
+    with app.app_context():
+        if args.reset:
+            db.drop_all()
+        db.create_all()
+        if not args.reset and db.session.query(User.id).first() is not None:
+            parser.error("database is not empty, pass --reset to replace its contents")
+
+        if db.engine.dialect.name == "sqlite":
+            # Bulk load only: durability does not matter for a throwaway dataset
+            db.session.execute(text("PRAGMA synchronous=OFF"))
+            db.session.execute(text("PRAGMA journal_mode=WAL"))
+
+        # One hash shared by every user: generating millions of pbkdf2 hashes would
+        # take longer than the rest of the load
+        password_hash = generate_password_hash(BENCH_PASSWORD, app.config["PASSWORD_HASH_METHOD"])
+
+        steps = [
+            ("users", lambda: chunked_insert(db, User.__table__, user_rows(args, password_hash), args.chunk_size)),
+            ("jobs", lambda: chunked_insert(db, Job.__table__, job_rows(args, rng), args.chunk_size)),
+            ("applications", lambda: chunked_insert(db, Application.__table__, application_rows(args, rng),
+                                                    args.chunk_size)),
+            ("counters", app_counters.rebuild),
+            ("resumes", lambda: add_resumes(args, rng, db)),
+        ]
+        for name, step in steps:
+            started = time.perf_counter()
+            rows = step()
+            print(f"{name:<14}{rows:>12,} rows {time.perf_counter() - started:>8.1f}s")
+
+
+if __name__ == "__main__":
+    main()
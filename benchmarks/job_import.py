@@ -0,0 +1,63 @@
+"""Bulk job import throughput (POST /jobs/import), in rows per second.
+
+Posts a generated CSV or NDJSON file through the test client twice: the first run
+inserts every row, the second is an idempotent re-import that skips them all.
+
+    python benchmarks/job_import.py --rows 100000 --format csv --batch-size 500
+"""
+import argparse
+import json
+import time
+import uuid
+
+from common import add_common_arguments, load_app
+
+
+def generate(rows, fmt, prefix):
+    description = "We are hiring. " * 40
+    if fmt == "csv":
+        lines = ["external_key,title,description,location"]
+        lines += [f"{prefix}-{i},Imported job {i},{description},Berlin" for i in range(rows)]
+    else:
+        lines = [json.dumps({"external_key": f"{prefix}-{i}", "title": f"Imported job {i}",
+                             "description": description, "location": "Berlin"}) for i in range(rows)]
+    return ("\n".join(lines) + "\n").encode()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    add_common_arguments(parser)
+    parser.add_argument("--rows", type=int, default=20000)
+    parser.add_argument("--format", choices=("csv", "ndjson"), default="csv")
+    parser.add_argument("--batch-size", type=int, default=500)
+    args = parser.parse_args()
+
+    app = load_app(args, JOB_IMPORT_BATCH_SIZE=args.batch_size, RATE_LIMIT_ENABLED=False)
+    from flask_jwt_extended import create_access_token
+    from models import db, User
+
+    with app.app_context():
+        db.create_all()
+        employer = User.query.filter_by(email="importer@example.com").first()
+        if employer is None:
+            employer = User(email="importer@example.com", password="x", role="employer")
+            db.session.add(employer)
+            db.session.commit()
+        token = create_access_token(identity=str(employer.id), additional_claims={"role": "employer"})
+
+    body = generate(args.rows, args.format, uuid.uuid4().hex[:8])
+    content_type = "text/csv" if args.format == "csv" else "application/x-ndjson"
+    client = app.test_client()
+    print(f"{args.rows} rows, {len(body) / 2 ** 20:.1f} MB {args.format}, batch size {args.batch_size}")
+    for label in ("import", "re-import"):
+        started = time.perf_counter()
+        response = client.post("/jobs/import", data=body, content_type=content_type,
+                               headers={"Authorization": f"Bearer {token}"})
+        elapsed = time.perf_counter() - started
+        report = response.get_json()
+        print(f"{label:<10} created {report['created']:>8} skipped {report['skipped']:>8} "
+              f"failed {report['failed']:>5}  {args.rows / elapsed:>9.0f} rows/s end to end")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+"""Login throughput under a mixed workload.
+
+Runs login threads alongside /jobs/search threads against one in-process app and
+reports login throughput, shed (503) logins and search latency, once with password
+hashing inline and once on the hashing process pool.
+
+    python benchmarks/login_throughput.py --seconds 10 --login-threads 8 --search-threads 4
+"""
+import argparse
+import os
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def percentile(values, pct):
+    if not values:
+        return 0.0
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * pct / 100))]
+
+
+def run(app, pool_workers, args):
+    from services.passwords import PasswordHasher
+
+    app.extensions["password_hasher"] = PasswordHasher(
+        app.config["PASSWORD_HASH_METHOD"], pool_workers, args.max_queue
+    )
+    stop = time.monotonic() + args.seconds
+    logins, shed, search_latencies = [], [], []
+    lock = threading.Lock()
+
+    def login_loop():
+        client = app.test_client()
+        while time.monotonic() < stop:
+            r = client.post("/auth/login", json={"email": "bench@example.com", "password": "secret"})
+            with lock:
+                (logins if r.status_code == 200 else shed).append(1)
+
+    def search_loop():
+        client = app.test_client()
+        while time.monotonic() < stop:
+            start = time.perf_counter()
+            client.get("/jobs/search?q=engineer")
+            with lock:
+                search_latencies.append((time.perf_counter() - start) * 1000)
+
+    threads = [threading.Thread(target=login_loop) for _ in range(args.login_threads)]
+    threads += [threading.Thread(target=search_loop) for _ in range(args.search_threads)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    return {
+        "logins_per_s": len(logins) / args.seconds,
+        "shed_503": len(shed),
+        "search_per_s": len(search_latencies) / args.seconds,
+        "search_p50_ms": percentile(search_latencies, 50),
+        "search_p99_ms": percentile(search_latencies, 99),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--seconds", type=float, default=10)
+    parser.add_argument("--login-threads", type=int, default=8)
+    parser.add_argument("--search-threads", type=int, default=4)
+    parser.add_argument("--pool-workers", type=int, default=2)
+    parser.add_argument("--max-queue", type=int, default=16)
+    parser.add_argument("--method", default="pbkdf2:sha256:600000")
+    args = parser.parse_args()
+
+    db_path = os.path.join(tempfile.mkdtemp(), "bench.db")
+    os.environ.update({
+        "DATABASE_URL": f"sqlite:///{db_path}",
+        "JWT_SECRET_KEY": os.environ.get("JWT_SECRET_KEY", "benchmark-secret-key-of-sufficient-length"),
+        "PASSWORD_HASH_METHOD": args.method,
+        "RESPONSE_CACHE_ENABLED": "false",
+        "RATE_LIMIT_ENABLED": "false",
+    })
+    from app import create_app
+    from models import db, Job, User
+    from werkzeug.security import generate_password_hash
+
+    app = create_app()
+    with app.app_context():
+        db.create_all()
+        employer = User(email="employer@example.com", password="x", role="employer")
+        db.session.add(employer)
+        db.session.add(User(email="bench@example.com",
+                            password=generate_password_hash("secret", args.method), role="seeker"))
+        db.session.flush()
+        db.session.add_all(Job(title=f"Software engineer {i}", description="Build things", location="Remote",
+                               employer_id=employer.id) for i in range(200))
+        db.session.commit()
+
+    print(f"{'mode':<12}{'logins/s':>10}{'503s':>8}{'search/s':>10}{'p50 ms':>9}{'p99 ms':>9}")
+    for label, workers in (("inline", 0), (f"pool x{args.pool_workers}", args.pool_workers)):
+        result = run(app, workers, args)
+        print(f"{label:<12}{result['logins_per_s']:>10.1f}{result['shed_503']:>8}{result['search_per_s']:>10.1f}"
+              f"{result['search_p50_ms']:>9.2f}{result['search_p99_ms']:>9.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+"""Recommendation latency and memory of the TF-IDF index, on synthetic postings.
+
+Builds services.recommend.TfidfIndex in memory (no database) and times
+recommend() for random seeker profiles. The target is p99 under 50 ms for 500k
+postings on one core.
+
+    python benchmarks/recommend.py --jobs 500000 --queries 200
+"""
+import argparse
+import itertools
+import random
+import statistics
+import time
+
+import common  # noqa: F401  (puts the project on sys.path)
+from services.recommend import TfidfIndex
+
+ROLES = ["engineer", "developer", "nurse", "driver", "analyst", "designer", "manager", "accountant",
+         "teacher", "technician", "consultant", "scientist", "cashier", "chef", "electrician"]
+
+
+def synthetic_jobs(count, vocabulary, seed):
+    rng = random.Random(seed)
+    words = [f"w{i}" for i in range(vocabulary)]
+    # Zipf-like: a few common words and a long tail, like real postings
+    cum_weights = list(itertools.accumulate(1 / (rank + 1) for rank in range(vocabulary)))
+    for job_id in range(1, count + 1):
+        title = f"{rng.choice(ROLES)} {' '.join(rng.choices(words[:2000], k=2))}"
+        description = " ".join(rng.choices(words, cum_weights=cum_weights, k=60))
+        yield job_id, title, description
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--jobs", type=int, default=500000)
+    parser.add_argument("--vocabulary", type=int, default=50000)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--history", type=int, default=10, help="applications per synthetic seeker")
+    parser.add_argument("--max-terms", type=int, default=24)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    index = TfidfIndex(max_jobs=args.jobs, max_terms=args.max_terms)
+    started = time.perf_counter()
+    index.build(synthetic_jobs(args.jobs, args.vocabulary, args.seed))
+    print(f"built {len(index.job_ids)} jobs, {len(index.vocab)} terms in {time.perf_counter() - started:.1f}s")
+    print(f"matrix {index.memory_bytes() / 2 ** 20:.1f} MB ({len(index.post_rows)} postings)")
+
+    rng = random.Random(args.seed + 1)
+    documents = {job_id: (title, description)
+                 for job_id, title, description in synthetic_jobs(min(args.jobs, 20000), args.vocabulary, args.seed)}
+    timings = []
+    for _ in range(args.queries):
+        applied = rng.sample(sorted(documents), args.history)
+        started = time.perf_counter()
+        profile = index.profile(documents[job_id] for job_id in applied)
+        index.recommend(profile, applied, 10)
+        timings.append((time.perf_counter() - started) * 1000)
+
+    timings.sort()
+    p99 = timings[min(len(timings) - 1, int(len(timings) * 0.99))]
+    print(f"recommend: p50 {statistics.median(timings):.2f} ms, p99 {p99:.2f} ms, max {timings[-1]:.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,345 @@
+"""Replay a realistic request mix and report latency, throughput and SQL per request.
+
+Runs in-process through the Flask test client by default, or against a running
+server with --url (e.g. gunicorn started on the same database). Results can be saved
+as a baseline and later runs compared against it; a regression exits with status 1.
+
+    python benchmarks/generate.py --reset
+    python benchmarks/run.py --requests 5000 --save-baseline benchmarks/baseline.json
+    python benchmarks/run.py --requests 5000 --baseline benchmarks/baseline.json
+    gunicorn -w 4 wsgi:app & python benchmarks/run.py --url http://127.0.0.1:8000 --server-pid $!
+"""
+import argparse
+import http.client
+import json
+import random
+import resource
+import threading
+import time
+from urllib.parse import urlsplit
+
+from common import BENCH_PASSWORD, add_common_arguments, load_app
+
+# (name, weight); weights are relative
+MIX = [
+    ("search_title", 25), ("search_text", 10), ("list_jobs", 8), ("employer_dashboard", 8),
+    ("job_applicants", 6), ("applicant_search", 2), ("my_applications", 8), ("apply", 8),
+    ("update_status", 6), ("batch_status", 1), ("download_resume", 4), ("my_resume", 2),
+    ("create_job", 2), ("login", 1), ("refresh", 1),
+]
+SEARCH_WORDS = ["engineer", "developer", "data", "senior", "python", "cloud", "analyst", "backend"]
+LOCATIONS = ["Remote", "Bangalore", "London", "Berlin", "Pune"]
+MIN_SAMPLES = 50  # per scenario, before it is compared against the baseline
+
+
+def percentile(values, pct):
+    if not values:
+        return 0.0
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * pct / 100))]
+
+
+# --- 1. CLIENTS ---
+
+class InProcessClient:
+    # Flask test client (one per thread); SQL statements are counted directly around
+    # each request
+    def __init__(self, app):
+        from services.query_counter import count_queries
+        self.app = app
+        self.local = threading.local()
+        self.count_queries = count_queries
+
+    def request(self, method, path, headers=None, body=None):
+        client = getattr(self.local, "client", None)
+        if client is None:
+            client = self.local.client = self.app.test_client()
+        with self.count_queries() as statements:
+            response = client.open(path, method=method, headers=headers, json=body)
+            response.get_data()
+        return response.status_code, len(statements)
+
+
+class HttpClient:
+    # One keep-alive connection per thread. SQL counts come from the X-SQL-Queries
+    # header, which the server only sends in debug/testing mode.
+    def __init__(self, url):
+        parts = urlsplit(url)
+        self.host, self.port = parts.hostname, parts.port or 80
+        self.local = threading.local()
+
+    def request(self, method, path, headers=None, body=None):
+        connection = getattr(self.local, "connection", None)
+        if connection is None:
+            connection = self.local.connection = http.client.HTTPConnection(self.host, self.port, timeout=30)
+        headers = dict(headers or {})
+        payload = None
+        if body is not None:
+            payload = json.dumps(body)
+            headers["Content-Type"] = "application/json"
+        try:
+            connection.request(method, path, body=payload, headers=headers)
+            response = connection.getresponse()
+            response.read()
+        except (http.client.HTTPException, OSError):
+            self.local.connection = None
+            raise
+        statements = response.getheader("X-SQL-Queries")
+        return response.status, int(statements) if statements is not None else None
+
+
+# --- 2. WORKLOAD (ids come straight from the database, tokens are minted locally) ---
+
+class Workload:
+    def __init__(self, app, seed, sample_size=200):
+        from flask_jwt_extended import create_access_token, create_refresh_token
+        from models import db, Application, Job, User
+
+        self.rng = random.Random(seed)
+        self.lock = threading.Lock()
+        with app.app_context():
+            employers = [row.id for row in db.session.query(User.id).filter(User.role == 'employer')
+                         .order_by(User.id).limit(sample_size)]
+            seekers = db.session.query(User.id, User.email, User.resume_path).filter(User.role == 'seeker') \
+                .order_by(User.id).limit(sample_size).all()
+            if not employers or not seekers:
+                raise SystemExit("No benchmark data, run benchmarks/generate.py first")
+
+            self.jobs_by_employer = {}
+            for job_id, employer_id in db.session.query(Job.id, Job.employer_id) \
+                    .filter(Job.employer_id.in_(employers)):
+                self.jobs_by_employer.setdefault(employer_id, []).append(job_id)
+            self.applications_by_employer = {}
+            self.applicants_by_employer = {}
+            rows = db.session.query(Application.id, Application.user_id, Job.employer_id, User.resume_path) \
+                .join(Job, Application.job_id == Job.id) \
+                .join(User, Application.user_id == User.id) \
+                .filter(Job.employer_id.in_(employers)) \
+                .limit(sample_size * 50)
+            for app_id, user_id, employer_id, resume_path in rows:
+                self.applications_by_employer.setdefault(employer_id, []).append(app_id)
+                if resume_path:
+                    self.applicants_by_employer.setdefault(employer_id, []).append(user_id)
+            self.max_job_id = db.session.query(db.func.max(Job.id)).scalar() or 1
+
+            self.employers = [e for e in employers if e in self.jobs_by_employer]
+            self.seekers = [row.id for row in seekers]
+            self.seekers_with_resume = [row.id for row in seekers if row.resume_path]
+            self.seeker_emails = [row.email for row in seekers]
+            self.tokens = {}
+            self.refresh_tokens = {}
+            for user_id in self.employers:
+                self.tokens[user_id] = create_access_token(identity=str(user_id), additional_claims={"role": "employer"},
+                                                           expires_delta=False)
+            for user_id in self.seekers:
+                self.tokens[user_id] = create_access_token(identity=str(user_id), additional_claims={"role": "seeker"},
+                                                           expires_delta=False)
+                self.refresh_tokens[user_id] = create_refresh_token(identity=str(user_id), expires_delta=False)
+
+        names, weights = zip(*MIX)
+        self.names, self.weights = names, weights
+
+    def auth(self, user_id, refresh=False):
+        token = self.refresh_tokens[user_id] if refresh else self.tokens[user_id]
+        return {"Authorization": f"Bearer {token}"}
+
+    def next_request(self):
+        # Returns (scenario, method, path, headers, body)
+        with self.lock:
+            rng = self.rng
+            name = rng.choices(self.names, self.weights)[0]
+            employer = rng.choice(self.employers)
+            seeker = rng.choice(self.seekers)
+            word = rng.choice(SEARCH_WORDS)
+
+            if name == "search_title":
+                return name, "GET", f"/jobs/search?title={word}&page={rng.randint(1, 3)}", None, None
+            if name == "search_text":
+                query = f"{word}+{rng.choice(LOCATIONS).lower()}"
+                return name, "GET", f"/jobs/search?q={query}", None, None
+            if name == "list_jobs":
+                return name, "GET", f"/jobs/?page={rng.randint(1, 20)}", None, None
+            if name == "employer_dashboard":
+                return name, "GET", "/jobs/employer-dashboard", self.auth(employer), None
+            if name == "job_applicants":
+                job_id = rng.choice(self.jobs_by_employer[employer])
+                return name, "GET", f"/applications/job/{job_id}/applicants", self.auth(employer), None
+            if name == "applicant_search":
+                job_id = rng.choice(self.jobs_by_employer[employer])
+                return name, "GET", f"/applications/job/{job_id}/applicants/search?q={word}", \
+                    self.auth(employer), None
+            if name == "my_applications":
+                return name, "GET", "/applications/my-applications", self.auth(seeker), None
+            if name == "apply":
+                job_id = rng.randint(1, self.max_job_id)
+                return name, "POST", f"/applications/apply/{job_id}", self.auth(seeker), None
+            if name in ("update_status", "batch_status") and self.applications_by_employer.get(employer):
+                app_ids = self.applications_by_employer[employer]
+                status = rng.choice(["pending", "accepted", "rejected"])
+                if name == "update_status":
+                    return name, "PUT", f"/applications/update-status/{rng.choice(app_ids)}", \
+                        self.auth(employer), {"status": status}
+                updates = [{"app_id": app_id, "status": status} for app_id in rng.sample(app_ids, min(20, len(app_ids)))]
+                return name, "PUT", "/applications/update-status/batch", self.auth(employer), {"updates": updates}
+            if name == "download_resume" and self.applicants_by_employer.get(employer):
+                user_id = rng.choice(self.applicants_by_employer[employer])
+                return name, "GET", f"/applications/download-resume/{user_id}", self.auth(employer), None
+            if name == "my_resume" and self.seekers_with_resume:
+                return name, "GET", "/seeker/download-my-resume", \
+                    self.auth(rng.choice(self.seekers_with_resume)), None
+            if name == "create_job":
+                body = {"title": f"Benchmark {word} role", "description": f"Work with {word}", "location": "Remote"}
+                return name, "POST", "/jobs/", self.auth(employer), body
+            if name == "login":
+                body = {"email": rng.choice(self.seeker_emails), "password": BENCH_PASSWORD}
+                return name, "POST", "/auth/login", None, body
+            if name == "refresh":
+                return name, "POST", "/auth/refresh", self.auth(seeker, refresh=True), None
+            # Scenario not possible with this dataset (e.g. no resumes): fall back to search
+            return "search_title", "GET", f"/jobs/search?title={word}", None, None
+
+
+# --- 3. DRIVER ---
+
+def run(client, workload, total_requests, threads):
+    samples = {}
+    errors = {}
+    lock = threading.Lock()
+    remaining = [total_requests]
+
+    def worker():
+        while True:
+            with lock:
+                if remaining[0] <= 0:
+                    return
+                remaining[0] -= 1
+            name, method, path, headers, body = workload.next_request()
+            started = time.perf_counter()
+            try:
+                status, statements = client.request(method, path, headers, body)
+            except Exception:
+                status, statements = 599, None
+            elapsed = (time.perf_counter() - started) * 1000
+            with lock:
+                samples.setdefault(name, []).append((elapsed, statements))
+                if status >= 500:
+                    errors[name] = errors.get(name, 0) + 1
+
+    started = time.perf_counter()
+    pool = [threading.Thread(target=worker) for _ in range(threads)]
+    for thread in pool:
+        thread.start()
+    for thread in pool:
+        thread.join()
+    duration = time.perf_counter() - started
+
+    scenarios = {}
+    for name, rows in sorted(samples.items()):
+        latencies = [elapsed for elapsed, _ in rows]
+        counted = [statements for _, statements in rows if statements is not None]
+        scenarios[name] = {
+            "requests": len(rows),
+            "errors": errors.get(name, 0),
+            "p50_ms": round(percentile(latencies, 50), 3),
+            "p95_ms": round(percentile(latencies, 95), 3),
+            "p99_ms": round(percentile(latencies, 99), 3),
+            "sql_per_request": round(sum(counted) / len(counted), 2) if counted else None,
+        }
+    all_latencies = [elapsed for rows in samples.values() for elapsed, _ in rows]
+    return {
+        "requests": len(all_latencies),
+        "duration_s": round(duration, 3),
+        "throughput_rps": round(len(all_latencies) / duration, 1) if duration else 0,
+        "p50_ms": round(percentile(all_latencies, 50), 3),
+        "p95_ms": round(percentile(all_latencies, 95), 3),
+        "p99_ms": round(percentile(all_latencies, 99), 3),
+        "scenarios": scenarios,
+    }
+
+
+def peak_rss_mb(server_pid=None):
+    if server_pid:
+        # Peak resident set of the server process (VmHWM), not of this driver
+        with open(f"/proc/{server_pid}/status") as f:
+            for line in f:
+                if line.startswith("VmHWM:"):
+                    return round(int(line.split()[1]) / 1024, 1)
+    return round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1)
+
+
+def print_report(result):
+    print(f"{'scenario':<20}{'reqs':>7}{'errs':>6}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}{'sql/req':>9}")
+    for name, row in result["scenarios"].items():
+        sql = "-" if row["sql_per_request"] is None else f"{row['sql_per_request']:.1f}"
+        print(f"{name:<20}{row['requests']:>7}{row['errors']:>6}{row['p50_ms']:>9.2f}{row['p95_ms']:>9.2f}"
+              f"{row['p99_ms']:>9.2f}{sql:>9}")
+    print(f"\n{result['requests']} requests in {result['duration_s']}s: {result['throughput_rps']} req/s, "
+          f"p50 {result['p50_ms']:.2f} ms, p95 {result['p95_ms']:.2f} ms, p99 {result['p99_ms']:.2f} ms, "
+          f"peak RSS {result['peak_rss_mb']} MB")
+
+
+def compare(result, baseline, max_regression):
+    # A scenario regresses when its p95 or its SQL statements per request grow by more
+    # than max_regression (a fraction). Scenarios with too few samples are too noisy.
+    regressions = []
+    for name, row in result["scenarios"].items():
+        before = baseline.get("scenarios", {}).get(name)
+        if not before or min(row["requests"], before["requests"]) < MIN_SAMPLES:
+            continue
+        if before["p95_ms"] and row["p95_ms"] > before["p95_ms"] * (1 + max_regression):
+            regressions.append(f"{name}: p95 {before['p95_ms']:.2f} -> {row['p95_ms']:.2f} ms")
+        if before.get("sql_per_request") is not None and row["sql_per_request"] is not None \
+                and row["sql_per_request"] > before["sql_per_request"] * (1 + max_regression):
+            regressions.append(f"{name}: sql/request {before['sql_per_request']} -> {row['sql_per_request']}")
+    if baseline.get("throughput_rps") and \
+            result["throughput_rps"] < baseline["throughput_rps"] * (1 - max_regression):
+        regressions.append(f"throughput {baseline['throughput_rps']} -> {result['throughput_rps']} req/s")
+
+    print(f"\nAgainst baseline: {baseline['throughput_rps']} -> {result['throughput_rps']} req/s, "
+          f"p95 {baseline['p95_ms']:.2f} -> {result['p95_ms']:.2f} ms, "
+          f"peak RSS {baseline.get('peak_rss_mb')} -> {result['peak_rss_mb']} MB")
+    for line in regressions:
+        print(f"REGRESSION {line}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    add_common_arguments(parser)
+    parser.add_argument("--url", help="benchmark a running server instead of the in-process app")
+    parser.add_argument("--server-pid", type=int, help="report the peak RSS of this process (with --url)")
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--threads", type=int, default=4)
+    parser.add_argument("--warmup", type=int, default=200, help="unmeasured requests sent first")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--no-cache", action="store_true", help="disable the job listing response cache")
+    parser.add_argument("--baseline", help="compare against this saved result")
+    parser.add_argument("--save-baseline", help="write this run's result to a file")
+    parser.add_argument("--max-regression", type=float, default=0.25)
+    args = parser.parse_args()
+
+    # Every simulated user shares one client IP, so rate limits would throttle the mix
+    overrides = {"RESPONSE_CACHE_ENABLED": not args.no_cache, "RATE_LIMIT_ENABLED": False}
+    app = load_app(args, **overrides)
+    workload = Workload(app, args.seed)
+    client = HttpClient(args.url) if args.url else InProcessClient(app)
+
+    if args.warmup:
+        run(client, workload, args.warmup, args.threads)
+    result = run(client, workload, args.requests, args.threads)
+    result["peak_rss_mb"] = peak_rss_mb(args.server_pid)
+    result["target"] = args.url or "in-process"
+    print_report(result)
+
+    if args.save_baseline:
+        with open(args.save_baseline, "w") as f:
+            json.dump(result, f, indent=2)
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        if compare(result, baseline, args.max_regression):
+            raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+"""Payload size and CPU time of the JSON views' serialization, on synthetic rows.
+
+Compares the old hand-built dicts + stdlib encoder with the precompiled
+serializers (services/serialization.py) under both JSON backends, for a job
+listing (full rows vs ?fields=id,title,location) and a list of applications
+with datetimes. No database is needed.
+
+    python benchmarks/serialization.py --rows 10000 --repeat 20
+"""
+import argparse
+import random
+import time
+from collections import namedtuple
+from datetime import datetime, timedelta
+
+from flask import Flask
+from flask.json.provider import DefaultJSONProvider
+
+import common  # noqa: F401  (puts the project on sys.path)
+from routes.applications import MY_APPLICATION_FIELDS
+from routes.jobs import JOB_FIELDS
+from services.serialization import OrjsonProvider, orjson
+
+JobRow = namedtuple("JobRow", "id title description location employer_id")
+ApplicationRow = namedtuple("ApplicationRow", "application_id job_title status applied_on")
+
+
+def synthetic_rows(count, seed):
+    rng = random.Random(seed)
+    words = ["python", "senior", "engineer", "remote", "team", "cloud", "data", "product", "growth", "api"]
+    started = datetime(2024, 1, 1)
+    jobs = [JobRow(i, f"{rng.choice(words).title()} {rng.choice(words)} developer",
+                   " ".join(rng.choices(words, k=rng.randint(80, 250))), rng.choice(["Berlin", "Remote", "NYC"]),
+                   rng.randint(1, 500)) for i in range(1, count + 1)]
+    applications = [ApplicationRow(i, jobs[i - 1].title, rng.choice(["pending", "accepted", "rejected"]),
+                                   started + timedelta(minutes=rng.randint(0, 10 ** 6))) for i in range(1, count + 1)]
+    return jobs, applications
+
+
+def hand_built_job(job):
+    return {"id": job.id, "title": job.title, "description": job.description,
+            "location": job.location, "employer_id": job.employer_id}
+
+
+def hand_built_application(app):
+    return {"application_id": app.application_id, "job_title": app.job_title,
+            "status": app.status, "applied_on": app.applied_on}
+
+
+def measure(build, provider, repeat):
+    # (best ms over `repeat` runs, response body size in bytes)
+    best = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        body = provider.response(build()).get_data()
+        elapsed = (time.perf_counter() - started) * 1000
+        best = elapsed if best is None else min(best, elapsed)
+    return best, len(body)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=10000)
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    jobs, applications = synthetic_rows(args.rows, args.seed)
+    app = Flask(__name__)
+    providers = [("json", DefaultJSONProvider(app))]
+    if orjson is not None:
+        providers.append(("orjson", OrjsonProvider(app)))
+
+    full = JOB_FIELDS.serializer(JOB_FIELDS.default)
+    listing = JOB_FIELDS.serializer(("id", "title", "location"))
+    # Serializers read rows in the order of their columns(), as the query returns them
+    listed = [(job.id, job.title, job.location) for job in jobs]
+    applied = MY_APPLICATION_FIELDS.serializer(MY_APPLICATION_FIELDS.default)
+    cases = [
+        ("jobs, hand-built", lambda: [hand_built_job(job) for job in jobs], providers[:1]),
+        ("jobs, compiled", lambda: [full(job) for job in jobs], providers),
+        ("jobs ?fields=id,title,location", lambda: [listing(row) for row in listed], providers),
+        ("applications, hand-built", lambda: [hand_built_application(a) for a in applications], providers[:1]),
+        ("applications, compiled", lambda: [applied(a) for a in applications], providers),
+    ]
+
+    with app.app_context():
+        print(f"{'case':<34}{'backend':<9}{'ms':>9}{'KB':>10}")
+        for name, build, backends in cases:
+            for backend, provider in backends:
+                elapsed, size = measure(build, provider, args.repeat)
+                print(f"{name:<34}{backend:<9}{elapsed:>9.2f}{size / 1024:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
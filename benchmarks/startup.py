@@ -0,0 +1,80 @@
+"""Cold-start time of a worker: import, create_app() and the first request.
+
+Every sample is a fresh interpreter, like a new gunicorn worker or an autoscaled
+instance. Results can be saved as a baseline and compared like benchmarks/run.py.
+
+    python benchmarks/startup.py --runs 20 --save-baseline startup.json
+    python benchmarks/startup.py --runs 20 --baseline startup.json
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+from common import add_common_arguments
+
+PROBE = r"""
+import json, sys, time
+started = time.perf_counter()
+sys.path.insert(0, sys.argv[1])
+from app import create_app
+imported = time.perf_counter()
+app = create_app()
+created = time.perf_counter()
+app.test_client().get("/")
+served = time.perf_counter()
+print(json.dumps({"import_ms": (imported - started) * 1000, "create_app_ms": (created - imported) * 1000,
+                  "first_request_ms": (served - created) * 1000}))
+"""
+STAGES = ("import_ms", "create_app_ms", "first_request_ms", "process_ms")
+
+
+def sample(root, env):
+    started = time.perf_counter()
+    output = subprocess.run([sys.executable, "-c", PROBE, root], env=env, check=True,
+                            capture_output=True, text=True).stdout
+    result = json.loads(output.strip().splitlines()[-1])
+    result["process_ms"] = (time.perf_counter() - started) * 1000
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    add_common_arguments(parser)
+    parser.add_argument("--runs", type=int, default=10)
+    parser.add_argument("--baseline", help="compare against this saved result")
+    parser.add_argument("--save-baseline", help="write this run's result to a file")
+    parser.add_argument("--max-regression", type=float, default=0.25)
+    args = parser.parse_args()
+
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    env = dict(os.environ, DATABASE_URL=args.database_url)
+    env.setdefault("JWT_SECRET_KEY", "benchmark-secret-key-of-sufficient-length")
+
+    samples = [sample(root, env) for _ in range(args.runs)]
+    result = {}
+    print(f"{'stage':<18}{'median ms':>11}{'max ms':>9}")
+    for stage in STAGES:
+        values = [s[stage] for s in samples]
+        result[stage] = round(statistics.median(values), 2)
+        print(f"{stage:<18}{result[stage]:>11.2f}{max(values):>9.2f}")
+
+    if args.save_baseline:
+        with open(args.save_baseline, "w") as f:
+            json.dump(result, f, indent=2)
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        regressions = [stage for stage in STAGES if baseline.get(stage)
+                       and result[stage] > baseline[stage] * (1 + args.max_regression)]
+        for stage in regressions:
+            print(f"REGRESSION {stage}: {baseline[stage]:.2f} -> {result[stage]:.2f} ms")
+        if regressions:
+            raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+import click
+
+from models import db
+from services import app_counters
+from services.token_blocklist import prune_blocklist
+from services.events import prune_events
+from services.resume_text import extract_pending
+from services.schema import DuplicateRowsError, sync_indexes
+from services.query_plans import check_query_plans, supports_explain
+
+
+def register_commands(app):
+    @app.cli.command('init-db')
+    def init_db():
+        # Create any missing tables (run once per deploy, before starting the workers)
+        db.create_all()
+        click.echo("Database tables synced")
+
+    @app.cli.command('sync-indexes')
+    @click.option('--dedupe', is_flag=True, help='Delete duplicate rows (keeping the oldest) that block a unique index.')
+    def sync_indexes_command(dedupe):
+        # Add columns and indexes declared in models.py to an existing database (idempotent)
+        try:
+            changed, removed = sync_indexes(dedupe=dedupe)
+        except DuplicateRowsError as error:
+            for name, (columns, groups, extra, keys) in error.duplicates.items():
+                click.echo(f"{name}: {extra} duplicate rows in {groups} groups of ({', '.join(columns)}), "
+                           f"e.g. {', '.join(map(str, keys))}")
+            raise click.ClickException(
+                "Nothing was changed. Clean up the rows above, or rerun with --dedupe to delete all but "
+                "the oldest row of each group"
+            )
+        if removed:
+            click.echo(f"Removed {removed} duplicate rows before adding unique indexes")
+        click.echo(f"Created {len(changed)} columns/indexes" + (f": {', '.join(changed)}" if changed else ""))
+        # Databases from before the dashboard counters: count the jobs that have none
+        backfilled = app_counters.backfill()
+        if backfilled:
+            click.echo(f"Backfilled {backfilled} application counters")
+
+    @app.cli.command('check-query-plans')
+    def check_query_plans_command():
+        # EXPLAIN the hot queries; exits 1 if any of them does an unexpected full scan
+        if not supports_explain():
+            raise click.UsageError(
+                f"check-query-plans reads SQLite and MySQL/MariaDB plans only, not {db.engine.dialect.name}"
+            )
+        if check_query_plans(app, click.echo):
+            raise SystemExit(1)
+
+    @app.cli.command('rebuild-counters')
+    def rebuild_counters():
+        # Recompute the per-job application counters used by the employer dashboard
+        rows = app_counters.rebuild()
+        click.echo(f"Rebuilt {rows} application counters")
+
+    @app.cli.command('prune-blocklist')
+    def prune_blocklist_command():
+        # Delete revoked-token rows older than JWT_REFRESH_TOKEN_EXPIRES
+        deleted = prune_blocklist()
+        click.echo(f"Pruned {deleted} revoked tokens")
+
+    @app.cli.command('prune-events')
+    def prune_events_command():
+        # Delete live-feed events older than EVENTS_RETENTION
+        deleted = prune_events()
+        click.echo(f"Pruned {deleted} application events")
+
+    @app.cli.command('extract-resumes')
+    @click.option('--limit', default=100, help='Maximum number of resumes to process.')
+    def extract_resumes(limit):
+        # Extract keywords from resumes whose background extraction was deferred
+        done = extract_pending(limit)
+        click.echo(f"Extracted {done} resumes")
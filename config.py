@@ -6,10 +6,34 @@ import datetime
 # Load variables from .env
 load_dotenv()
 
+
+def engine_options(url):
+    # Pool settings per environment (DB_POOL_* variables). pool_pre_ping and
+    # pool_recycle stop MySQL's idle timeout from handing out dead connections.
+    options = {
+        'pool_pre_ping': os.getenv('DB_POOL_PRE_PING', 'true').lower() == 'true',
+        'pool_recycle': int(os.getenv('DB_POOL_RECYCLE', 280)),
+    }
+    if url and not url.startswith('sqlite'):
+        options['pool_size'] = int(os.getenv('DB_POOL_SIZE', 10))
+        options['max_overflow'] = int(os.getenv('DB_MAX_OVERFLOW', 20))
+        options['pool_timeout'] = int(os.getenv('DB_POOL_TIMEOUT', 10))
+    return options
+
 class Config:
     # Database Configuration
     SQLALCHEMY_DATABASE_URI = os.getenv('DATABASE_URL')
     SQLALCHEMY_TRACK_MODIFICATIONS = False
+    SQLALCHEMY_ENGINE_OPTIONS = engine_options(SQLALCHEMY_DATABASE_URI)
+
+    # Read replicas (comma separated URLs) for the read-only views marked @read_replica.
+    # A view reads from the primary instead while the current user, or a table it
+    # depends on, was written less than REPLICA_LAG_TOLERANCE seconds ago (-1: never
+    # read from replicas).
+    REPLICA_DATABASE_URLS = [url.strip() for url in os.getenv('REPLICA_DATABASE_URLS', '').split(',') if url.strip()]
+    SQLALCHEMY_BINDS = {f'replica{i}': url for i, url in enumerate(REPLICA_DATABASE_URLS, 1)}
+    REPLICA_BIND_KEYS = list(SQLALCHEMY_BINDS)
+    REPLICA_LAG_TOLERANCE = float(os.getenv('REPLICA_LAG_TOLERANCE', 2))
     
     # Security Configuration
     JWT_SECRET_KEY = os.getenv('JWT_SECRET_KEY')
@@ -21,5 +45,153 @@ class Config:
     # 2. How long the refresh token lasts (e.g., 30 days)
     JWT_REFRESH_TOKEN_EXPIRES = datetime.timedelta(days=30)
 
+    # Password hashing: werkzeug method string including the work factor. Existing hashes
+    # with different parameters are upgraded on the user's next successful login.
+    PASSWORD_HASH_METHOD = os.getenv('PASSWORD_HASH_METHOD', 'pbkdf2:sha256:1000000')
+    # Hashing runs on a dedicated process pool per worker (0 = inline). Beyond
+    # PASSWORD_HASH_MAX_QUEUE waiting requests, login/register answer 503 immediately.
+    PASSWORD_HASH_WORKERS = int(os.getenv('PASSWORD_HASH_WORKERS', 2))
+    PASSWORD_HASH_MAX_QUEUE = int(os.getenv('PASSWORD_HASH_MAX_QUEUE', 16))
+    PASSWORD_HASH_TIMEOUT = int(os.getenv('PASSWORD_HASH_TIMEOUT', 10))
+
+    # Revoked-token checks are cached per worker; at most this many jtis are remembered
+    JWT_BLOCKLIST_CACHE_SIZE = int(os.getenv('JWT_BLOCKLIST_CACHE_SIZE', 100000))
+    # Seconds a token verified as not revoked is trusted without asking the database. A
+    # logout reaches the other workers on this host at once (GENERATION_BACKEND), but
+    # workers on other hosts only after this long; 0 asks the database every time.
+    JWT_BLOCKLIST_VALID_TTL = float(os.getenv('JWT_BLOCKLIST_VALID_TTL', 5))
+    # Seconds between opportunistic prunes of expired token_blocklist rows
+    JWT_BLOCKLIST_PRUNE_INTERVAL = int(os.getenv('JWT_BLOCKLIST_PRUNE_INTERVAL', 3600))
+
+    # How workers share cache invalidations: 'shared' (memory-mapped files under
+    # GENERATION_DIR, every worker on this host) or 'local' (single process only)
+    GENERATION_BACKEND = os.getenv('GENERATION_BACKEND', 'shared')
+    GENERATION_DIR = os.getenv('GENERATION_DIR')  # defaults to <instance>/generations
+
+    # Reverse proxies in front of the app whose X-Forwarded-For/-Proto are trusted (0:
+    # none, the peer address is the client). Set it to the real number of hops, or a
+    # client can forge X-Forwarded-For and dodge the per-IP rate limits.
+    PROXY_FIX_HOPS = int(os.getenv('PROXY_FIX_HOPS', 0))
+
+    # Rate limits ("<count>/<period>", e.g. 10/minute or 100/hour; empty disables one).
+    # Counted per client IP (see PROXY_FIX_HOPS), per login email or per user.
+    # 'shared' counts across every worker on this host, 'local' per process.
+    RATE_LIMIT_ENABLED = os.getenv('RATE_LIMIT_ENABLED', 'true').lower() == 'true'
+    RATE_LIMIT_BACKEND = os.getenv('RATE_LIMIT_BACKEND', GENERATION_BACKEND)
+    RATE_LIMIT_LOGIN_IP = os.getenv('RATE_LIMIT_LOGIN_IP', '30/minute')
+    RATE_LIMIT_LOGIN_EMAIL = os.getenv('RATE_LIMIT_LOGIN_EMAIL', '10/minute')  # Failed logins only
+    RATE_LIMIT_REGISTER_IP = os.getenv('RATE_LIMIT_REGISTER_IP', '20/hour')
+    RATE_LIMIT_SEARCH_IP = os.getenv('RATE_LIMIT_SEARCH_IP', '120/minute')  # /jobs/ and /jobs/search together
+    RATE_LIMIT_RECOMMEND_USER = os.getenv('RATE_LIMIT_RECOMMEND_USER', '60/minute')
+    RATE_LIMIT_AUTOCOMPLETE_IP = os.getenv('RATE_LIMIT_AUTOCOMPLETE_IP', '600/minute')  # One call per keystroke
+
+    # Request/SQL metrics, exposed in Prometheus format at /metrics. Each worker writes
+    # its counters to METRICS_DIR every METRICS_FLUSH_INTERVAL seconds and a scrape
+    # sums all of them. Set METRICS_TOKEN to require "Authorization: Bearer <token>";
+    # without it only requests from localhost are answered.
+    METRICS_ENABLED = os.getenv('METRICS_ENABLED', 'true').lower() == 'true'
+    METRICS_DIR = os.getenv('METRICS_DIR')  # defaults to <instance>/metrics
+    METRICS_FLUSH_INTERVAL = float(os.getenv('METRICS_FLUSH_INTERVAL', 5))
+    METRICS_TOKEN = os.getenv('METRICS_TOKEN')
+    # Statements slower than this are logged (logger "sql.slow") with their endpoint
+    SLOW_QUERY_MS = float(os.getenv('SLOW_QUERY_MS', 250))
+    # `flask check-query-plans` on MySQL: full scans of tables estimated below this
+    # many rows are the optimizer's choice, not a missing index
+    QUERY_PLAN_MIN_ROWS = int(os.getenv('QUERY_PLAN_MIN_ROWS', 1000))
+
     UPLOAD_FOLDER = 'uploads/resumes'
-    MAX_CONTENT_LENGTH = 5 * 1024 * 1024  # 5MB limit
\ No newline at end of file
+    MAX_CONTENT_LENGTH = 5 * 1024 * 1024  # 5MB limit
+
+    # Resume downloads can be handed off to the web server instead of a gunicorn worker:
+    # 'x-accel' (nginx, with an internal location at RESUME_ACCEL_PREFIX aliased to
+    # UPLOAD_FOLDER) or 'x-sendfile' (Apache/lighttpd). Empty means serve directly.
+    RESUME_SENDFILE = os.getenv('RESUME_SENDFILE', '')
+    RESUME_ACCEL_PREFIX = os.getenv('RESUME_ACCEL_PREFIX', '/protected-resumes/')
+    USE_X_SENDFILE = RESUME_SENDFILE == 'x-sendfile'
+
+    # Background resume text extraction (keyword search over applicants)
+    RESUME_EXTRACT_WORKERS = int(os.getenv('RESUME_EXTRACT_WORKERS', 2))
+    RESUME_EXTRACT_MAX_PENDING = int(os.getenv('RESUME_EXTRACT_MAX_PENDING', 32))
+    RESUME_EXTRACT_MAX_ATTEMPTS = int(os.getenv('RESUME_EXTRACT_MAX_ATTEMPTS', 3))
+    RESUME_EXTRACT_RETRY_DELAY = float(os.getenv('RESUME_EXTRACT_RETRY_DELAY', 30))  # Seconds, doubled per attempt
+    RESUME_EXTRACT_EAGER = os.getenv('RESUME_EXTRACT_EAGER', 'false').lower() == 'true'  # Inline, for tests
+
+    # Per-worker cache of employer -> applicant ids (resume download checks) and job owners
+    ACCESS_INDEX_MAX_EMPLOYERS = int(os.getenv('ACCESS_INDEX_MAX_EMPLOYERS', 1024))
+    ACCESS_INDEX_MAX_JOBS = int(os.getenv('ACCESS_INDEX_MAX_JOBS', 10000))
+    ACCESS_INDEX_MAX_APPLICANTS = int(os.getenv('ACCESS_INDEX_MAX_APPLICANTS', 500000))  # Ids over all employers
+    ACCESS_INDEX_MAX_SET_SIZE = int(os.getenv('ACCESS_INDEX_MAX_SET_SIZE', 50000))  # Larger employers are not cached
+
+    # Job search: 'auto' uses MySQL FULLTEXT when available, else the in-process index
+    # (also used while the FULLTEXT indexes are missing; see sync-indexes)
+    SEARCH_BACKEND = os.getenv('SEARCH_BACKEND', 'auto')
+    # How often (seconds) a worker pulls postings created by other workers into its index
+    SEARCH_SYNC_INTERVAL = float(os.getenv('SEARCH_SYNC_INTERVAL', 2))
+    # Ranked result lists kept per worker, so paging through a search runs it once
+    SEARCH_CACHE_MAX_ENTRIES = int(os.getenv('SEARCH_CACHE_MAX_ENTRIES', 256))
+    SEARCH_CACHE_MAX_IDS = int(os.getenv('SEARCH_CACHE_MAX_IDS', 1000000))  # Job ids over all entries
+    SEARCH_CACHE_TTL = int(os.getenv('SEARCH_CACHE_TTL', 30))
+
+    # Job recommendations (GET /jobs/recommended): per-worker TF-IDF matrix over the
+    # newest RECOMMEND_MAX_JOBS postings, about 8 bytes x RECOMMEND_MAX_TERMS per job
+    RECOMMEND_MAX_JOBS = int(os.getenv('RECOMMEND_MAX_JOBS', 500000))
+    RECOMMEND_MAX_TERMS = int(os.getenv('RECOMMEND_MAX_TERMS', 24))
+    # New postings are scored from a small side list until this many are merged in
+    RECOMMEND_MERGE_THRESHOLD = int(os.getenv('RECOMMEND_MERGE_THRESHOLD', 5000))
+
+    # Title/location autocomplete (GET /jobs/autocomplete): largest ?limit=, prefixes
+    # matching more than AUTOCOMPLETE_SCAN_LIMIT index entries keep a cached top list,
+    # and browsers may reuse an answer for AUTOCOMPLETE_CACHE_SECONDS
+    AUTOCOMPLETE_MAX_RESULTS = int(os.getenv('AUTOCOMPLETE_MAX_RESULTS', 20))
+    AUTOCOMPLETE_SCAN_LIMIT = int(os.getenv('AUTOCOMPLETE_SCAN_LIMIT', 256))
+    AUTOCOMPLETE_CACHE_SECONDS = int(os.getenv('AUTOCOMPLETE_CACHE_SECONDS', 60))
+
+    # JSON encoder for responses: 'auto' uses orjson when installed, 'json' forces the stdlib
+    JSON_BACKEND = os.getenv('JSON_BACKEND', 'auto')
+
+    # Response compression (brotli if the `brotli` package is installed, else gzip), for
+    # JSON/text bodies of at least COMPRESS_MIN_SIZE bytes. Compressed bodies of cached
+    # listings are kept per worker, up to COMPRESS_CACHE_MAX_BYTES.
+    COMPRESS_ENABLED = os.getenv('COMPRESS_ENABLED', 'true').lower() == 'true'
+    COMPRESS_MIN_SIZE = int(os.getenv('COMPRESS_MIN_SIZE', 1024))
+    COMPRESS_GZIP_LEVEL = int(os.getenv('COMPRESS_GZIP_LEVEL', 6))
+    COMPRESS_BROTLI_LEVEL = int(os.getenv('COMPRESS_BROTLI_LEVEL', 5))
+    COMPRESS_CACHE_MAX_BYTES = int(os.getenv('COMPRESS_CACHE_MAX_BYTES', 32 * 1024 * 1024))
+
+    # Hard cap on ?per_page= for paginated endpoints
+    MAX_PER_PAGE = int(os.getenv('MAX_PER_PAGE', 100))
+
+    # Largest batch accepted by the bulk apply / bulk status endpoints
+    BATCH_MAX_ITEMS = int(os.getenv('BATCH_MAX_ITEMS', 500))
+
+    # Bulk job import (POST /jobs/import): rows per INSERT/commit, largest accepted upload
+    # (this endpoint only; MAX_CONTENT_LENGTH still applies everywhere else) and how many
+    # row errors are listed in the report
+    JOB_IMPORT_BATCH_SIZE = int(os.getenv('JOB_IMPORT_BATCH_SIZE', 500))
+    JOB_IMPORT_MAX_BYTES = int(os.getenv('JOB_IMPORT_MAX_BYTES', 100 * 1024 * 1024))
+    JOB_IMPORT_MAX_ERRORS = int(os.getenv('JOB_IMPORT_MAX_ERRORS', 1000))
+
+    # Live feed of application events (GET /applications/events, server-sent events).
+    # EVENTS_BROKER wakes the other workers after a commit: 'shared' (every worker on
+    # this host, via GENERATION_DIR) or 'local' (single process only). Each stream is
+    # ended after EVENTS_MAX_STREAM_SECONDS and the browser reconnects with Last-Event-ID.
+    EVENTS_BROKER = os.getenv('EVENTS_BROKER', GENERATION_BACKEND)
+    EVENTS_POLL_INTERVAL = float(os.getenv('EVENTS_POLL_INTERVAL', 0.25))
+    EVENTS_RETRY_MS = int(os.getenv('EVENTS_RETRY_MS', 3000))  # Browser reconnect delay
+    EVENTS_HEARTBEAT_SECONDS = int(os.getenv('EVENTS_HEARTBEAT_SECONDS', 15))
+    EVENTS_MAX_STREAM_SECONDS = int(os.getenv('EVENTS_MAX_STREAM_SECONDS', 300))
+    EVENTS_MAX_STREAMS = int(os.getenv('EVENTS_MAX_STREAMS', 1000))  # Open streams per worker
+    EVENTS_QUEUE_SIZE = int(os.getenv('EVENTS_QUEUE_SIZE', 100))  # Undelivered events per stream
+    # Lifetime of the ?jwt= tokens from POST /applications/events/token (they reach access logs)
+    EVENTS_TOKEN_EXPIRES = datetime.timedelta(seconds=int(os.getenv('EVENTS_TOKEN_SECONDS', 60)))
+    EVENTS_REPLAY_LIMIT = int(os.getenv('EVENTS_REPLAY_LIMIT', 500))  # Beyond this a client refetches
+    EVENTS_RETENTION = datetime.timedelta(days=int(os.getenv('EVENTS_RETENTION_DAYS', 7)))
+
+    # Rows fetched per query when streaming large listings (GET /jobs/?stream=ndjson)
+    STREAM_BATCH_SIZE = int(os.getenv('STREAM_BATCH_SIZE', 500))
+
+    # Cached public job listings (GET /jobs/ and /jobs/search), per worker
+    RESPONSE_CACHE_ENABLED = os.getenv('RESPONSE_CACHE_ENABLED', 'true').lower() == 'true'
+    RESPONSE_CACHE_TTL = int(os.getenv('RESPONSE_CACHE_TTL', 30))
+    RESPONSE_CACHE_MAX_ENTRIES = int(os.getenv('RESPONSE_CACHE_MAX_ENTRIES', 1024))
+    RESPONSE_CACHE_MAX_BYTES = int(os.getenv('RESPONSE_CACHE_MAX_BYTES', 64 * 1024 * 1024))
@@ -1,7 +1,10 @@
 from flask_sqlalchemy import SQLAlchemy
+from sqlalchemy import DDL, event
 from datetime import datetime
+from services.db_routing import RoutingSession
 
-db = SQLAlchemy()
+# RoutingSession sends reads from @read_replica views to a replica (see services/db_routing.py)
+db = SQLAlchemy(session_options={"class_": RoutingSession})
 
 class User(db.Model):
     __tablename__ = 'users'
@@ -18,23 +21,103 @@ class User(db.Model):
 
 class Job(db.Model):
     __tablename__ = 'jobs'
+    __table_args__ = (
+        # Bulk imports are idempotent per employer on their own posting key (NULL for
+        # jobs posted one at a time; NULLs never collide)
+        db.Index('uq_jobs_employer_external_key', 'employer_id', 'external_key', unique=True),
+    )
     id = db.Column(db.Integer, primary_key=True)
     title = db.Column(db.String(100), nullable=False, index=True) # Index for faster search
     description = db.Column(db.Text, nullable=False)
     location = db.Column(db.String(100), index=True)
-    employer_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
+    employer_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False, index=True)
+    external_key = db.Column(db.String(100), nullable=True) # Employer's own id for imported postings
     
     applications = db.relationship('Application', backref='job', cascade="all, delete-orphan", lazy=True)
+    application_counts = db.relationship('JobApplicationCount', cascade="all, delete-orphan", lazy=True)
+
+# Native full-text search on MySQL (see services/search.py).
+# Other databases fall back to the in-process index, so these only run on MySQL.
+# Databases created before an index was listed here get it from sync_indexes().
+FULLTEXT_INDEXES = {
+    'ft_jobs_title': ('title',),
+    'ft_jobs_location': ('location',),
+    'ft_jobs_all': ('title', 'description', 'location'),
+}
+
+def fulltext_index_ddl(names):
+    return "ALTER TABLE jobs " + ", ".join(
+        f"ADD FULLTEXT INDEX {name} ({', '.join(FULLTEXT_INDEXES[name])})" for name in names
+    )
+
+event.listen(Job.__table__, 'after_create', DDL(
+    fulltext_index_ddl(FULLTEXT_INDEXES)
+).execute_if(dialect=('mysql', 'mariadb')))
 
 class Application(db.Model):
     __tablename__ = 'applications'
+    __table_args__ = (
+        # One application per seeker and job (apply_to_job relies on it); also serves
+        # "my applications" lookups by user_id
+        db.Index('uq_applications_user_job', 'user_id', 'job_id', unique=True),
+        # Applicant listings and per-status counts/updates for one job
+        db.Index('ix_applications_job_status', 'job_id', 'status'),
+    )
     id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
     job_id = db.Column(db.Integer, db.ForeignKey('jobs.id'), nullable=False)
     status = db.Column(db.String(20), default='pending') # pending, accepted, rejected
     applied_on = db.Column(db.DateTime, default=datetime.utcnow)
 
+# Notifications for the live feed (GET /applications/events, see services/events.py),
+# written in the same transaction as the change; the id is the SSE event id clients
+# resume from with Last-Event-ID
+class ApplicationEvent(db.Model):
+    __tablename__ = 'application_events'
+    __table_args__ = (
+        # Replays for one recipient after a reconnect
+        db.Index('ix_application_events_user_id', 'user_id', 'id'),
+    )
+    id = db.Column(db.Integer, primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False) # Recipient
+    type = db.Column(db.String(20), nullable=False) # 'status' (to the seeker) or 'applicant' (to the employer)
+    data = db.Column(db.Text, nullable=False) # JSON payload, sent as is
+    created_at = db.Column(db.DateTime, default=datetime.utcnow, index=True)
+
+# Per-job, per-status application counters, maintained by services/app_counters.py
+# in the same transaction as the application change. `flask rebuild-counters` recomputes them.
+class JobApplicationCount(db.Model):
+    __tablename__ = 'job_application_counts'
+    job_id = db.Column(db.Integer, db.ForeignKey('jobs.id'), primary_key=True)
+    status = db.Column(db.String(20), primary_key=True)
+    count = db.Column(db.Integer, nullable=False, default=0)
+
+# One row per stored resume file. Identical uploads share a file (the path is derived
+# from the content hash), and the file is deleted when ref_count drops to zero.
+class ResumeBlob(db.Model):
+    __tablename__ = 'resume_blobs'
+    path = db.Column(db.String(255), primary_key=True)
+    sha256 = db.Column(db.String(64), nullable=False, index=True)
+    size = db.Column(db.Integer, nullable=False)
+    ref_count = db.Column(db.Integer, nullable=False, default=0)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+# Text extraction state per resume content (see services/resume_text.py)
+class ResumeDocument(db.Model):
+    __tablename__ = 'resume_documents'
+    sha256 = db.Column(db.String(64), primary_key=True)
+    status = db.Column(db.String(20), nullable=False, default='pending') # pending, done, failed
+    attempts = db.Column(db.Integer, nullable=False, default=0)
+    error = db.Column(db.String(255), nullable=True)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+# Inverted keyword index over extracted resume text: term -> resume content hash
+class ResumeTerm(db.Model):
+    __tablename__ = 'resume_terms'
+    term = db.Column(db.String(64), primary_key=True)
+    sha256 = db.Column(db.String(64), primary_key=True, index=True)
+
 class TokenBlocklist(db.Model):
     id = db.Column(db.Integer, primary_key=True)
-    jti = db.Column(db.String(36), nullable=False, index=True)
+    jti = db.Column(db.String(36), nullable=False, index=True, unique=True)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
\ No newline at end of file
@@ -1,11 +1,41 @@
-from flask import Blueprint, request, jsonify
-from flask_jwt_extended import jwt_required, get_jwt_identity, get_jwt
+from flask import Blueprint, Response, request, jsonify, abort, current_app
+from sqlalchemy import insert, update
+from sqlalchemy.exc import IntegrityError
+from flask_jwt_extended import jwt_required, get_jwt_identity, get_jwt, get_jwt_request_location, create_access_token
 from models import db, Application, Job, User
-import os
-from flask import send_from_directory
+from services.storage import get_storage
+from routes.seekers import resume_download_name
+from services.query_counter import query_budget
+from services import app_counters
+from services.permissions import get_access_index, can_access_resume, owns_job
+from services.resume_text import search_applicants
+from services.db_routing import read_replica
+from services.serialization import Projection, Computed
+from services.applicant_export import stream_applicant_archive
+from services.events import record_events, get_event_hub, replay, event_stream, parse_event_id
 
 apps_bp = Blueprint('applications', __name__)
 
+VALID_STATUSES = ['accepted', 'rejected', 'pending']
+
+# Fields each view can return (?fields=...), see services/serialization.py
+MY_APPLICATION_FIELDS = Projection({
+    "application_id": Application.id,
+    "job_title": Job.title,
+    "status": Application.status,
+    "applied_on": Application.applied_on,
+    "job_id": Application.job_id
+}, default=("application_id", "job_title", "status", "applied_on"))
+
+APPLICANT_FIELDS = Projection({
+    "application_id": Application.id,
+    "seeker_email": User.email,
+    "seeker_id": Application.user_id,
+    "status": Application.status,
+    "resume_url": Computed(lambda row: f"/applications/download-resume/{row.seeker_id}", "seeker_id"),
+    "applied_on": Application.applied_on
+}, default=("application_id", "seeker_email", "seeker_id", "status", "resume_url"))
+
 # --- 1. APPLY FOR A JOB (Seeker Only) ---
 @apps_bp.route('/apply/<int:job_id>', methods=['POST'])
 @jwt_required()
@@ -18,44 +48,115 @@ def apply_to_job(job_id):
     
     user_id = get_jwt_identity()
     
-    # Check if job exists
-    job = Job.query.get(job_id)
-    if not job:
+    # Check if job exists (served from the access index once it has been seen)
+    job_info = get_access_index().job_info(job_id)
+    if not job_info:
         return jsonify({"msg": "Job not found"}), 404
     
-    # Check if already applied
-    existing_app = Application.query.filter_by(user_id=user_id, job_id=job_id).first()
-    if existing_app:
+    # One INSERT; the unique (user_id, job_id) index rejects a second application,
+    # including one racing in from another request
+    try:
+        result = db.session.execute(insert(Application).values(user_id=user_id, job_id=job_id, status='pending'))
+    except IntegrityError:
+        db.session.rollback()
         return jsonify({"msg": "You have already applied for this job"}), 400
-    
-    new_application = Application(
-        user_id=user_id,
-        job_id=job_id
-    )
-    
-    db.session.add(new_application)
+
+    app_counters.record_new_application(job_id)
+    # The employer's live feed hears about it once this commits
+    record_events([_applicant_event(job_info, result.inserted_primary_key[0], job_id, user_id)])
     db.session.commit()
+
+    # The employer may now open this seeker's resume
+    get_access_index().record_application(job_info[0], user_id)
     
     return jsonify({"msg": "Application submitted successfully"}), 201
 
 # --- 2. VIEW MY APPLICATIONS (Seeker Only) ---
 @apps_bp.route('/my-applications', methods=['GET'])
 @jwt_required()
+@query_budget(2)
+@read_replica()
 def get_my_applications():
     user_id = get_jwt_identity()
-    apps = Application.query.filter_by(user_id=user_id).all()
+    fields = MY_APPLICATION_FIELDS.requested(request.args)
+    # Join the job title in the same query instead of lazy-loading app.job per row
+    apps = db.session.query(*MY_APPLICATION_FIELDS.columns(fields)) \
+        .select_from(Application) \
+        .join(Job, Application.job_id == Job.id) \
+        .filter(Application.user_id == user_id) \
+        .all()
     
-    output = []
-    for app in apps:
-        output.append({
-            "application_id": app.id,
-            "job_title": app.job.title,  # Using the 'job' backref from models
-            "status": app.status,
-            "applied_on": app.applied_on
-        })
+    serialize = MY_APPLICATION_FIELDS.serializer(fields)
+    output = [serialize(app) for app in apps]
     return jsonify(output), 200
 
 
+# --- 3. LIVE FEED (server-sent events instead of polling my-applications) ---
+@apps_bp.route('/events/token', methods=['POST'])
+@jwt_required()
+def application_events_token():
+    # EventSource cannot send headers, so browsers pass a token as ?jwt=, where it ends
+    # up in access logs. This one only opens /applications/events and expires within
+    # EVENTS_TOKEN_EXPIRES; fetch a new one before every (re)connect.
+    expires = current_app.config['EVENTS_TOKEN_EXPIRES']
+    token = create_access_token(identity=get_jwt_identity(), additional_claims={"scope": "events"},
+                                expires_delta=expires)
+    return jsonify({"token": token, "expires_in": int(expires.total_seconds())}), 200
+
+
+@apps_bp.route('/events', methods=['GET'])
+@jwt_required(locations=['headers', 'query_string'])
+def application_events():
+    # Seekers receive 'status' events for their applications, employers 'applicant'
+    # events for their jobs. Browsers pass a token from POST /events/token as ?jwt=.
+    # A reconnect sends Last-Event-ID (or ?last_event_id=) and gets what it missed.
+    if get_jwt_request_location() == 'query_string' and get_jwt().get('scope') != 'events':
+        return jsonify({"msg": "Pass a token from POST /applications/events/token as ?jwt="}), 401
+    user_id = int(get_jwt_identity())
+    config = current_app.config
+
+    last_event_id = request.headers.get('Last-Event-ID') or request.args.get('last_event_id')
+    try:
+        last_event_id = parse_event_id(last_event_id) if last_event_id else None
+    except ValueError:
+        return jsonify({"msg": "Invalid Last-Event-ID"}), 400
+
+    if not request.environ.get('wsgi.multithread'):
+        # A stream would hold the only thread of a sync worker for EVENTS_MAX_STREAM_SECONDS
+        return jsonify({"msg": "Event streams need a threaded or async server (gunicorn gthread/gevent)"}), 503
+
+    hub = get_event_hub()
+    subscription, cursor, watermark = hub.subscribe(user_id)
+    if subscription is None:
+        response = jsonify({"msg": "Too many open event streams, please retry later"})
+        response.status_code = 503
+        response.headers["Retry-After"] = "5"
+        return response
+
+    try:
+        replayed = []
+        if last_event_id is not None:
+            # Everything above the client's resume point that it does not have yet
+            resume_from, acked = last_event_id
+            replayed = replay(user_id, resume_from, cursor, config['EVENTS_REPLAY_LIMIT'])
+            if replayed is not None:
+                replayed = [row for row in replayed if row.id not in acked]
+    except BaseException:
+        hub.unsubscribe(subscription)
+        raise
+
+    # Not stream_with_context: the request (and its database connection) ends here,
+    # the stream itself only waits on the subscription's queue.
+    body = event_stream(hub, subscription, watermark, last_event_id, replayed, config['EVENTS_RETRY_MS'],
+                        config['EVENTS_HEARTBEAT_SECONDS'], config['EVENTS_MAX_STREAM_SECONDS'])
+    response = Response(body, mimetype='text/event-stream')
+    response.headers['Cache-Control'] = 'no-cache'
+    response.headers['X-Accel-Buffering'] = 'no'  # nginx: send each event as it comes
+    # Also when the client is gone before the first byte (the generator never starts)
+    response.call_on_close(lambda: hub.unsubscribe(subscription))
+    return response
+
+
 @apps_bp.route('/download-resume/<int:user_id>', methods=['GET'])
 @jwt_required()
 def secure_employer_download(user_id):
@@ -63,41 +164,30 @@ def secure_employer_download(user_id):
     claims = get_jwt()
     role = claims.get('role')
 
-    # 1. Fetch the seeker
-    seeker = User.query.get_or_404(user_id)
+    # 1. Authorization Logic (answered from the precomputed access index)
+    if role not in ('seeker', 'employer'):
+        return jsonify({"msg": "Unauthorized role"}), 403
 
-    # 2. Authorization Logic
-    if role == 'seeker':
-        # Seekers can only download their own resume
-        if current_user_id != user_id:
+    if not can_access_resume(role, current_user_id, user_id):
+        if role == 'seeker':
             return jsonify({"msg": "Permission denied"}), 403
-    
-    elif role == 'employer':
-        # Check if the seeker has applied to ANY job owned by this employer
-        # This joins Application and Job to verify ownership
-        application_exists = db.session.query(Application).join(Job).filter(
-            Application.user_id == user_id,
-            Job.employer_id == current_user_id
-        ).first()
-
-        if not application_exists:
-            return jsonify({"msg": "You do not have permission to view this resume"}), 403
-    
-    else:
-        return jsonify({"msg": "Unauthorized role"}), 403
+        return jsonify({"msg": "You do not have permission to view this resume"}), 403
+
+    # 2. Fetch only the seeker's resume path
+    seeker = db.session.query(User.resume_path).filter(User.id == user_id).first()
+    if seeker is None:
+        abort(404)
 
     # 3. Serve the file if checks pass
     if not seeker.resume_path:
         return jsonify({"msg": "Resume not found"}), 404
 
-    directory = os.path.dirname(seeker.resume_path)
-    filename = os.path.basename(seeker.resume_path)
-    
-    return send_from_directory(directory, filename, as_attachment=True)
+    return get_storage().send(seeker.resume_path, resume_download_name(user_id, seeker.resume_path), as_attachment=True)
 
 
 @apps_bp.route('/job/<int:job_id>/applicants', methods=['GET'])
 @jwt_required()
+@query_budget(3)
 def get_job_applicants(job_id):
     employer_id = get_jwt_identity()
     claims = get_jwt()
@@ -106,19 +196,61 @@ def get_job_applicants(job_id):
         return jsonify({"msg": "Unauthorized"}), 403
 
     # Ensure the job belongs to the current employer
-    job = Job.query.filter_by(id=job_id, employer_id=employer_id).first_or_404()
+    if not owns_job(employer_id, job_id):
+        abort(404)
+    job_title = get_access_index().job_info(job_id)[1]
+    fields = APPLICANT_FIELDS.requested(request.args)
 
-    applicants = []
-    for app in job.applications:
-        applicants.append({
-            "application_id": app.id,
-            "seeker_email": app.applicant.email,
-            "seeker_id": app.user_id,
-            "status": app.status,
-            "resume_url": f"/applications/download-resume/{app.user_id}"
-        })
+    # One join for every applicant's email instead of a lazy load per application
+    rows = db.session.query(*APPLICANT_FIELDS.columns(fields)) \
+        .select_from(Application) \
+        .join(User, Application.user_id == User.id) \
+        .filter(Application.job_id == job_id) \
+        .all()
 
-    return jsonify({"job_title": job.title, "applicants": applicants}), 200
+    serialize = APPLICANT_FIELDS.serializer(fields)
+    applicants = [serialize(app) for app in rows]
+
+    return jsonify({"job_title": job_title, "applicants": applicants}), 200
+
+
+@apps_bp.route('/job/<int:job_id>/applicants/export', methods=['GET'])
+@jwt_required()
+def export_job_applicants(job_id):
+    # One ZIP with applicants.csv and every resume, instead of one download per applicant.
+    # Authorized once here; the archive is then streamed (services/applicant_export.py).
+    employer_id = get_jwt_identity()
+    claims = get_jwt()
+
+    if claims.get("role") != "employer":
+        return jsonify({"msg": "Unauthorized"}), 403
+
+    if not owns_job(employer_id, job_id):
+        abort(404)
+
+    return stream_applicant_archive(job_id, f"job_{job_id}_applicants.zip")
+
+
+@apps_bp.route('/job/<int:job_id>/applicants/search', methods=['GET'])
+@jwt_required()
+@query_budget(3)
+def search_job_applicants(job_id):
+    # ?q=kubernetes docker -> applicants whose resume mentions every term
+    employer_id = get_jwt_identity()
+    claims = get_jwt()
+
+    if claims.get("role") != "employer":
+        return jsonify({"msg": "Unauthorized"}), 403
+
+    if not owns_job(employer_id, job_id):
+        abort(404)
+
+    fields = APPLICANT_FIELDS.requested(request.args)
+    serialize = APPLICANT_FIELDS.serializer(fields)
+    rows = search_applicants(job_id, request.args.get('q'), APPLICANT_FIELDS.columns(fields))
+    applicants = [serialize(app) for app in rows]
+
+    return jsonify({"query": request.args.get('q', ''), "applicants": applicants}), 200
 
 
 @apps_bp.route('/update-status/<int:app_id>', methods=['PUT'])
@@ -133,7 +265,7 @@ def update_application_status(app_id):
     data = request.get_json()
     new_status = data.get('status') # Expected: 'accepted', 'rejected', or 'pending'
     
-    if new_status not in ['accepted', 'rejected', 'pending']:
+    if new_status not in VALID_STATUSES:
         return jsonify({"msg": "Invalid status"}), 400
 
     # Find the application AND ensure the job belongs to this employer
@@ -142,7 +274,248 @@ def update_application_status(app_id):
         Job.employer_id == employer_id
     ).first_or_404()
 
+    old_status = application.status
     application.status = new_status
+    # After the change: a missing counter row is seeded from the applications table
+    app_counters.record_status_change(application.job_id, old_status, new_status)
+    if old_status != new_status:
+        job_title = get_access_index().job_info(application.job_id)[1]
+        record_events([_status_event(application.id, application.job_id, job_title, application.user_id,
+                                     old_status, new_status)])
+    db.session.commit()
+
+    return jsonify({"msg": f"Application status updated to {new_status}"}), 200
+
+
+# --- BATCH ENDPOINTS: many rows, one ownership query, one transaction ---
+
+def _batch_items(data, key):
+    items = (data or {}).get(key)
+    if not isinstance(items, list) or not items:
+        return None, (jsonify({"msg": f"'{key}' must be a non-empty list"}), 400)
+    limit = current_app.config['BATCH_MAX_ITEMS']
+    if len(items) > limit:
+        return None, (jsonify({"msg": f"At most {limit} items per batch"}), 400)
+    return items, None
+
+
+def _status_event(app_id, job_id, job_title, seeker_id, old_status, new_status):
+    return (seeker_id, "status", {
+        "application_id": app_id,
+        "job_id": job_id,
+        "job_title": job_title,
+        "status": new_status,
+        "previous_status": old_status
+    })
+
+
+def _applicant_event(job_info, app_id, job_id, seeker_id):
+    employer_id, job_title = job_info
+    return (employer_id, "applicant", {
+        "application_id": app_id,
+        "job_id": job_id,
+        "job_title": job_title,
+        "seeker_id": int(seeker_id)
+    })
+
+
+def _apply_status_changes(changes, new_status_of):
+    # changes: rows of (id, job_id, job_title, user_id, status) already checked for ownership.
+    # One UPDATE per distinct target status (at most three), one counter pass and one
+    # INSERT of the seekers' events.
+    ids_by_status, deltas, events = {}, {}, []
+    for row in changes:
+        new_status = new_status_of(row)
+        if row.status == new_status:
+            continue
+        ids_by_status.setdefault(new_status, []).append(row.id)
+        events.append(_status_event(row.id, row.job_id, row.job_title, row.user_id, row.status, new_status))
+        deltas[(row.job_id, row.status)] = deltas.get((row.job_id, row.status), 0) - 1
+        deltas[(row.job_id, new_status)] = deltas.get((row.job_id, new_status), 0) + 1
+
+    for new_status, ids in ids_by_status.items():
+        db.session.execute(
+            update(Application).where(Application.id.in_(ids)).values(status=new_status),
+            execution_options={"synchronize_session": False}
+        )
+    app_counters.adjust_many(deltas)
+    record_events(events)
+    return sum(len(ids) for ids in ids_by_status.values())
+
+
+@apps_bp.route('/update-status/batch', methods=['PUT'])
+@jwt_required()
+def update_application_status_batch():
+    # Body: {"updates": [{"app_id": 1, "status": "accepted"}, ...]}
+    employer_id = get_jwt_identity()
+    claims = get_jwt()
+
+    if claims.get("role") != "employer":
+        return jsonify({"msg": "Only employers can update status"}), 403
+
+    items, error = _batch_items(request.get_json(silent=True), 'updates')
+    if error:
+        return error
+
+    results, wanted = [], {}
+    for item in items:
+        app_id = item.get('app_id') if isinstance(item, dict) else None
+        status = item.get('status') if isinstance(item, dict) else None
+        if type(app_id) is not int or status not in VALID_STATUSES:
+            results.append({"app_id": app_id, "ok": False, "msg": "Invalid item"})
+        elif app_id in wanted:
+            # Only the first update of an application applies
+            results.append({"app_id": app_id, "ok": False, "msg": "Duplicate app_id in this batch"})
+        else:
+            wanted[app_id] = status
+            results.append({"app_id": app_id, "ok": True, "status": status})
+
+    # Ownership for every application in one set-based query
+    owned = db.session.query(Application.id, Application.job_id, Job.title.label('job_title'),
+                             Application.user_id, Application.status) \
+        .join(Job, Application.job_id == Job.id) \
+        .filter(Application.id.in_(list(wanted)), Job.employer_id == employer_id) \
+        .with_for_update() \
+        .all()
+    owned_ids = {row.id for row in owned}
+
+    updated = _apply_status_changes(owned, lambda row: wanted[row.id])
     db.session.commit()
 
-    return jsonify({"msg": f"Application status updated to {new_status}"}), 200
\ No newline at end of file
+    for result in results:
+        if result["ok"] and result["app_id"] not in owned_ids:
+            result.update(ok=False, msg="Application not found")
+            result.pop("status")
+
+    return jsonify({"updated": updated, "results": results}), 200
+
+
+@apps_bp.route('/job/<int:job_id>/status', methods=['PUT'])
+@jwt_required()
+def update_job_applications_status(job_id):
+    # Body: {"status": "rejected", "filter": {"status": "pending"}}
+    # Applies a status to every application of the job matching the filter.
+    employer_id = get_jwt_identity()
+    claims = get_jwt()
+
+    if claims.get("role") != "employer":
+        return jsonify({"msg": "Only employers can update status"}), 403
+
+    data = request.get_json(silent=True) or {}
+    new_status = data.get('status')
+    current_status = (data.get('filter') or {}).get('status')
+
+    if new_status not in VALID_STATUSES or (current_status is not None and current_status not in VALID_STATUSES):
+        return jsonify({"msg": "Invalid status"}), 400
+
+    if not owns_job(employer_id, job_id):
+        abort(404)
+    job_title = get_access_index().job_info(job_id)[1]
+
+    # One UPDATE ... WHERE job_id = ? AND status = ? per status being replaced (at most
+    # two), on the (job_id, status) index
+    old_statuses = [current_status] if current_status is not None else VALID_STATUSES
+    deltas, events = {}, []
+    for old_status in old_statuses:
+        if old_status == new_status:
+            continue
+        changed = _update_job_status(job_id, old_status, new_status)
+        events += [_status_event(row.id, job_id, job_title, row.user_id, old_status, new_status) for row in changed]
+        deltas[(job_id, old_status)] = -len(changed)
+        deltas[(job_id, new_status)] = deltas.get((job_id, new_status), 0) + len(changed)
+    app_counters.adjust_many(deltas)
+    record_events(events)
+    db.session.commit()
+    updated = len(events)
+
+    return jsonify({"msg": f"{updated} applications updated to {new_status}", "updated": updated}), 200
+
+
+def _update_job_status(job_id, old_status, new_status):
+    # Returns the (id, user_id) rows it changed, for the seekers' events. MySQL has no
+    # UPDATE ... RETURNING: there the rows are read first with FOR UPDATE, which also
+    # locks the (job_id, status) index range, so the UPDATE changes exactly those rows.
+    statement = update(Application) \
+        .where(Application.job_id == job_id, Application.status == old_status) \
+        .values(status=new_status)
+    options = {"synchronize_session": False}
+    if db.engine.dialect.update_returning:
+        return db.session.execute(statement.returning(Application.id, Application.user_id),
+                                  execution_options=options).all()
+    rows = db.session.query(Application.id, Application.user_id) \
+        .filter(Application.job_id == job_id, Application.status == old_status) \
+        .with_for_update() \
+        .all()
+    db.session.execute(statement, execution_options=options)
+    return rows
+
+
+@apps_bp.route('/apply/batch', methods=['POST'])
+@jwt_required()
+def apply_to_jobs_batch():
+    # Body: {"job_ids": [1, 2, 3]}
+    claims = get_jwt()
+
+    if claims.get("role") != "seeker":
+        return jsonify({"msg": "Only seekers can apply for jobs"}), 403
+
+    user_id = int(get_jwt_identity())
+    items, error = _batch_items(request.get_json(silent=True), 'job_ids')
+    if error:
+        return error
+
+    job_ids = list(dict.fromkeys(job_id for job_id in items if type(job_id) is int))
+
+    # Existence and duplicates checked for the whole batch at once
+    jobs = {
+        row.id: (row.employer_id, row.title)
+        for row in db.session.query(Job.id, Job.employer_id, Job.title).filter(Job.id.in_(job_ids))
+    }
+    already_applied = {
+        row.job_id for row in db.session.query(Application.job_id)
+        .filter(Application.user_id == user_id, Application.job_id.in_(job_ids))
+    }
+
+    results, new_job_ids = [], {}
+    for job_id in items:
+        if type(job_id) is not int:  # bool is an int subclass
+            results.append({"job_id": job_id, "ok": False, "msg": "Invalid job id"})
+        elif job_id not in jobs:
+            results.append({"job_id": job_id, "ok": False, "msg": "Job not found"})
+        elif job_id in already_applied:
+            results.append({"job_id": job_id, "ok": False, "msg": "You have already applied for this job"})
+        else:
+            results.append({"job_id": job_id, "ok": True})
+            already_applied.add(job_id)  # Repeated ids in the same batch count once
+            new_job_ids[job_id] = results[-1]
+
+    if new_job_ids:
+        try:
+            with db.session.begin_nested():
+                db.session.execute(insert(Application),
+                                   [{"user_id": user_id, "job_id": job_id} for job_id in new_job_ids])
+        except IntegrityError:
+            # The seeker applied to some of these jobs from another request at the same
+            # moment: insert one by one and report those as already applied
+            for job_id, result in list(new_job_ids.items()):
+                try:
+                    with db.session.begin_nested():
+                        db.session.execute(insert(Application).values(user_id=user_id, job_id=job_id))
+                except IntegrityError:
+                    result.update(ok=False, msg="You have already applied for this job")
+                    del new_job_ids[job_id]
+
+    if new_job_ids:
+        app_counters.adjust_many({(job_id, 'pending'): 1 for job_id in new_job_ids})
+        new_ids = db.session.query(Application.id, Application.job_id) \
+            .filter(Application.user_id == user_id, Application.job_id.in_(new_job_ids))
+        record_events([
+            _applicant_event(jobs[row.job_id], row.id, row.job_id, user_id) for row in new_ids
+        ])
+        db.session.commit()
+
+        access = get_access_index()
+        for job_id in new_job_ids:
+            access.record_application(jobs[job_id][0], user_id)
+
+    return jsonify({"applied": len(new_job_ids), "results": results}), 201 if new_job_ids else 200
@@ -1,14 +1,24 @@
 from flask import Blueprint, request, jsonify
-from werkzeug.security import generate_password_hash, check_password_hash
 from flask_jwt_extended import create_access_token,create_refresh_token, jwt_required, get_jwt_identity
+from sqlalchemy.exc import IntegrityError
 from models import db, User
 from models import TokenBlocklist
 from flask_jwt_extended import get_jwt
+from services.token_blocklist import get_revocation_cache, maybe_prune_blocklist
+from services.passwords import get_hasher, HashingOverloaded
+from services.rate_limit import rate_limit, json_email, unauthorized
 
 auth_bp = Blueprint('auth', __name__)
 
+def overloaded():
+    # Password hashing pool is full: fail fast instead of tying up this worker
+    response = jsonify({"msg": "Server busy, please retry shortly"})
+    response.headers['Retry-After'] = '1'
+    return response, 503
+
 # --- REGISTER ROUTE ---
 @auth_bp.route('/register', methods=['POST'])
+@rate_limit('RATE_LIMIT_REGISTER_IP')
 def register():
     data = request.get_json()
     
@@ -16,7 +26,10 @@ def register():
     if User.query.filter_by(email=data['email']).first():
         return jsonify({"msg": "User already exists"}), 400
         
-    hashed_pw = generate_password_hash(data['password'], method='pbkdf2:sha256')
+    try:
+        hashed_pw = get_hasher().hash(data['password'])
+    except HashingOverloaded:
+        return overloaded()
     
     new_user = User(
         email=data['email'],
@@ -31,11 +44,28 @@ def register():
 
 # --- LOGIN ROUTE ---
 @auth_bp.route('/login', methods=['POST'])
+@rate_limit('RATE_LIMIT_LOGIN_IP')
+# Failed logins per account, against stuffing from many IPs (successful ones are not counted)
+@rate_limit('RATE_LIMIT_LOGIN_EMAIL', key=json_email, charge=unauthorized)
 def login():
     data = request.get_json()
     user = User.query.filter_by(email=data.get('email')).first()
 
-    if user and check_password_hash(user.password, data.get('password')):
+    hasher = get_hasher()
+    try:
+        valid = user is not None and hasher.verify(user.password, data.get('password'))
+    except HashingOverloaded:
+        return overloaded()
+
+    if valid:
+        # Transparently upgrade hashes made with an outdated work factor
+        if hasher.needs_rehash(user.password):
+            try:
+                user.password = hasher.hash(data.get('password'))
+                db.session.commit()
+            except HashingOverloaded:
+                pass  # Try again on the next login
+
         # Access token: Used for every request (e.g., lasts 15 mins)
         access_token = create_access_token(
             identity=str(user.id), 
@@ -75,10 +105,19 @@ from flask_jwt_extended import get_jti
 @auth_bp.route('/logout', methods=['DELETE'])
 @jwt_required()
 def logout():
-    jti = get_jwt()["jti"]
+    token = get_jwt()
+    jti = token["jti"]
     
-    # Add the token's unique ID to our blocklist
-    db.session.add(TokenBlocklist(jti=jti))
-    db.session.commit()
+    # Add the token's unique ID to our blocklist (jti is unique: a concurrent logout
+    # with the same token already did it)
+    try:
+        db.session.add(TokenBlocklist(jti=jti))
+        db.session.commit()
+    except IntegrityError:
+        db.session.rollback()
+
+    # Tell every worker's revocation cache, then drop rows that can no longer match
+    get_revocation_cache().revoke(jti, token.get("exp"))
+    maybe_prune_blocklist()
     
     return jsonify({"msg": "Access token revoked"}), 200
\ No newline at end of file
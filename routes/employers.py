@@ -3,11 +3,27 @@ from flask import Blueprint, request, jsonify
 from flask_jwt_extended import jwt_required, get_jwt_identity
 from models import db, Job, Application, User
 from flask_jwt_extended import get_jwt
+from services.query_counter import query_budget
+from services.permissions import owns_job
+from services.serialization import Projection, Computed
 
 jobs_bp = Blueprint('jobs', __name__)
 
+APPLICANT_FIELDS = Projection({
+    "application_id": Application.id,
+    "seeker_email": User.email,
+    "status": Application.status,
+    "resume_url": Computed(
+        lambda row: f"/seeker/download/{os.path.basename(row.resume_path)}" if row.resume_path else None,
+        "resume_path"
+    ),
+    "applied_on": Application.applied_on,
+    "resume_path": User.resume_path
+}, internal=("resume_path",))
+
 @jobs_bp.route('/<int:job_id>/applicants', methods=['GET'])
 @jwt_required()
+@query_budget(3)
 def view_applicants(job_id):
     employer_id = get_jwt_identity()
     claims = get_jwt()
@@ -16,19 +32,18 @@ def view_applicants(job_id):
         return jsonify({"msg": "Unauthorized access"}), 403
 
     # Ensure the job belongs to this employer
-    job = Job.query.filter_by(id=job_id, employer_id=employer_id).first()
-    if not job:
+    if not owns_job(employer_id, job_id):
         return jsonify({"msg": "Job not found or unauthorized"}), 404
 
     # Fetch applications and join with User table to get resume paths
-    applicants = []
-    for app in job.applications:
-        applicants.append({
-            "application_id": app.id,
-            "seeker_email": app.applicant.email,
-            "status": app.status,
-            "resume_url": f"/seeker/download/{os.path.basename(app.applicant.resume_path)}" if app.applicant.resume_path else None,
-            "applied_on": app.applied_on
-        })
+    fields = APPLICANT_FIELDS.requested(request.args)
+    rows = db.session.query(*APPLICANT_FIELDS.columns(fields)) \
+        .select_from(Application) \
+        .join(User, Application.user_id == User.id) \
+        .filter(Application.job_id == job_id) \
+        .all()
+
+    serialize = APPLICANT_FIELDS.serializer(fields)
+    applicants = [serialize(app) for app in rows]
 
     return jsonify(applicants), 200
\ No newline at end of file
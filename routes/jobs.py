@@ -1,38 +1,75 @@
 from flask import Blueprint, request, jsonify
 from flask_jwt_extended import jwt_required, get_jwt_identity, get_jwt
-from models import db, Job
+from sqlalchemy import case, func
+from models import db, Job, JobApplicationCount, User
+from flask import current_app
+from services.search import search_job_ids, search_jobs_ranked, index_job, index_new_jobs, load_jobs_in_order, RankedPagination
+from services.pagination import InvalidCursor, keyset_by_id, keyset_over_ranked, estimate_row_count
+from services.streaming import iter_rows, stream_records, requested_stream_format
+from services.query_counter import query_budget
+from services.response_cache import cached_response, invalidate
+from services.db_routing import read_replica
+from services.recommend import recommend_for_seeker, add_job as add_recommendable_job, \
+    add_new_jobs as add_recommendable_jobs
+from services.autocomplete import SUGGEST_FIELDS, suggest, add_job as add_suggestions, \
+    add_new_jobs as add_new_suggestions
+from services.serialization import Projection, Related
+from services.rate_limit import rate_limit, jwt_identity
+from services.job_import import JobImport, ImportFormatError, parse_csv, parse_ndjson
 
 jobs_bp = Blueprint('jobs', __name__)
 
+# Fields each view can return; ?fields=id,title,... selects a subset and only those
+# columns are read (see services/serialization.py)
+JOB_FIELDS = Projection({
+    "id": Job.id,
+    "title": Job.title,
+    "description": Job.description,
+    "location": Job.location,
+    "employer_id": Job.employer_id
+}, required=("id",))
+
+SEARCH_RESULT_FIELDS = Projection({
+    "id": Job.id,
+    "title": Job.title,
+    "location": Job.location,
+    "employer": Related(Job, 'employer', User.email),
+    "description": Job.description,
+    "employer_id": Job.employer_id
+}, default=("id", "title", "location", "employer"))
+
 # --- 1. GET ALL JOBS (Public) ---
 @jobs_bp.route('/', methods=['GET'])
+@rate_limit('RATE_LIMIT_SEARCH_IP')
+@cached_response('jobs', case_insensitive=('title', 'location', 'q'), vary=('Accept',))
+@read_replica('jobs')
 def get_jobs():
     # Get search parameters from the URL
     title_query = request.args.get('title')
     location_query = request.args.get('location')
+    text_query = request.args.get('q')  # Free text over title, description and location
 
-    # Start with all jobs
-    query = Job.query
+    # ?fields=id,title,location leaves the description column out of the SELECT
+    fields = JOB_FIELDS.requested(request.args)
+    columns = JOB_FIELDS.columns(fields)
+    serialize = JOB_FIELDS.serializer(fields)
 
-    # If user provided a title, filter by it (case-insensitive)
-    if title_query:
-        query = query.filter(Job.title.ilike(f'%{title_query}%'))
+    # Ranked ids from the search index (None means no search terms were given)
+    ranked_ids = search_job_ids(title=title_query, location=location_query, q=text_query)
 
-    # If user provided a location, filter by it
-    if location_query:
-        query = query.filter(Job.location.ilike(f'%{location_query}%'))
+    # Streaming mode (?stream=ndjson|json): rows are fetched in batches and written
+    # out as they are serialized, so memory stays flat however many jobs match
+    stream_format = requested_stream_format(request)
+    if stream_format:
+        rows = iter_rows(columns, Job.id, current_app.config['STREAM_BATCH_SIZE'], ids=ranked_ids)
+        return stream_records(map(serialize, rows), stream_format)
 
-    jobs = query.all()
+    if ranked_ids is None:
+        rows = db.session.query(*columns).all()
+    else:
+        rows = iter_rows(columns, Job.id, current_app.config['STREAM_BATCH_SIZE'], ids=ranked_ids)
         
-    results = []
-    for job in jobs:
-        results.append({
-            "id": job.id,
-            "title": job.title,
-            "description": job.description,
-            "location": job.location,
-            "employer_id": job.employer_id
-        })
+    results = [serialize(row) for row in rows]
     return jsonify(results), 200
 
 # --- 2. POST A NEW JOB (Employer Only) ---
@@ -57,11 +94,64 @@ def create_job():
     
     db.session.add(new_job)
     db.session.commit()
+
+    # Keep the search index in step with the new posting, and retire cached listings
+    index_job(new_job)
+    add_recommendable_job(new_job)
+    add_suggestions(new_job)
+    invalidate('jobs')
     
     return jsonify({"msg": "Job posted successfully", "job_id": new_job.id}), 201
 
+# --- 3. BULK IMPORT (Employer Only) ---
+@jobs_bp.route('/import', methods=['POST'])
+@jwt_required()
+def import_jobs():
+    # Body: CSV (header: external_key,title,description,location) or NDJSON, sent raw
+    # with Content-Type text/csv / application/x-ndjson or as a multipart "file".
+    # Rows are parsed and written as they arrive; see services/job_import.py.
+    claims = get_jwt()
+    if claims.get("role") != "employer":
+        return jsonify({"msg": "Only employers can import jobs"}), 403
+
+    # Imports may be far larger than MAX_CONTENT_LENGTH (also enforced on chunked bodies)
+    request.max_content_length = current_app.config['JOB_IMPORT_MAX_BYTES']
+
+    upload = request.files.get('file') if request.mimetype == 'multipart/form-data' else None
+    stream = upload.stream if upload else request.stream
+    mimetype = upload.mimetype if upload else request.mimetype
+    filename = (upload.filename or '') if upload else ''
+    fmt = request.args.get('format')
+    if fmt is None:
+        if mimetype in ('text/csv', 'application/csv') or filename.lower().endswith('.csv'):
+            fmt = 'csv'
+        elif mimetype in ('application/x-ndjson', 'application/jsonl') or filename.lower().endswith(('.ndjson', '.jsonl')):
+            fmt = 'ndjson'
+    if fmt not in ('csv', 'ndjson'):
+        return jsonify({"msg": "Send CSV (text/csv) or NDJSON (application/x-ndjson), or pass ?format="}), 415
+
+    job_import = JobImport(
+        int(get_jwt_identity()),
+        current_app.config['JOB_IMPORT_BATCH_SIZE'],
+        current_app.config['JOB_IMPORT_MAX_ERRORS']
+    )
+    try:
+        report = job_import.run(parse_csv(stream) if fmt == 'csv' else parse_ndjson(stream))
+    except ImportFormatError as e:
+        return jsonify({"msg": str(e)}), 400
+
+    if report["created"]:
+        # New postings become searchable here at once (other workers pick them up on sync)
+        index_new_jobs()
+        add_recommendable_jobs()
+        add_new_suggestions()
+        invalidate('jobs')
+    return jsonify(report), 201 if report["created"] else 200
+
 @jobs_bp.route('/employer-dashboard', methods=['GET'])
 @jwt_required()
+@query_budget(3)
+@read_replica()
 def employer_dashboard():
     employer_id = get_jwt_identity()
     claims = get_jwt()
@@ -70,57 +160,75 @@ def employer_dashboard():
     if claims.get("role") != "employer":
         return jsonify({"msg": "Unauthorized"}), 403
         
-    # Fetch all jobs posted by this employer
-    jobs = Job.query.filter_by(employer_id=employer_id).all()
+    # Fetch all jobs posted by this employer with their application counts,
+    # read from the per-job counters instead of loading every Application
+    counts = JobApplicationCount
+    rows = db.session.query(
+        Job.id,
+        Job.title,
+        Job.location,
+        func.coalesce(func.sum(counts.count), 0).label('total_apps'),
+        func.coalesce(func.sum(case((counts.status == 'pending', counts.count), else_=0)), 0).label('pending_apps')
+    ).outerjoin(counts, counts.job_id == Job.id) \
+        .filter(Job.employer_id == employer_id) \
+        .group_by(Job.id, Job.title, Job.location) \
+        .all()
     
     dashboard_data = []
-    for job in jobs:
-        # Count applications per status for quick stats
-        total_apps = len(job.applications)
-        pending_apps = len([a for a in job.applications if a.status == 'pending'])
-        
+    for job in rows:
         dashboard_data.append({
             "job_id": job.id,
             "title": job.title,
             "location": job.location,
-            "total_applications": total_apps,
-            "pending_reviews": pending_apps,
+            "total_applications": job.total_apps,
+            "pending_reviews": job.pending_apps,
             "applicants_url": f"/applications/job/{job.id}/applicants"
         })
         
     return jsonify(dashboard_data), 200
 
 @jobs_bp.route('/search', methods=['GET'])
+@rate_limit('RATE_LIMIT_SEARCH_IP')
+@cached_response('jobs', case_insensitive=('title', 'location', 'q'))
+@query_budget(4)
+@read_replica('jobs')
 def search_jobs():
     # Get search parameters
     title_query = request.args.get('title')
     location_query = request.args.get('location')
+    text_query = request.args.get('q')
     
     # Get pagination parameters (defaults to page 1, 10 items per page)
     page = request.args.get('page', 1, type=int)
-    per_page = request.args.get('per_page', 10, type=int)
+    max_per_page = current_app.config['MAX_PER_PAGE']
+    per_page = min(request.args.get('per_page', 10, type=int), max_per_page)
 
-    query = Job.query
+    # Only the requested columns are loaded, and the employer only when asked for
+    fields = SEARCH_RESULT_FIELDS.requested(request.args)
+    options = SEARCH_RESULT_FIELDS.load_options(fields)
+    serialize = SEARCH_RESULT_FIELDS.serializer(fields, objects=True)
 
-    if title_query:
-        query = query.filter(Job.title.ilike(f"%{title_query}%"))
-    
-    if location_query:
-        query = query.filter(Job.location.ilike(f"%{location_query}%"))
+    # Cursor mode (?cursor=, empty for the first page) skips OFFSET and COUNT(*)
+    if 'cursor' in request.args:
+        return _search_jobs_by_cursor(title_query, location_query, text_query, max(per_page, 1), options, serialize)
+
+    ranked_ids = search_job_ids(title=title_query, location=location_query, q=text_query)
 
-    # Use paginate instead of .all()
-    # error_out=False prevents 404s if a user requests a page that doesn't exist
-    pagination_obj = query.paginate(page=page, per_page=per_page, error_out=False)
+    if ranked_ids is None:
+        # Use paginate instead of .all()
+        # error_out=False prevents 404s if a user requests a page that doesn't exist
+        # The employer, when requested, is joined into the same query (no per-row SELECT)
+        pagination_obj = Job.query.options(*options) \
+            .paginate(page=page, per_page=per_page, max_per_page=max_per_page, error_out=False)
+    else:
+        # Results are already ranked, so paginate over the id list
+        pagination_obj = RankedPagination(
+            page=page, per_page=per_page, max_per_page=max_per_page, error_out=False,
+            ids=ranked_ids, options=options
+        )
     jobs = pagination_obj.items
 
-    output = []
-    for job in jobs:
-        output.append({
-            "id": job.id,
-            "title": job.title,
-            "location": job.location,
-            "employer": job.employer.email
-        })
+    output = [serialize(job) for job in jobs]
 
     return jsonify({
         "jobs": output,
@@ -129,4 +237,90 @@ def search_jobs():
         "total_jobs": pagination_obj.total,
         "has_next": pagination_obj.has_next,
         "has_prev": pagination_obj.has_prev
-    }), 200
\ No newline at end of file
+    }), 200
+
+def _search_jobs_by_cursor(title_query, location_query, text_query, per_page, options, serialize):
+    cursor = request.args.get('cursor') or None
+    total_mode = request.args.get('total')  # 'exact', 'estimate' or omitted
+
+    ranked = search_jobs_ranked(title=title_query, location=location_query, q=text_query)
+
+    try:
+        if ranked is None:
+            page = keyset_by_id(Job.query.options(*options), Job.id, cursor, per_page)
+            jobs = page.items
+        else:
+            page = keyset_over_ranked(ranked, cursor, per_page)
+            jobs = load_jobs_in_order(page.items, options=options)
+    except InvalidCursor:
+        return jsonify({"msg": "Invalid cursor"}), 400
+
+    response = {
+        "jobs": [serialize(job) for job in jobs],
+        "next_cursor": page.next_cursor,
+        "prev_cursor": page.prev_cursor,
+        "has_next": page.has_next,
+        "has_prev": page.has_prev
+    }
+
+    # The total is only computed on request; ranked searches already know it
+    if ranked is not None:
+        response["total_jobs"] = len(ranked)
+    elif total_mode == 'exact':
+        response["total_jobs"] = Job.query.count()
+    elif total_mode == 'estimate':
+        response["total_jobs_estimate"] = estimate_row_count(Job.__tablename__)
+
+    return jsonify(response), 200
+
+@jobs_bp.route('/recommended', methods=['GET'])
+@rate_limit('RATE_LIMIT_RECOMMEND_USER', key=jwt_identity)
+@jwt_required()
+@query_budget(5)  # Token check, index sync, profile, applied ids, jobs
+@read_replica()
+def recommended_jobs():
+    claims = get_jwt()
+    if claims.get("role") != "seeker":
+        return jsonify({"msg": "Only job seekers get recommendations"}), 403
+
+    limit = min(max(request.args.get('limit', 10, type=int), 1), current_app.config['MAX_PER_PAGE'])
+    fields = SEARCH_RESULT_FIELDS.requested(request.args)
+    options = SEARCH_RESULT_FIELDS.load_options(fields)
+    serialize = SEARCH_RESULT_FIELDS.serializer(fields, objects=True)
+
+    # Ranked against the jobs this seeker applied to (TF-IDF, see services/recommend.py)
+    ranked = recommend_for_seeker(int(get_jwt_identity()), limit)
+    if ranked:
+        scores = dict(ranked)
+        jobs = load_jobs_in_order([job_id for job_id, _ in ranked], options=options)
+        output = [dict(serialize(job), score=round(scores[job.id], 4)) for job in jobs]
+    else:
+        # Index still building, or no application history yet: newest postings instead.
+        # The id bound makes it a backwards walk of the primary key that stops after
+        # `limit` rows (SEARCH ... rowid>? on SQLite, a range on MySQL), not a table scan.
+        jobs = Job.query.options(*options).filter(Job.id > 0).order_by(Job.id.desc()).limit(limit).all()
+        output = [serialize(job) for job in jobs]
+
+    return jsonify({"jobs": output, "personalized": bool(ranked)}), 200
+
+
+@jobs_bp.route('/autocomplete', methods=['GET'])
+@rate_limit('RATE_LIMIT_AUTOCOMPLETE_IP')
+def autocomplete_jobs():
+    # ?q=rea&field=title|location&limit=10, sent on every keystroke: answered from the
+    # in-memory prefix index (services/autocomplete.py) instead of scanning jobs
+    field = request.args.get('field', 'title')
+    if field not in SUGGEST_FIELDS:
+        return jsonify({"msg": f"field must be one of: {', '.join(SUGGEST_FIELDS)}"}), 400
+    limit = min(max(request.args.get('limit', 10, type=int), 1), current_app.config['AUTOCOMPLETE_MAX_RESULTS'])
+
+    suggestions, indexed = suggest(field, request.args.get('q', ''), limit)
+    response = jsonify({
+        "field": field,
+        "suggestions": [{"value": value, "count": count} for value, count in suggestions]
+    })
+    if indexed:
+        # Browsers reuse the answer when the user deletes a character and retypes it
+        response.cache_control.public = True
+        response.cache_control.max_age = current_app.config['AUTOCOMPLETE_CACHE_SECONDS']
+    return response, 200
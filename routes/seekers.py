@@ -1,9 +1,9 @@
 import os
 from flask import Blueprint, request, jsonify
 from flask_jwt_extended import jwt_required, get_jwt_identity
-from werkzeug.utils import secure_filename
 from models import db, User
-from flask import current_app
+from services.storage import get_storage, store_resume, release_resume, delete_unreferenced
+from services.resume_text import register_resume, queue_extraction
 
 seeker_bp = Blueprint('seeker', __name__)
 
@@ -12,6 +12,10 @@ ALLOWED_EXTENSIONS = {'pdf', 'doc', 'docx'}
 def allowed_file(filename):
     return '.' in filename and filename.rsplit('.', 1)[1].lower() in ALLOWED_EXTENSIONS
 
+def resume_download_name(user_id, resume_path):
+    # Stored files are named by content hash, so give downloads a readable name
+    return f"resume_user_{user_id}{os.path.splitext(resume_path)[1]}"
+
 @seeker_bp.route('/upload-resume', methods=['POST'])
 @jwt_required()
 def upload_resume():
@@ -24,26 +28,29 @@ def upload_resume():
 
     if file and allowed_file(file.filename):
         user_id = get_jwt_identity()
-        filename = secure_filename(f"user_{user_id}_{file.filename}")
-        
-        # Ensure the directory exists
-        os.makedirs(current_app.config['UPLOAD_FOLDER'], exist_ok=True)
-        
-        file_path = os.path.join(current_app.config['UPLOAD_FOLDER'], filename)
+        extension = file.filename.rsplit('.', 1)[1].lower()
 
         # Update user record in database
         user = User.query.get(user_id)
+        old_path = user.resume_path
 
-        # If user already has a resume, delete the old file first
-        if user.resume_path and os.path.exists(user.resume_path):
-            os.remove(user.resume_path)
+        # Stream the NEW file into content-addressed storage first (hashed while it is
+        # written, deduplicated against identical uploads)
+        file_path, sha256 = store_resume(file.stream, extension)
+        needs_extraction = register_resume(sha256)
 
-        # Proceed to save the NEW file
-        file.save(file_path)
-        
+        # Swap the reference; the old file is only removed once the new one is committed
+        old_unused = release_resume(old_path) if old_path else False
         user.resume_path = file_path
         db.session.commit()
 
+        if old_unused:
+            delete_unreferenced(old_path)
+
+        # Keyword extraction happens in the background, outside this request
+        if needs_extraction:
+            queue_extraction(sha256, file_path)
+
         return jsonify({"msg": "Resume uploaded successfully", "path": file_path}), 200
     
     return jsonify({"msg": "File type not allowed"}), 400
@@ -60,22 +67,23 @@ def delete_resume():
         return jsonify({"msg": "No resume found to delete"}), 404
 
     try:
-        # 1. Delete the physical file from the folder
-        if os.path.exists(user.resume_path):
-            os.remove(user.resume_path)
-        
-        # 2. Clear the path in the database
+        # 1. Drop our reference and clear the path in the database
+        old_path = user.resume_path
+        unused = release_resume(old_path)
         user.resume_path = None
         db.session.commit()
 
+        # 2. Delete the physical file if no other upload shares it
+        if unused:
+            delete_unreferenced(old_path)
+
         return jsonify({"msg": "Resume deleted successfully"}), 200
 
     except Exception as e:
+        db.session.rollback()
         return jsonify({"msg": f"Error deleting file: {str(e)}"}), 500
     
 
-from flask import send_from_directory
-
 @seeker_bp.route('/download-my-resume', methods=['GET'])
 @jwt_required()
 def download_my_resume():
@@ -85,8 +93,4 @@ def download_my_resume():
     if not user.resume_path:
         return jsonify({"msg": "No resume found"}), 404
 
-    # Extract directory and filename from the stored path
-    directory = os.path.dirname(user.resume_path)
-    filename = os.path.basename(user.resume_path)
-    
-    return send_from_directory(directory, filename)
\ No newline at end of file
+    return get_storage().send(user.resume_path, resume_download_name(user.id, user.resume_path))
\ No newline at end of file
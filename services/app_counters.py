@@ -0,0 +1,147 @@
+from sqlalchemy import bindparam, case, func, select, tuple_
+from sqlalchemy.exc import IntegrityError
+
+from models import db, Application, JobApplicationCount
+
+counts_table = JobApplicationCount.__table__
+
+
+def _plus(delta):
+    # count + delta, never below zero: a counter that drifted (a write made without
+    # the counters, an old database) must not show a negative number; rebuild-counters
+    # puts it right
+    total = counts_table.c.count + delta
+    return case((total < 0, 0), else_=total)
+
+
+def _seed(keys):
+    # {(job_id, status): applications} for counter rows that do not exist yet. Counted
+    # inside the caller's transaction, after its own change, so the new row starts at
+    # the right value even on a database whose older applications were never counted.
+    job_ids = {job_id for job_id, _ in keys}
+    rows = db.session.query(Application.job_id, Application.status, func.count(Application.id)) \
+        .filter(Application.job_id.in_(job_ids)) \
+        .group_by(Application.job_id, Application.status)
+    counts = {(job_id, status): count for job_id, status, count in rows}
+    return {key: counts.get(key, 0) for key in keys}
+
+
+def adjust(job_id, status, delta):
+    # Runs inside the caller's transaction (after the application change itself), so
+    # the counter commits (or rolls back) together with it
+    result = db.session.execute(
+        counts_table.update()
+        .where(counts_table.c.job_id == job_id, counts_table.c.status == status)
+        .values(count=_plus(delta))
+    )
+    if result.rowcount:
+        return
+    try:
+        with db.session.begin_nested():
+            count = _seed([(job_id, status)])[(job_id, status)]
+            db.session.execute(counts_table.insert().values(job_id=job_id, status=status, count=count))
+    except IntegrityError:
+        # Another request created the row between our UPDATE and INSERT
+        db.session.execute(
+            counts_table.update()
+            .where(counts_table.c.job_id == job_id, counts_table.c.status == status)
+            .values(count=_plus(delta))
+        )
+
+
+def adjust_many(deltas):
+    # Batch form of adjust() for {(job_id, status): delta}: one SELECT to see which
+    # rows exist, one executemany UPDATE and one multi-row INSERT for the rest
+    deltas = {key: delta for key, delta in deltas.items() if delta}
+    if not deltas:
+        return
+    job_ids = {job_id for job_id, _ in deltas}
+    existing = {
+        tuple(row) for row in db.session.execute(
+            select(counts_table.c.job_id, counts_table.c.status).where(counts_table.c.job_id.in_(job_ids))
+        )
+    }
+
+    updates = [
+        {"b_job_id": job_id, "b_status": status, "b_delta": delta}
+        for (job_id, status), delta in deltas.items() if (job_id, status) in existing
+    ]
+    if updates:
+        db.session.execute(
+            counts_table.update()
+            .where(counts_table.c.job_id == bindparam("b_job_id"), counts_table.c.status == bindparam("b_status"))
+            .values(count=_plus(bindparam("b_delta"))),
+            updates
+        )
+
+    missing = [key for key in deltas if key not in existing]
+    if missing:
+        try:
+            with db.session.begin_nested():
+                seeds = _seed(missing)
+                db.session.execute(
+                    counts_table.insert(),
+                    [{"job_id": job_id, "status": status, "count": seeds[(job_id, status)]}
+                     for job_id, status in missing]
+                )
+        except IntegrityError:
+            # Raced with another writer; fall back to the row-by-row upsert
+            for job_id, status in missing:
+                adjust(job_id, status, deltas[(job_id, status)])
+
+
+def record_new_application(job_id, status='pending'):
+    adjust(job_id, status, 1)
+
+
+def record_status_change(job_id, old_status, new_status):
+    if old_status == new_status:
+        return
+    adjust(job_id, old_status, -1)
+    adjust(job_id, new_status, 1)
+
+
+def backfill(batch_size=1000):
+    # Counters for jobs that have applications but no counter rows at all: databases
+    # from before the counters existed. Run by sync-indexes; unlike rebuild() it leaves
+    # counted jobs alone, so it is safe while the app is serving.
+    counted = select(counts_table.c.job_id)
+    rows = db.session.query(Application.job_id, Application.status, func.count(Application.id)) \
+        .filter(Application.job_id.not_in(counted)) \
+        .group_by(Application.job_id, Application.status) \
+        .all()
+    for start in range(0, len(rows), batch_size):
+        batch = [{"job_id": job_id, "status": status, "count": count}
+                 for job_id, status, count in rows[start:start + batch_size]]
+        try:
+            with db.session.begin_nested():
+                db.session.execute(counts_table.insert(), batch)
+        except IntegrityError:
+            # A write seeded some of these meanwhile (already counting everything)
+            taken = {
+                tuple(row) for row in db.session.execute(
+                    select(counts_table.c.job_id, counts_table.c.status)
+                    .where(tuple_(counts_table.c.job_id, counts_table.c.status)
+                           .in_([(row["job_id"], row["status"]) for row in batch]))
+                )
+            }
+            batch = [row for row in batch if (row["job_id"], row["status"]) not in taken]
+            if batch:
+                db.session.execute(counts_table.insert(), batch)
+    db.session.commit()
+    return len(rows)
+
+
+def rebuild():
+    # Recompute every counter from the applications table (after drift or a bulk load)
+    db.session.execute(counts_table.delete())
+    rows = db.session.query(Application.job_id, Application.status, func.count(Application.id)) \
+        .group_by(Application.job_id, Application.status) \
+        .all()
+    if rows:
+        db.session.execute(
+            counts_table.insert(),
+            [{"job_id": job_id, "status": status, "count": count} for job_id, status, count in rows]
+        )
+    db.session.commit()
+    return len(rows)
@@ -0,0 +1,118 @@
+import csv
+import io
+import os
+import time
+import zipfile
+
+from flask import Response, current_app, stream_with_context
+
+from models import Application, User
+from services.storage import CHUNK_SIZE, get_storage
+from services.streaming import iter_rows
+
+# One ZIP archive per job with every applicant (applicants.csv) and their resumes,
+# generated while it is sent: zipfile writes into a sink that the response generator
+# empties after every chunk, applicants are read STREAM_BATCH_SIZE rows at a time and
+# resumes CHUNK_SIZE bytes at a time, so memory stays flat however large the archive.
+# Writing to a non-seekable sink makes zipfile put sizes and CRCs in data descriptors
+# after each entry, which every unzip tool reads.
+
+CSV_HEADER = ("application_id", "seeker_id", "email", "status", "applied_on", "resume_file")
+COLUMNS = (
+    Application.id.label("id"),
+    Application.user_id,
+    User.email,
+    Application.status,
+    Application.applied_on,
+    User.resume_path
+)
+
+
+class _ZipSink(io.RawIOBase):
+    # Write-only, non-seekable target for ZipFile; drain() hands over what was written
+    def __init__(self):
+        self.chunks = []
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        self.chunks.append(bytes(data))
+        return len(data)
+
+    def drain(self):
+        data = b"".join(self.chunks)
+        self.chunks = []
+        return data
+
+
+def _entry(name, compress_type, size=0):
+    info = zipfile.ZipInfo(name, time.localtime()[:6])
+    info.compress_type = compress_type
+    info.external_attr = 0o644 << 16
+    info.file_size = size  # Only used to decide whether the entry needs ZIP64 fields
+    return info
+
+
+def _resume_name(row):
+    # Same name as a single download (routes/seekers.py resume_download_name)
+    return f"resumes/resume_user_{row.user_id}{os.path.splitext(row.resume_path)[1]}"
+
+
+def _applicants(job_id):
+    # Walked twice (CSV, then resumes) rather than holding the list between the passes
+    return iter_rows(
+        COLUMNS, Application.id, current_app.config.get("STREAM_BATCH_SIZE", 500),
+        filters=(Application.job_id == job_id, User.id == Application.user_id)
+    )
+
+
+def _archive(job_id):
+    storage, sink = get_storage(), _ZipSink()
+    with zipfile.ZipFile(sink, "w") as archive:
+        # 1. applicants.csv, deflated (with a BOM so spreadsheet apps read it as UTF-8)
+        with archive.open(_entry("applicants.csv", zipfile.ZIP_DEFLATED), "w") as entry:
+            text = io.TextIOWrapper(entry, encoding="utf-8-sig", newline="")
+            writer = csv.writer(text)
+            writer.writerow(CSV_HEADER)
+            for row in _applicants(job_id):
+                has_file = bool(row.resume_path) and storage.exists(row.resume_path)
+                writer.writerow((
+                    row.id, row.user_id, row.email, row.status,
+                    row.applied_on.isoformat() if row.applied_on else "",
+                    _resume_name(row) if has_file else ""
+                ))
+                yield sink.drain()
+            text.flush()
+            text.detach()
+        yield sink.drain()
+
+        # 2. Resumes, stored as they are (PDF and DOCX are compressed already)
+        for row in _applicants(job_id):
+            if not row.resume_path:
+                continue
+            try:
+                source = storage.open(row.resume_path)
+            except FileNotFoundError:
+                continue
+            with source:
+                size = os.fstat(source.fileno()).st_size
+                with archive.open(_entry(_resume_name(row), zipfile.ZIP_STORED, size), "w") as entry:
+                    while True:
+                        chunk = source.read(CHUNK_SIZE)
+                        if not chunk:
+                            break
+                        entry.write(chunk)
+                        yield sink.drain()
+            yield sink.drain()
+    # Central directory
+    yield sink.drain()
+
+
+def stream_applicant_archive(job_id, download_name):
+    # The caller has already checked that the job belongs to the current employer
+    body = (chunk for chunk in _archive(job_id) if chunk)
+    response = Response(stream_with_context(body), mimetype="application/zip")
+    response.headers["Content-Disposition"] = f'attachment; filename="{download_name}"'
+    response.headers["Cache-Control"] = "no-store"
+    return response
@@ -0,0 +1,311 @@
+import heapq
+import logging
+import sys
+import threading
+import time
+from array import array
+from bisect import bisect_left
+
+from flask import current_app
+from sqlalchemy import func, or_
+
+from models import db, Job
+from services.job_sync import JobSyncCursor
+
+logger = logging.getLogger(__name__)
+
+# Title and location suggestions while the user types (GET /jobs/autocomplete), served
+# from memory instead of one ILIKE scan per keystroke.
+#
+# Each field keeps its distinct values with the number of postings using them (the
+# weight). Every value is indexed under each of its word starts, so "sen", "rea" and
+# "dev" all find "Senior React Developer". An entry is one 64-bit int (value id << 8 |
+# character offset) in an array sorted by the text from that offset, so a prefix is a
+# binary search over 8 bytes per entry plus one normalized string per value. Narrow
+# prefixes are ranked by scanning their range; the few wide ones ("s", "se") keep a
+# cached top list. Jobs are append-only, so weights only grow and a cached top list is
+# kept exact by re-ranking just the value that changed.
+
+SUGGEST_FIELDS = ("title", "location")
+MAX_OFFSET = 255  # Word starts beyond this character are not indexed
+SYNC_BATCH = 10000  # New postings read per sync
+
+
+def normalize(value):
+    return " ".join((value or "").casefold().split())
+
+
+def _word_starts(key):
+    starts, position = [], 0
+    for word in key.split(" "):
+        if position > MAX_OFFSET:
+            break
+        starts.append(position)
+        position += len(word) + 1
+    return starts
+
+
+class PrefixIndex:
+    def __init__(self, max_results=20, scan_limit=256):
+        self.max_results = max_results  # Largest k a query may ask for
+        self.scan_limit = scan_limit  # Wider prefix ranges get a cached top list
+        self.values = []  # value id -> text as first seen
+        self.keys = []  # value id -> normalized text
+        self.weights = array("q")  # value id -> postings with this value
+        self.ids = {}  # normalized text -> value id
+        self.entries = array("q")  # (value id << 8 | offset), sorted by keys[id][offset:]
+        self.top = {}  # wide prefix -> value ids by weight, best first
+        self.lock = threading.RLock()
+
+    def _text(self, entry):
+        return self.keys[entry >> 8][entry & 0xFF:]
+
+    def build(self, counts):
+        # counts: (value, postings) pairs, e.g. from a GROUP BY
+        with self.lock:
+            for value, count in counts:
+                self._count(value, count)
+            entries = [(value_id << 8) | start
+                       for value_id, key in enumerate(self.keys) for start in _word_starts(key)]
+            entries.sort(key=self._text)
+            self.entries = array("q", entries)
+            self.top = {}
+            self._warm()
+
+    def add(self, value, count=1):
+        self.add_many([(value, count)])
+
+    def add_many(self, counts):
+        # New postings: weights go up, and entries for unseen values are spliced into the
+        # sorted array in one pass (one copy of the array, not one per entry)
+        with self.lock:
+            first, changed = len(self.keys), set()
+            for value, count in counts:
+                value_id = self._count(value, count)
+                if value_id is not None:
+                    changed.add(value_id)
+            new = sorted(((value_id << 8) | start
+                          for value_id in range(first, len(self.keys)) for start in _word_starts(self.keys[value_id])),
+                         key=self._text)
+            if len(new) == 1:
+                self.entries.insert(bisect_left(self.entries, self._text(new[0]), key=self._text), new[0])
+            elif new:
+                merged, previous = array("q"), 0
+                for entry in new:
+                    position = bisect_left(self.entries, self._text(entry), previous, key=self._text)
+                    merged.extend(self.entries[previous:position])
+                    merged.append(entry)
+                    previous = position
+                merged.extend(self.entries[previous:])
+                self.entries = merged
+            if self.top:
+                for value_id in changed:
+                    self._rerank(value_id)
+
+    def _count(self, value, count):
+        key = normalize(value)
+        if not key:
+            return None
+        value_id = self.ids.get(key)
+        if value_id is None:
+            value_id = len(self.keys)
+            self.ids[key] = value_id
+            self.keys.append(key)
+            self.values.append(" ".join(value.split()))
+            self.weights.append(0)
+        self.weights[value_id] += count
+        return value_id
+
+    def _rerank(self, value_id):
+        # Every cached prefix this value falls under gets it moved to its new place
+        key = self.keys[value_id]
+        for start in _word_starts(key):
+            for end in range(start + 1, len(key) + 1):
+                ranked = self.top.get(key[start:end])
+                if ranked is None:
+                    continue
+                if value_id not in ranked:
+                    ranked.append(value_id)
+                # A short list, and add_many() may have raised several of its weights
+                ranked.sort(key=self.weights.__getitem__, reverse=True)
+                del ranked[self.max_results:]
+
+    def _warm(self):
+        # Rank every wide prefix now rather than on its first keystroke
+        self._warm_range("", 0, len(self.entries))
+
+    def _warm_range(self, prefix, lo, hi):
+        # Top list of a range, from its children's top lists (the best k under a prefix
+        # are among the best k under each longer prefix), so the whole prefix tree costs
+        # one scan of the narrow ranges plus a small merge per wide prefix
+        if hi - lo <= self.scan_limit:
+            return self._rank(lo, hi)
+        candidates, position = {}, lo
+        while position < hi:
+            entry = self.entries[position]
+            text = self._text(entry)
+            if len(text) == len(prefix):
+                candidates[entry >> 8] = None
+                position += 1
+                continue
+            child = text[:len(prefix) + 1]
+            end = bisect_left(self.entries, child + "\U0010ffff", position, hi, key=self._text)
+            candidates.update(dict.fromkeys(self._warm_range(child, position, end)))
+            position = end
+        ranked = heapq.nlargest(self.max_results, candidates, key=self.weights.__getitem__)
+        if prefix:
+            self.top[prefix] = ranked
+        return ranked
+
+    def _range(self, prefix):
+        lo = bisect_left(self.entries, prefix, key=self._text)
+        hi = bisect_left(self.entries, prefix + "\U0010ffff", lo, key=self._text)
+        return lo, hi
+
+    def _rank(self, lo, hi):
+        value_ids = dict.fromkeys(entry >> 8 for entry in self.entries[lo:hi])
+        return heapq.nlargest(self.max_results, value_ids, key=self.weights.__getitem__)
+
+    def suggest(self, prefix, k=10):
+        # [(value, postings)] for the values with a word starting with `prefix`, most used first
+        prefix = normalize(prefix)
+        if not prefix:
+            return []
+        with self.lock:
+            ranked = self.top.get(prefix)
+            if ranked is None:
+                lo, hi = self._range(prefix)
+                ranked = self._rank(lo, hi)
+                if hi - lo > self.scan_limit:
+                    self.top[prefix] = ranked
+            return [(self.values[value_id], self.weights[value_id]) for value_id in ranked[:k]]
+
+    def memory_bytes(self):
+        # Arrays plus the strings and the lookup dict (an estimate of what the index holds)
+        strings = sum(sys.getsizeof(value) for value in self.values) \
+            + sum(sys.getsizeof(key) for key in self.keys)
+        containers = sys.getsizeof(self.values) + sys.getsizeof(self.keys) + sys.getsizeof(self.ids)
+        return self.entries.itemsize * len(self.entries) + self.weights.itemsize * len(self.weights) \
+            + strings + containers
+
+
+# --- PER-WORKER SUGGESTER (built in the background, kept in step with new jobs) ---
+
+class JobAutocomplete:
+    def __init__(self, app, max_results=20, scan_limit=256, sync_interval=2.0):
+        self.app = app
+        self.indexes = {field: PrefixIndex(max_results, scan_limit) for field in SUGGEST_FIELDS}
+        self.sync_interval = sync_interval
+        self.state = "empty"  # empty -> building -> ready
+        self.cursor = JobSyncCursor()  # Which jobs the index has, see services/job_sync.py
+        self.last_sync = 0.0
+        self.lock = threading.Lock()
+        self.sync_lock = threading.Lock()
+
+    def ensure_ready(self):
+        # A million postings take a few seconds to group, so never inside a request
+        with self.lock:
+            if self.state == "empty":
+                self.state = "building"
+                threading.Thread(target=self._build, daemon=True).start()
+        return self.state == "ready"
+
+    def _build(self):
+        with self.app.app_context():
+            try:
+                started = time.monotonic()
+                last_id = db.session.query(func.max(Job.id)).scalar() or 0
+                for field, index in self.indexes.items():
+                    column = getattr(Job, field)
+                    index.build(db.session.query(column, func.count()).filter(Job.id <= last_id).group_by(column))
+                self.cursor.start(last_id)
+                self.state = "ready"
+                self.last_sync = time.monotonic()
+                logger.info("Autocomplete index: %s titles, %s locations, %.1f MB, built in %.1fs",
+                            len(self.indexes["title"].keys), len(self.indexes["location"].keys),
+                            sum(index.memory_bytes() for index in self.indexes.values()) / 2 ** 20,
+                            time.monotonic() - started)
+            except Exception:
+                logger.exception("Building the autocomplete index failed")
+                self.state = "empty"
+            finally:
+                db.session.remove()
+
+    def sync(self, force=False):
+        # Pull in postings created by other workers, including ids that committed late.
+        # force reads everything new at once (after a bulk import), not one batch.
+        now = time.monotonic()
+        if not force and now - self.last_sync < self.sync_interval or not self.sync_lock.acquire(blocking=force):
+            return
+        try:
+            self.last_sync = now
+            while True:
+                rows = self.cursor.query(Job.id, Job.title, Job.location).limit(SYNC_BATCH).all()
+                new_rows = list(self.cursor.advance(rows))
+                # A bulk import arrives here as one batch per field
+                self.indexes["title"].add_many((row.title, 1) for row in new_rows)
+                self.indexes["location"].add_many((row.location, 1) for row in new_rows)
+                if not force or len(rows) < SYNC_BATCH:
+                    break
+        finally:
+            self.sync_lock.release()
+
+    def add(self, job_id, title, location):
+        # A posting from this worker; ids from other workers may still be below it, so
+        # the cursor's last_id is left for sync() to move
+        with self.lock:
+            if self.state != "ready" or not self.cursor.add(job_id):
+                return
+        self.indexes["title"].add(title)
+        self.indexes["location"].add(location)
+
+
+def get_autocomplete():
+    autocomplete = current_app.extensions.get("job_autocomplete")
+    if autocomplete is None:
+        config = current_app.config
+        autocomplete = JobAutocomplete(
+            current_app._get_current_object(),
+            config.get("AUTOCOMPLETE_MAX_RESULTS", 20),
+            config.get("AUTOCOMPLETE_SCAN_LIMIT", 256),
+            config.get("SEARCH_SYNC_INTERVAL", 2.0),
+        )
+        autocomplete = current_app.extensions.setdefault("job_autocomplete", autocomplete)
+    return autocomplete
+
+
+def suggest(field, prefix, k=10):
+    # ([(value, postings)], served from the index?)
+    autocomplete = get_autocomplete()
+    if not autocomplete.ensure_ready():
+        return _suggest_from_database(field, prefix, k), False
+    autocomplete.sync()
+    return autocomplete.indexes[field].suggest(prefix, k), True
+
+
+def _suggest_from_database(field, prefix, k):
+    # While the index builds: values with a word starting with the prefix, like the
+    # index. The " prefix" half cannot use the column index, but this only runs for the
+    # few seconds the index takes to build.
+    prefix = " ".join((prefix or "").split())
+    if not prefix:
+        return []
+    column = getattr(Job, field)
+    rows = db.session.query(column, func.count().label("postings")) \
+        .filter(or_(column.startswith(prefix, autoescape=True), column.contains(" " + prefix, autoescape=True))) \
+        .group_by(column) \
+        .order_by(func.count().desc()) \
+        .limit(k)
+    return [(value, postings) for value, postings in rows]
+
+
+def add_job(job):
+    # Called right after create_job commits so this worker suggests the posting at once
+    get_autocomplete().add(job.id, job.title, job.location)
+
+
+def add_new_jobs():
+    # Called after a bulk import commits, so this worker suggests the new postings at once
+    autocomplete = get_autocomplete()
+    if autocomplete.state == "ready":
+        autocomplete.sync(force=True)
@@ -0,0 +1,112 @@
+import gzip
+import threading
+from collections import OrderedDict
+
+from flask import current_app, request
+
+try:
+    import brotli
+except ImportError:  # Optional: without it only gzip is offered
+    brotli = None
+
+# Response compression negotiated from Accept-Encoding (brotli when the `brotli`
+# package is installed, else gzip). Bodies under COMPRESS_MIN_SIZE, streamed responses
+# and file downloads are sent as they are. Responses with a strong ETag (the cached
+# job listings, see services/response_cache.py) always have the same body for the same
+# ETag, so their compressed bytes are kept in a small LRU and reused instead of being
+# compressed again on every request.
+
+COMPRESSIBLE_MIMETYPES = {
+    "application/json",
+    "application/x-ndjson",
+    "text/plain",
+    "text/html",
+    "text/csv",
+}
+
+
+class CompressedBodies:
+    # LRU of (etag, encoding) -> compressed body, bounded by total bytes
+    def __init__(self, max_bytes=32 * 1024 * 1024):
+        self.max_bytes = max_bytes
+        self.entries = OrderedDict()
+        self.size = 0
+        self.lock = threading.Lock()
+
+    def get(self, key):
+        with self.lock:
+            body = self.entries.get(key)
+            if body is not None:
+                self.entries.move_to_end(key)
+            return body
+
+    def put(self, key, body):
+        if len(body) > self.max_bytes:
+            return
+        with self.lock:
+            if key in self.entries:
+                self.size -= len(self.entries.pop(key))
+            self.entries[key] = body
+            self.size += len(body)
+            while self.size > self.max_bytes:
+                _, dropped = self.entries.popitem(last=False)
+                self.size -= len(dropped)
+
+
+def get_compressed_bodies():
+    bodies = current_app.extensions.get("compressed_bodies")
+    if bodies is None:
+        bodies = CompressedBodies(current_app.config.get("COMPRESS_CACHE_MAX_BYTES", 32 * 1024 * 1024))
+        bodies = current_app.extensions.setdefault("compressed_bodies", bodies)
+    return bodies
+
+
+def compress(body, encoding, config):
+    if encoding == "br":
+        return brotli.compress(body, quality=config.get("COMPRESS_BROTLI_LEVEL", 5))
+    # mtime=0 keeps the output identical for identical input
+    return gzip.compress(body, compresslevel=config.get("COMPRESS_GZIP_LEVEL", 6), mtime=0)
+
+
+def _encodings():
+    return ("br", "gzip") if brotli is not None else ("gzip",)
+
+
+def _should_compress(response, config):
+    if response.status_code != 200 or response.is_streamed or response.direct_passthrough:
+        return False
+    if "Content-Encoding" in response.headers or response.mimetype not in COMPRESSIBLE_MIMETYPES:
+        return False
+    return (response.content_length or 0) >= config.get("COMPRESS_MIN_SIZE", 1024)
+
+
+def install_compression(app):
+    if not app.config.get("COMPRESS_ENABLED", True):
+        return
+
+    @app.after_request
+    def _compress_response(response):
+        config = app.config
+        if not _should_compress(response, config):
+            return response
+        # The body depends on Accept-Encoding from here on, whatever we send
+        response.vary.add("Accept-Encoding")
+        encoding = request.accept_encodings.best_match(_encodings())
+        if encoding is None:
+            return response
+
+        etag, weak = response.get_etag()
+        key = (etag, encoding) if etag and not weak else None
+        body = get_compressed_bodies().get(key) if key else None
+        if body is None:
+            body = compress(response.get_data(), encoding, config)
+            if key:
+                get_compressed_bodies().put(key, body)
+
+        response.set_data(body)
+        response.headers["Content-Encoding"] = encoding
+        if etag:
+            # Same resource, different bytes: the validator becomes weak (as nginx does),
+            # and If-None-Match still matches it with weak comparison
+            response.set_etag(etag, weak=True)
+        return response
@@ -0,0 +1,158 @@
+import mmap
+import os
+import random
+import struct
+import time
+import zlib
+from functools import wraps
+
+from flask import current_app, g, has_app_context, has_request_context
+from flask_jwt_extended import get_jwt_identity
+from flask_sqlalchemy.session import Session as FlaskSession
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+from sqlalchemy.sql import Select
+
+# Read replicas (REPLICA_DATABASE_URLS) are used only by views decorated with
+# @read_replica, and only for plain SELECTs. A view falls back to the primary while
+# the data it reads may not have reached the replica yet: the current user wrote
+# something, or one of the tables it lists was written, within REPLICA_LAG_TOLERANCE
+# seconds. Those write times are shared by every worker on the host.
+
+# Imported by models.py before `db` exists, so this module must not import models.
+
+
+# --- 1. RECENT WRITES (user and table keys -> time of last commit) ---
+
+class LocalRecentWrites:
+    # Process-local stand-in: fine for a single worker, the dev server and tests
+    def __init__(self):
+        self.values = {}
+
+    def mark(self, key, when=None):
+        self.values[key] = time.time() if when is None else when
+
+    def last(self, key):
+        return self.values.get(key, 0.0)
+
+
+class SharedRecentWrites:
+    # A fixed table of timestamps in one memory-mapped file, indexed by a hash of the
+    # key. Two keys sharing a slot only ever make a read go to the primary when it
+    # could have used a replica, never the other way round.
+    SLOT = struct.Struct("d")
+
+    def __init__(self, path, slots=65536):
+        self.slots = slots
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        size = self.SLOT.size * slots
+        fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o600)
+        try:
+            if os.fstat(fd).st_size < size:
+                os.ftruncate(fd, size)
+            self.map = mmap.mmap(fd, size)
+        finally:
+            os.close(fd)
+
+    def _offset(self, key):
+        return (zlib.crc32(key.encode()) % self.slots) * self.SLOT.size
+
+    def mark(self, key, when=None):
+        self.SLOT.pack_into(self.map, self._offset(key), time.time() if when is None else when)
+
+    def last(self, key):
+        return self.SLOT.unpack_from(self.map, self._offset(key))[0]
+
+
+def get_recent_writes():
+    recent = current_app.extensions.get("recent_writes")
+    if recent is None:
+        if current_app.config.get("GENERATION_BACKEND", "shared") == "local":
+            recent = LocalRecentWrites()
+        else:
+            directory = current_app.config.get("GENERATION_DIR") \
+                or os.path.join(current_app.instance_path, "generations")
+            recent = SharedRecentWrites(os.path.join(directory, "recent_writes.bin"))
+        recent = current_app.extensions.setdefault("recent_writes", recent)
+    return recent
+
+
+def _current_user_key():
+    try:
+        identity = get_jwt_identity()
+    except RuntimeError:  # No JWT verified in this request
+        return None
+    return f"user:{identity}" if identity is not None else None
+
+
+# --- 2. ROUTING SESSION ---
+
+class RoutingSession(FlaskSession):
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        if bind is None and not self._flushing and isinstance(clause, Select) \
+                and has_app_context() and g.get("db_replica"):
+            return self._db.engines[g.db_replica]
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+
+
+def read_replica(*tables):
+    # Put below @jwt_required, so token checks (revocation!) always read the primary
+    # and the current user is known when choosing where to read from
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            replicas = current_app.config.get("REPLICA_BIND_KEYS")
+            if replicas:
+                g.db_replica = _choose_replica(replicas, tables)
+            return view(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def _choose_replica(replicas, tables):
+    tolerance = current_app.config.get("REPLICA_LAG_TOLERANCE", 2)
+    if tolerance < 0:
+        return None  # Replicas disabled for reads
+    keys = [f"table:{table}" for table in tables]
+    user_key = _current_user_key()
+    if user_key:
+        keys.append(user_key)
+    if keys:
+        recent = get_recent_writes()
+        cutoff = time.time() - tolerance
+        if any(recent.last(key) > cutoff for key in keys):
+            return None  # Read your (or a listed table's) writes from the primary
+    return random.choice(replicas)
+
+
+# --- 3. RECORDING WRITES (ORM flushes and core INSERT/UPDATE/DELETE through the session) ---
+
+@event.listens_for(Session, "after_flush")
+def _tables_flushed(session, flush_context):
+    tables = session.info.setdefault("written_tables", set())
+    for obj in list(session.new) + list(session.dirty) + list(session.deleted):
+        table = getattr(obj, "__table__", None)
+        if table is not None:
+            tables.add(table.name)
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _tables_executed(orm_execute_state):
+    if orm_execute_state.is_insert or orm_execute_state.is_update or orm_execute_state.is_delete:
+        table = getattr(orm_execute_state.statement, "table", None)
+        if table is not None:
+            orm_execute_state.session.info.setdefault("written_tables", set()).add(table.name)
+
+
+@event.listens_for(Session, "after_commit")
+def _mark_recent_writes(session):
+    tables = session.info.pop("written_tables", None)
+    if not tables or not has_app_context() or not current_app.config.get("REPLICA_BIND_KEYS"):
+        return
+    recent = get_recent_writes()
+    now = time.time()
+    for table in tables:
+        recent.mark(f"table:{table}", now)
+    user_key = _current_user_key() if has_request_context() else None
+    if user_key:
+        recent.mark(user_key, now)
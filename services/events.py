@@ -0,0 +1,325 @@
+import logging
+import queue
+import threading
+import time
+from datetime import datetime, timedelta
+
+from flask import current_app, has_app_context
+from sqlalchemy import event, func, insert
+from sqlalchemy.orm import Session
+
+from models import db, ApplicationEvent
+from services.generations import get_generations
+
+logger = logging.getLogger(__name__)
+
+# Push notifications for seekers (status changes) and employers (new applicants), sent
+# as server-sent events from GET /applications/events.
+#
+# Events are rows in application_events, written in the same transaction as the change
+# they describe, so an event exists exactly when the change committed and a client that
+# reconnects with Last-Event-ID is replayed whatever it missed. After the commit a
+# broker wakes the event hub of every worker; each hub reads the new rows once and fans
+# them out to the streams open in that worker. Brokers: 'shared' (a generation counter,
+# see services/generations.py: every worker on this host), 'local' (this process only),
+# or any object with notify(), version() and wait(version, timeout) set in config.
+
+GENERATION = "application_events"
+
+# Event ids a stream id can list beyond its watermark (see event_stream)
+MAX_ACKED_IDS = 64
+
+
+# --- 1. PUBLISHING ---
+
+def record_events(events):
+    # events: [(recipient user id, type, payload dict)], inserted in the current transaction
+    if not events:
+        return
+    dumps = current_app.json.dumps
+    db.session.execute(insert(ApplicationEvent), [
+        {"user_id": int(user_id), "type": type_, "data": dumps(payload)} for user_id, type_, payload in events
+    ])
+    db.session.info['application_events_pending'] = True
+
+
+@event.listens_for(Session, 'after_commit')
+def _notify_after_commit(session):
+    if session.info.pop('application_events_pending', False) and has_app_context():
+        get_event_broker().notify()
+
+
+@event.listens_for(Session, 'after_rollback')
+def _forget_after_rollback(session):
+    session.info.pop('application_events_pending', None)
+
+
+def prune_events():
+    # Clients offline for longer than EVENTS_RETENTION refetch instead of replaying
+    cutoff = datetime.utcnow() - current_app.config.get("EVENTS_RETENTION", timedelta(days=7))
+    deleted = ApplicationEvent.query.filter(ApplicationEvent.created_at < cutoff).delete(synchronize_session=False)
+    db.session.commit()
+    return deleted
+
+
+# --- 2. BROKERS (wake the hubs of other workers) ---
+
+class LocalEventBroker:
+    # Process-local stand-in: the dev server, tests and single-worker deployments
+    def __init__(self):
+        self.counter = 0
+        self.condition = threading.Condition()
+
+    def version(self):
+        return self.counter
+
+    def notify(self):
+        with self.condition:
+            self.counter += 1
+            self.condition.notify_all()
+
+    def wait(self, version, timeout):
+        with self.condition:
+            self.condition.wait_for(lambda: self.counter != version, timeout)
+            return self.counter
+
+
+class GenerationEventBroker(LocalEventBroker):
+    # Every worker on this host: notify() bumps a shared generation that each hub polls
+    # every `poll_interval` seconds (a memory read); this worker's own hub is woken at once
+    def __init__(self, generations, poll_interval=0.25):
+        super().__init__()
+        self.generations = generations
+        self.poll_interval = poll_interval
+
+    def version(self):
+        return self.generations.get(GENERATION), self.counter
+
+    def notify(self):
+        self.generations.bump(GENERATION)
+        super().notify()
+
+    def wait(self, version, timeout):
+        deadline = time.monotonic() + timeout
+        while True:
+            current = self.version()
+            remaining = deadline - time.monotonic()
+            if current != version or remaining <= 0:
+                return current
+            with self.condition:
+                self.condition.wait(min(self.poll_interval, remaining))
+
+
+def get_event_broker():
+    broker = current_app.extensions.get("event_broker")
+    if broker is None:
+        backend = current_app.config.get("EVENTS_BROKER", "shared")
+        if backend == "local":
+            broker = LocalEventBroker()
+        elif backend == "shared":
+            broker = GenerationEventBroker(get_generations(), current_app.config.get("EVENTS_POLL_INTERVAL", 0.25))
+        elif isinstance(backend, str):
+            raise ValueError(f"Unknown EVENTS_BROKER: {backend!r}")
+        else:
+            broker = backend
+        broker = current_app.extensions.setdefault("event_broker", broker)
+    return broker
+
+
+# --- 3. PER-WORKER HUB (one reader thread, fan-out to the open streams) ---
+
+class Subscription:
+    def __init__(self, user_id, queue_size):
+        self.user_id = user_id
+        self.queue = queue.Queue(queue_size)
+        self.dropped = False  # Fell behind; the stream ends and the client resumes from its Last-Event-ID
+
+
+class EventHub:
+    def __init__(self, app, broker, max_streams=1000, queue_size=100, batch_size=500,
+                 gap_timeout=5.0, idle_poll=30.0, prune_interval=3600):
+        self.app = app
+        self.broker = broker
+        self.max_streams = max_streams
+        self.queue_size = queue_size
+        self.batch_size = batch_size
+        self.gap_timeout = gap_timeout
+        self.idle_poll = idle_poll
+        self.prune_interval = prune_interval
+        self.subscribers = {}  # user id -> set of Subscription
+        self.streams = 0
+        self.last_id = None
+        # Ids skipped by the reader: an earlier transaction may still commit them
+        # (auto-increment order is not commit order on MySQL); given up after gap_timeout
+        self.gaps = {}
+        self.last_pruned = time.monotonic()
+        self.lock = threading.Lock()
+
+    def subscribe(self, user_id):
+        # (subscription, cursor, watermark): every event above `cursor`, and every late
+        # one from a gap below it, reaches the subscription; every event up to
+        # `watermark` has committed (or been given up on). (None, None, None) when this
+        # worker already holds max_streams streams.
+        with self.lock:
+            if self.streams >= self.max_streams:
+                return None, None, None
+            if self.last_id is None:
+                self.last_id = db.session.query(func.max(ApplicationEvent.id)).scalar() or 0
+                threading.Thread(target=self._run, daemon=True).start()
+            subscription = Subscription(int(user_id), self.queue_size)
+            self.subscribers.setdefault(subscription.user_id, set()).add(subscription)
+            self.streams += 1
+            return subscription, self.last_id, self._watermark()
+
+    def _watermark(self):
+        # Every event up to this id has been fanned out or given up on
+        return min(min(self.gaps) - 1, self.last_id) if self.gaps else self.last_id
+
+    def unsubscribe(self, subscription):
+        with self.lock:
+            subscriptions = self.subscribers.get(subscription.user_id)
+            if subscriptions and subscription in subscriptions:
+                subscriptions.discard(subscription)
+                self.streams -= 1
+                if not subscriptions:
+                    del self.subscribers[subscription.user_id]
+
+    def _run(self):
+        version = self.broker.version()
+        while True:
+            version = self.broker.wait(version, 1.0 if self.gaps else self.idle_poll)
+            with self.app.app_context():
+                try:
+                    self._dispatch()
+                    if time.monotonic() - self.last_pruned >= self.prune_interval:
+                        self.last_pruned = time.monotonic()
+                        prune_events()
+                except Exception:
+                    logger.exception("Dispatching application events failed")
+                finally:
+                    db.session.remove()
+
+    def _dispatch(self):
+        since = min(self.gaps) - 1 if self.gaps else self.last_id
+        while True:
+            rows = db.session.query(ApplicationEvent.id, ApplicationEvent.user_id,
+                                    ApplicationEvent.type, ApplicationEvent.data) \
+                .filter(ApplicationEvent.id > since) \
+                .order_by(ApplicationEvent.id) \
+                .limit(self.batch_size) \
+                .all()
+            now = time.monotonic()
+            with self.lock:
+                for row in rows:
+                    if row.id <= self.last_id:
+                        if self.gaps.pop(row.id, None) is None:
+                            continue  # Already sent
+                    else:
+                        for missing in range(self.last_id + 1, min(row.id, self.last_id + 1 + self.batch_size)):
+                            self.gaps[missing] = now
+                        self.last_id = row.id
+                    self._fan_out(row, self._watermark())
+                for gap, seen in list(self.gaps.items()):
+                    if now - seen > self.gap_timeout:
+                        del self.gaps[gap]
+            if len(rows) < self.batch_size:
+                return
+            since = rows[-1].id
+
+    def _fan_out(self, row, watermark):
+        for subscription in self.subscribers.get(row.user_id, ()):
+            if subscription.dropped:
+                continue
+            try:
+                subscription.queue.put_nowait((row, watermark))
+            except queue.Full:
+                subscription.dropped = True
+
+
+def get_event_hub():
+    hub = current_app.extensions.get("event_hub")
+    if hub is None:
+        config = current_app.config
+        hub = EventHub(
+            current_app._get_current_object(),
+            get_event_broker(),
+            config.get("EVENTS_MAX_STREAMS", 1000),
+            config.get("EVENTS_QUEUE_SIZE", 100),
+        )
+        hub = current_app.extensions.setdefault("event_hub", hub)
+    return hub
+
+
+# --- 4. SSE STREAM ---
+
+def replay(user_id, after_id, up_to_id, limit):
+    # Events the client missed, oldest first, or None when there are more than `limit`
+    rows = db.session.query(ApplicationEvent.id, ApplicationEvent.user_id,
+                            ApplicationEvent.type, ApplicationEvent.data) \
+        .filter(ApplicationEvent.user_id == user_id,
+                ApplicationEvent.id > after_id,
+                ApplicationEvent.id <= up_to_id) \
+        .order_by(ApplicationEvent.id) \
+        .limit(limit + 1) \
+        .all()
+    return rows if len(rows) <= limit else None
+
+
+def parse_event_id(value):
+    # Last-Event-ID "12" or "12.15.17" -> (12, {15, 17}); ValueError when malformed
+    watermark, *acked = value.split(".")
+    return int(watermark), {int(event_id) for event_id in acked[:MAX_ACKED_IDS]}
+
+
+def format_event_id(watermark, acked):
+    # Past MAX_ACKED_IDS the lowest ones are left out, which can only repeat them
+    return ".".join(str(event_id) for event_id in [watermark] + sorted(acked)[-MAX_ACKED_IDS:])
+
+
+def _message(event_id, type_, data):
+    return f"id: {event_id}\nevent: {type_}\ndata: {data}\n\n"
+
+
+def event_stream(hub, subscription, watermark, resume, replayed, retry_ms, heartbeat, max_seconds):
+    # Events commit out of id order, so "the highest id sent" would make a reconnect
+    # skip an event that commits late below it. The SSE id is a resume point instead:
+    # "W.a.b" means every event up to W was sent (or given up on), plus a and b above
+    # it. W only advances to the watermark the hub had when it queued the row being
+    # sent, which lies below every id still in a gap.
+    # `resume` is the client's (W, acked ids) and `replayed` what it missed up to the
+    # hub's `watermark`, or None when it has to refetch (too much to replay).
+    try:
+        yield f"retry: {retry_ms}\n\n"
+        start, acked = resume or (watermark, set())
+        acked = set(acked)
+        if replayed is None:
+            start, acked = watermark, set()
+            yield _message(format_event_id(start, acked), "reset", "{}")
+            replayed = []
+        for row in replayed:
+            acked.add(row.id)
+            yield _message(format_event_id(start, acked), row.type, row.data)
+        # Another worker may be ahead of this one
+        watermark = max(watermark, start)
+        acked = {event_id for event_id in acked if event_id > watermark}
+        yield _message(format_event_id(watermark, acked), "ready", "{}")
+
+        deadline = time.monotonic() + max_seconds
+        while not subscription.dropped:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break  # Ends the stream now and then; the client reconnects with a fresh token check
+            try:
+                row, row_watermark = subscription.queue.get(timeout=min(heartbeat, remaining))
+            except queue.Empty:
+                yield ": keep-alive\n\n"
+                continue
+            if row.id <= watermark or row.id in acked:
+                continue  # Already sent, or replayed
+            acked.add(row.id)
+            if row_watermark > watermark:
+                watermark = row_watermark
+                acked = {event_id for event_id in acked if event_id > watermark}
+            yield _message(format_event_id(watermark, acked), row.type, row.data)
+    finally:
+        hub.unsubscribe(subscription)
@@ -0,0 +1,72 @@
+import mmap
+import os
+import threading
+
+from flask import current_app
+
+# Generation counters let caches in every worker notice that something changed
+# (a logout, a new job posting) without asking the database on each request.
+# A cache remembers the generation it was filled under and refills when it moves.
+
+
+class LocalGenerations:
+    # Process-local stand-in: fine for a single worker, the dev server and tests
+    def __init__(self):
+        self.values = {}
+        self.lock = threading.Lock()
+
+    def get(self, name):
+        return self.values.get(name, 0)
+
+    def bump(self, name):
+        with self.lock:
+            self.values[name] = self.values.get(name, 0) + 1
+
+
+class SharedGenerations:
+    # Shared by every worker process on this host through small memory-mapped files.
+    # Reading is a plain memory access; bumping writes a fresh random value, so no
+    # cross-process locking is needed and any change is visible to all workers at once.
+    SLOT_SIZE = 8
+
+    def __init__(self, directory):
+        self.directory = directory
+        self.slots = {}
+        self.lock = threading.Lock()
+        os.makedirs(directory, exist_ok=True)
+
+    def _slot(self, name):
+        slot = self.slots.get(name)
+        if slot is None:
+            with self.lock:
+                slot = self.slots.get(name)
+                if slot is None:
+                    path = os.path.join(self.directory, f"{name}.gen")
+                    fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o600)
+                    try:
+                        if os.fstat(fd).st_size < self.SLOT_SIZE:
+                            os.ftruncate(fd, self.SLOT_SIZE)
+                        slot = mmap.mmap(fd, self.SLOT_SIZE)
+                    finally:
+                        os.close(fd)
+                    self.slots[name] = slot
+        return slot
+
+    def get(self, name):
+        return int.from_bytes(self._slot(name)[:self.SLOT_SIZE], "little")
+
+    def bump(self, name):
+        self._slot(name)[:self.SLOT_SIZE] = os.urandom(self.SLOT_SIZE)
+
+
+def get_generations():
+    generations = current_app.extensions.get("generations")
+    if generations is None:
+        if current_app.config.get("GENERATION_BACKEND", "shared") == "local":
+            generations = LocalGenerations()
+        else:
+            directory = current_app.config.get("GENERATION_DIR") \
+                or os.path.join(current_app.instance_path, "generations")
+            generations = SharedGenerations(directory)
+        generations = current_app.extensions.setdefault("generations", generations)
+    return generations
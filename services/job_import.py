@@ -0,0 +1,168 @@
+import csv
+import io
+import time
+
+from flask import current_app
+from sqlalchemy import insert
+from sqlalchemy.exc import IntegrityError
+
+from models import db, Job
+
+# Bulk job import (POST /jobs/import). The upload is parsed as a stream, one row at a
+# time, and valid rows are written in batches: one SELECT for the external keys the
+# batch already has, then one multi-row INSERT for the rest, then a commit. A re-import
+# skips every posting whose external_key this employer already imported, so running
+# the same nightly sync twice changes nothing. Existing postings are never modified
+# (the search and recommendation indexes rely on jobs being append-only).
+
+FIELDS = ("external_key", "title", "description", "location")
+MAX_LENGTHS = {"external_key": 100, "title": 100, "location": 100}
+
+
+class ImportFormatError(ValueError):
+    pass
+
+
+def parse_csv(stream):
+    # Header row naming the FIELDS columns (any order, extra columns ignored)
+    text = io.TextIOWrapper(stream, encoding="utf-8-sig", newline="")
+    reader = csv.DictReader(text)
+    try:
+        if reader.fieldnames is None:
+            return
+    except (csv.Error, UnicodeDecodeError) as e:
+        raise ImportFormatError(f"Malformed CSV header: {e}")
+    missing = {"external_key", "title", "description"} - {name.strip() for name in reader.fieldnames}
+    if missing:
+        raise ImportFormatError(f"Missing CSV columns: {', '.join(sorted(missing))}")
+    try:
+        for row in reader:
+            yield reader.line_num, {name.strip(): value for name, value in row.items() if name}
+    except (csv.Error, UnicodeDecodeError) as e:
+        # The rest of the file cannot be parsed reliably
+        yield reader.line_num, ImportFormatError(f"Malformed CSV: {e}")
+
+
+def parse_ndjson(stream):
+    # One JSON object per line; a bad line is reported and the rest still imported
+    loads = current_app.json.loads
+    line_no = 0
+    try:
+        for line_no, line in enumerate(io.TextIOWrapper(stream, encoding="utf-8-sig"), 1):
+            if not line.strip():
+                continue
+            try:
+                record = loads(line)
+            except ValueError:
+                yield line_no, ImportFormatError("Invalid JSON")
+                continue
+            yield line_no, record if isinstance(record, dict) else ImportFormatError("Expected a JSON object")
+    except UnicodeDecodeError as e:
+        # The rest of the file cannot be decoded reliably
+        yield line_no + 1, ImportFormatError(f"Malformed NDJSON: {e}")
+
+
+def validate(record):
+    # (row values, None) or (None, [error messages])
+    errors, row = [], {}
+    for field in FIELDS:
+        value = record.get(field)
+        if field == "external_key" and isinstance(value, int) and not isinstance(value, bool):
+            value = str(value)  # Numeric ids in NDJSON
+        if value is None:
+            value = ""
+        if not isinstance(value, str):
+            errors.append(f"{field} must be a string")
+            continue
+        value = value.strip()
+        if not value and field != "location":
+            errors.append(f"{field} is required")
+        elif field in MAX_LENGTHS and len(value) > MAX_LENGTHS[field]:
+            errors.append(f"{field} is longer than {MAX_LENGTHS[field]} characters")
+        row[field] = value
+    if errors:
+        return None, errors
+    row["location"] = row["location"] or "Remote"
+    return row, None
+
+
+class JobImport:
+    def __init__(self, employer_id, batch_size=500, max_errors=1000):
+        self.employer_id = employer_id
+        self.batch_size = batch_size
+        self.max_errors = max_errors
+        self.created = self.skipped = self.failed = 0
+        self.errors = []
+        self.seen_keys = set()
+        self.batch = []
+
+    def run(self, records):
+        started = time.perf_counter()
+        rows = 0
+        for line_no, record in records:
+            rows += 1
+            if isinstance(record, Exception):
+                self._error(line_no, None, [str(record)])
+                continue
+            row, errors = validate(record)
+            if errors:
+                self._error(line_no, record.get("external_key"), errors)
+            elif row["external_key"] in self.seen_keys:
+                self._error(line_no, row["external_key"], ["Duplicate external_key in this upload"])
+            else:
+                self.seen_keys.add(row["external_key"])
+                self.batch.append((line_no, row))
+                if len(self.batch) >= self.batch_size:
+                    self._flush()
+        self._flush()
+        elapsed = time.perf_counter() - started
+        return {
+            "rows": rows,
+            "created": self.created,
+            "skipped": self.skipped,  # Already imported earlier (same external_key)
+            "failed": self.failed,
+            "errors": self.errors,
+            "errors_truncated": self.failed > len(self.errors),
+            "seconds": round(elapsed, 3),
+            "rows_per_second": round(rows / elapsed) if elapsed else rows
+        }
+
+    def _error(self, line_no, external_key, messages):
+        self.failed += 1
+        if len(self.errors) < self.max_errors:
+            self.errors.append({"line": line_no, "external_key": external_key, "errors": messages})
+
+    def _flush(self):
+        if not self.batch:
+            return
+        try:
+            with db.session.begin_nested():
+                self._write(self.batch)
+        except IntegrityError:
+            # Another import for this employer inserted some of these keys meanwhile:
+            # write the batch row by row and report the rows that still collide
+            for line_no, row in self.batch:
+                try:
+                    with db.session.begin_nested():
+                        self._write([(line_no, row)])
+                except IntegrityError:
+                    self._error(line_no, row["external_key"], ["external_key was imported concurrently"])
+        db.session.commit()
+        self.batch = []
+
+    def _write(self, batch):
+        keys = [row["external_key"] for _, row in batch]
+        existing = {
+            key for (key,) in db.session.query(Job.external_key)
+            .filter(Job.employer_id == self.employer_id, Job.external_key.in_(keys))
+        }
+        new_rows = [
+            dict(row, employer_id=self.employer_id) for _, row in batch if row["external_key"] not in existing
+        ]
+        if new_rows:
+            # executemany of one INSERT: PyMySQL sends it as multi-row INSERT ... VALUES
+            # statements, SQLite reuses one prepared statement. Compiling a literal
+            # multi-VALUES statement per batch measured several times slower.
+            db.session.execute(insert(Job), new_rows)
+        self.created += len(new_rows)
+        self.skipped += len(batch) - len(new_rows)
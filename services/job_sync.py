@@ -0,0 +1,93 @@
+import threading
+import time
+
+from sqlalchemy import or_, select
+
+from models import db, Job
+
+# Where an in-process index (search, recommendations, autocomplete) stands in the jobs
+# table. Jobs are append-only, but an id is handed out at INSERT and only becomes visible
+# at COMMIT, so a lower id can appear after a higher one has been read (two workers
+# posting at once, a long import). Ids skipped by a read are kept as gaps and asked for
+# again on every sync until they show up or gap_timeout passes (a rolled-back insert
+# leaves a gap that never fills).
+GAP_TIMEOUT = 300.0
+MAX_GAPS = 10000
+
+
+class JobSyncCursor:
+    def __init__(self, gap_timeout=GAP_TIMEOUT, max_gaps=MAX_GAPS):
+        self.gap_timeout = gap_timeout
+        self.max_gaps = max_gaps
+        self.last_id = 0
+        self.gaps = {}  # id -> time it was first skipped
+        # Ids above last_id this worker indexed itself (index_job and friends); sync()
+        # leaves last_id alone for them, since other workers may still commit lower ids
+        self.added = set()
+        self.lock = threading.Lock()
+
+    def start(self, last_id, window=1000):
+        # After a bulk build that read everything up to last_id: the ids missing from the
+        # last `window` may still be in flight, so they become gaps
+        seen = db.session.scalars(
+            select(Job.id).where(Job.id > last_id - window, Job.id <= last_id)
+        ).all()
+        with self.lock:
+            self.last_id = max(self.last_id, last_id)
+            self._skip(max(last_id - window, 0), last_id, seen)
+
+    def add(self, job_id):
+        # A job this worker created; False when the index already has it
+        with self.lock:
+            if job_id <= self.last_id:
+                return self.gaps.pop(job_id, None) is not None
+            if job_id in self.added:
+                return False
+            self.added.add(job_id)
+            return True
+
+    def query(self, *columns):
+        # Jobs not read yet: everything above last_id and the open gaps, in id order
+        with self.lock:
+            condition = Job.id > self.last_id
+            if self.gaps:
+                condition = or_(condition, Job.id.in_(sorted(self.gaps)))
+        return db.session.query(*columns).filter(condition).order_by(Job.id)
+
+    def advance(self, rows):
+        # Rows returned by query() (id order) -> yields the ones the index does not have yet
+        for row in rows:
+            with self.lock:
+                new = self._take(row.id)
+            if new:
+                yield row
+        with self.lock:
+            self._expire()
+
+    def _take(self, job_id):
+        if job_id <= self.last_id:
+            return self.gaps.pop(job_id, None) is not None
+        self._skip(self.last_id, job_id, ())
+        self.last_id = job_id
+        if job_id in self.added:
+            self.added.discard(job_id)
+            return False
+        return True
+
+    def _skip(self, after, before, seen):
+        # Ids strictly between `after` and `before` that were not read become gaps
+        now = time.monotonic()
+        seen = set(seen)
+        for missing in range(max(after + 1, before - self.max_gaps), before):
+            if missing not in seen and missing not in self.added:
+                self.gaps.setdefault(missing, now)
+
+    def _expire(self):
+        now = time.monotonic()
+        for gap, skipped in list(self.gaps.items()):
+            if now - skipped > self.gap_timeout:
+                del self.gaps[gap]
+        # Keep the newest ones when a huge id jump opened more than max_gaps
+        if len(self.gaps) > self.max_gaps:
+            for gap in sorted(self.gaps)[:-self.max_gaps]:
+                del self.gaps[gap]
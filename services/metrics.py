@@ -0,0 +1,327 @@
+import atexit
+import glob
+import hmac
+import json
+import logging
+import os
+import threading
+import time
+
+from flask import Response, current_app, g, has_request_context, request
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+try:
+    import fcntl
+except ImportError:  # Windows: dead-worker files are simply kept
+    fcntl = None
+
+slow_query_logger = logging.getLogger("sql.slow")
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+ARCHIVE_FILE = "archived.json"
+
+HELP = {
+    "http_request_duration_seconds": ("histogram", "Request latency by endpoint, method and status"),
+    "http_request_sql_queries_total": ("counter", "SQL statements run while serving requests"),
+    "http_request_sql_seconds_total": ("counter", "Time spent in SQL statements while serving requests"),
+    "http_request_slow_queries_total": ("counter", "SQL statements slower than SLOW_QUERY_MS"),
+    "http_request_bytes_total": ("counter", "Request body bytes received (uploads)"),
+    "http_response_bytes_total": ("counter", "Response body bytes sent (downloads)"),
+}
+
+
+# --- 1. PER-PROCESS REGISTRY ---
+
+class MetricsRegistry:
+    # Each worker keeps its own counters in memory (a dict update per request) and
+    # writes a snapshot to <directory>/<pid>.json at most every `flush_interval`
+    # seconds. A scrape of /metrics lands on one worker, which sums every worker's
+    # snapshot, so the numbers cover the whole gunicorn master and not just that pid.
+    def __init__(self, directory, buckets=DEFAULT_BUCKETS, flush_interval=5):
+        self.directory = directory
+        self.buckets = tuple(buckets)
+        self.flush_interval = flush_interval
+        self.counters = {}    # (name, labels) -> value
+        self.histograms = {}  # (name, labels) -> [count per bucket..., +Inf, sum]
+        self.lock = threading.Lock()
+        self.last_flush = 0
+        os.makedirs(directory, exist_ok=True)
+        atexit.register(self.flush)  # Last counts of a worker that is shutting down
+
+    def inc(self, name, labels, amount=1):
+        key = (name, labels)
+        with self.lock:
+            self.counters[key] = self.counters.get(key, 0) + amount
+
+    def observe(self, name, labels, value):
+        key = (name, labels)
+        index = len(self.buckets)
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                index = i
+                break
+        with self.lock:
+            row = self.histograms.get(key)
+            if row is None:
+                row = self.histograms[key] = [0] * (len(self.buckets) + 2)
+            row[index] += 1
+            row[-1] += value
+
+    def snapshot(self):
+        with self.lock:
+            return _as_snapshot(self.buckets, self.counters, self.histograms)
+
+    def maybe_flush(self):
+        if time.monotonic() - self.last_flush >= self.flush_interval:
+            self.flush()
+
+    def flush(self):
+        self.last_flush = time.monotonic()
+        _write_json(os.path.join(self.directory, f"{os.getpid()}.json"), self.snapshot())
+
+    def collect(self):
+        # Sum of every worker's latest snapshot, this one included
+        self.flush()
+        self._archive_dead_workers()
+        counters, histograms = {}, {}
+        for path in glob.glob(os.path.join(self.directory, "*.json")):
+            snapshot = _read_json(path)
+            if not snapshot or tuple(snapshot.get("buckets", ())) != self.buckets:
+                continue
+            _merge(counters, histograms, snapshot)
+        return counters, histograms
+
+    def _archive_dead_workers(self):
+        # Fold snapshots of exited workers into one file so their counts are not lost
+        # (Prometheus counters must not go backwards) and files do not pile up
+        if fcntl is None:
+            return
+        with open(os.path.join(self.directory, ".lock"), "w") as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            archive_path = os.path.join(self.directory, ARCHIVE_FILE)
+            archive = None
+            for path in glob.glob(os.path.join(self.directory, "*.json")):
+                pid = os.path.basename(path)[:-len(".json")]
+                if not pid.isdigit() or _alive(int(pid)):
+                    continue
+                snapshot = _read_json(path)
+                if snapshot and tuple(snapshot.get("buckets", ())) == self.buckets:
+                    if archive is None:
+                        archive = ({}, {})
+                        existing = _read_json(archive_path)
+                        if existing:
+                            _merge(archive[0], archive[1], existing)
+                    _merge(archive[0], archive[1], snapshot)
+                    # Archive first, then delete: a crash in between double counts
+                    # one worker rather than losing it
+                    _write_json(archive_path, _as_snapshot(self.buckets, *archive))
+                os.remove(path)
+
+    def render(self):
+        counters, histograms = self.collect()
+        lines = []
+        by_name = {}
+        for (name, labels), value in counters.items():
+            by_name.setdefault(name, []).append((labels, value))
+        for (name, labels), row in histograms.items():
+            by_name.setdefault(name, []).append((labels, row))
+
+        for name in sorted(by_name):
+            kind, help_text = HELP.get(name, ("untyped", name))
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {kind}")
+            for labels, value in sorted(by_name[name], key=lambda item: item[0]):
+                if kind != "histogram":
+                    lines.append(f"{name}{_labels(labels)} {_number(value)}")
+                    continue
+                cumulative = 0
+                for bound, count in zip(self.buckets + ("+Inf",), value[:-1]):
+                    cumulative += count
+                    le = bound if bound == "+Inf" else _number(bound)
+                    lines.append(f"{name}_bucket{_labels(labels + (('le', le),))} {cumulative}")
+                lines.append(f"{name}_sum{_labels(labels)} {_number(value[-1])}")
+                lines.append(f"{name}_count{_labels(labels)} {cumulative}")
+        return "\n".join(lines) + "\n"
+
+
+def _as_snapshot(buckets, counters, histograms):
+    return {
+        "buckets": list(buckets),
+        "counters": [[name, list(labels), value] for (name, labels), value in counters.items()],
+        "histograms": [[name, list(labels), list(row)] for (name, labels), row in histograms.items()],
+    }
+
+
+def _merge(counters, histograms, snapshot):
+    for name, labels, value in snapshot.get("counters", ()):
+        key = (name, tuple(tuple(pair) for pair in labels))
+        counters[key] = counters.get(key, 0) + value
+    for name, labels, row in snapshot.get("histograms", ()):
+        key = (name, tuple(tuple(pair) for pair in labels))
+        total = histograms.get(key)
+        histograms[key] = row if total is None else [a + b for a, b in zip(total, row)]
+
+
+def _alive(pid):
+    if pid == os.getpid():
+        return True
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def _write_json(path, data):
+    # Write then rename, so a concurrent reader never sees half a file
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(data, f, separators=(",", ":"))
+    os.replace(tmp_path, path)
+
+
+def _read_json(path):
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def _labels(labels):
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{key}="{_escape(value)}"' for key, value in labels) + "}"
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _number(value):
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+def get_metrics():
+    registry = current_app.extensions.get("metrics")
+    if registry is None:
+        config = current_app.config
+        directory = config.get("METRICS_DIR") or os.path.join(current_app.instance_path, "metrics")
+        registry = MetricsRegistry(
+            directory,
+            config.get("METRICS_BUCKETS", DEFAULT_BUCKETS),
+            config.get("METRICS_FLUSH_INTERVAL", 5),
+        )
+        registry = current_app.extensions.setdefault("metrics", registry)
+    return registry
+
+
+# --- 2. SQL TIMING (attributed to the request that ran the statement) ---
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("metrics_started", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    started = conn.info.get("metrics_started")
+    if not started:
+        return
+    elapsed = time.perf_counter() - started.pop()
+    if not has_request_context():
+        return
+    g.sql_seconds = g.get("sql_seconds", 0.0) + elapsed
+    threshold = current_app.config.get("SLOW_QUERY_MS", 250)
+    if threshold is not None and elapsed * 1000 >= threshold:
+        g.slow_queries = g.get("slow_queries", 0) + 1
+        slow_query_logger.warning("Slow query (%.1f ms) in %s: %s", elapsed * 1000, _endpoint(), " ".join(statement.split()))
+
+
+def _endpoint():
+    # Route names only (never raw paths), so label cardinality stays bounded
+    return request.endpoint or "unmatched"
+
+
+class _CountedBody:
+    # Wraps a streamed response body (NDJSON exports, archives, SSE), whose size is
+    # unknown in after_request, and counts the bytes actually sent when it is closed
+    def __init__(self, response, registry, labels):
+        self.body = response.response
+        self.chunks = response.iter_encoded()
+        self.registry = registry
+        self.labels = labels
+        self.sent = 0
+
+    def __iter__(self):
+        for chunk in self.chunks:
+            self.sent += len(chunk)
+            yield chunk
+
+    def close(self):
+        try:
+            if hasattr(self.body, "close"):
+                self.body.close()
+        finally:
+            if self.sent:
+                self.registry.inc("http_response_bytes_total", self.labels, self.sent)
+            self.registry.maybe_flush()
+
+
+def _is_local(address):
+    return address in ("127.0.0.1", "::1") or (address or "").startswith("127.")
+
+
+# --- 3. FLASK WIRING ---
+
+def install_metrics(app):
+    if not app.config.get("METRICS_ENABLED", True):
+        return
+
+    if not event.contains(Engine, "before_cursor_execute", _before_cursor_execute):
+        event.listen(Engine, "before_cursor_execute", _before_cursor_execute)
+        event.listen(Engine, "after_cursor_execute", _after_cursor_execute)
+
+    @app.before_request
+    def _start_timer():
+        g.metrics_started = time.perf_counter()
+
+    @app.after_request
+    def _record_request(response):
+        started = g.pop("metrics_started", None)
+        if started is None:
+            return response
+        endpoint = _endpoint()
+        registry = get_metrics()
+        registry.observe("http_request_duration_seconds",
+                         (("endpoint", endpoint), ("method", request.method), ("status", str(response.status_code))),
+                         time.perf_counter() - started)
+        labels = (("endpoint", endpoint),)
+        statements = g.get("sql_statements", 0)
+        if statements:
+            registry.inc("http_request_sql_queries_total", labels, statements)
+            registry.inc("http_request_sql_seconds_total", labels, g.get("sql_seconds", 0.0))
+        if g.get("slow_queries"):
+            registry.inc("http_request_slow_queries_total", labels, g.slow_queries)
+        if request.content_length:
+            registry.inc("http_request_bytes_total", labels, request.content_length)
+        if response.is_streamed and not response.direct_passthrough and request.method != "HEAD":
+            response.response = _CountedBody(response, registry, labels)
+        elif response.content_length:
+            registry.inc("http_response_bytes_total", labels, response.content_length)
+        registry.maybe_flush()
+        return response
+
+    @app.route("/metrics")
+    def metrics():
+        # Without METRICS_TOKEN only this host may scrape (endpoint names and traffic
+        # are not for everyone)
+        token = app.config.get("METRICS_TOKEN")
+        if token:
+            supplied = request.headers.get("Authorization", "")
+            if not hmac.compare_digest(supplied.encode(), f"Bearer {token}".encode()):
+                return {"msg": "Unauthorized"}, 401
+        elif not _is_local(request.remote_addr):
+            return {"msg": "Set METRICS_TOKEN to scrape /metrics from another host"}, 403
+        return Response(get_metrics().render(), mimetype="text/plain; version=0.0.4; charset=utf-8")
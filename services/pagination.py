@@ -0,0 +1,97 @@
+import base64
+import binascii
+import json
+from bisect import bisect_left, bisect_right
+
+from sqlalchemy import func, text
+
+from models import db
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+def encode_cursor(key, direction):
+    # Opaque token holding the last seen sort key and which way to page
+    raw = json.dumps({"k": list(key), "d": direction}, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(token):
+    try:
+        raw = base64.urlsafe_b64decode(token + "=" * (-len(token) % 4))
+        data = json.loads(raw)
+        key, direction = data["k"], data["d"]
+    except (binascii.Error, ValueError, KeyError, TypeError):
+        raise InvalidCursor("Invalid cursor")
+    if direction not in ("next", "prev") or not isinstance(key, list) \
+            or not all(isinstance(part, (int, float)) for part in key):
+        raise InvalidCursor("Invalid cursor")
+    return key, direction
+
+
+class KeysetPage:
+    def __init__(self, items, keys, has_next, has_prev):
+        self.items = items
+        self.has_next = has_next and bool(keys)
+        self.has_prev = has_prev and bool(keys)
+        self.next_cursor = encode_cursor(keys[-1], "next") if has_next and keys else None
+        self.prev_cursor = encode_cursor(keys[0], "prev") if has_prev and keys else None
+
+
+def keyset_by_id(query, id_column, cursor, per_page):
+    # Newest first. Each page is an indexed range seek on the primary key:
+    # no OFFSET, no COUNT(*). One extra row tells us whether another page exists.
+    key, direction = decode_cursor(cursor) if cursor else (None, "next")
+    if key is not None and len(key) != 1:
+        raise InvalidCursor("Invalid cursor")
+
+    if direction == "next":
+        if key is not None:
+            query = query.filter(id_column < key[0])
+        rows = query.order_by(id_column.desc()).limit(per_page + 1).all()
+        items = rows[:per_page]
+        has_next, has_prev = len(rows) > per_page, key is not None
+    else:
+        rows = query.filter(id_column > key[0]).order_by(id_column.asc()).limit(per_page + 1).all()
+        items = list(reversed(rows[:per_page]))
+        has_next, has_prev = True, len(rows) > per_page
+
+    keys = [(item.id,) for item in items]
+    return KeysetPage(items, keys, has_next, has_prev)
+
+
+def keyset_over_ranked(ranked, cursor, per_page):
+    # `ranked` is [(id, score)] sorted best first; the sort key is (score, id),
+    # both descending, so we bisect over the negated pairs.
+    key, direction = decode_cursor(cursor) if cursor else (None, "next")
+    order = [(-score, -job_id) for job_id, score in ranked]
+
+    if key is None:
+        start = 0
+    elif len(key) != 2:
+        raise InvalidCursor("Invalid cursor")
+    elif direction == "next":
+        start = bisect_right(order, (-key[0], -key[1]))
+    else:
+        start = max(bisect_left(order, (-key[0], -key[1])) - per_page, 0)
+
+    page = ranked[start:start + per_page]
+    keys = [(score, job_id) for job_id, score in page]
+    # Items are job ids here; the caller loads them in order
+    return KeysetPage([job_id for job_id, _ in page], keys, start + per_page < len(ranked), start > 0)
+
+
+def estimate_row_count(table_name):
+    # Cheap approximate row count, used instead of an exact COUNT(*) on large tables
+    engine = db.session.get_bind()
+    if engine.dialect.name in ("mysql", "mariadb"):
+        return db.session.execute(
+            text("SELECT TABLE_ROWS FROM information_schema.TABLES "
+                 "WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = :name"),
+            {"name": table_name},
+        ).scalar() or 0
+    # Elsewhere MAX(id) is a single index lookup; it over-counts deleted rows
+    table = db.metadata.tables[table_name]
+    return db.session.query(func.max(table.c.id)).scalar() or 0
@@ -0,0 +1,86 @@
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor, TimeoutError
+from concurrent.futures.process import BrokenProcessPool
+
+from flask import current_app
+from werkzeug.security import check_password_hash, generate_password_hash
+
+
+class HashingOverloaded(Exception):
+    # Raised instead of queueing when the hashing pool is saturated, and when a hash
+    # times out or the pool has died; routes answer 503
+    pass
+
+
+class PasswordHasher:
+    # pbkdf2 is pure CPU for hundreds of milliseconds per call. Running it on a small
+    # dedicated process pool keeps the web worker's threads (and the GIL) free for
+    # other requests, and the bounded queue turns a login storm into fast 503s
+    # instead of every worker being pinned.
+    def __init__(self, method, workers=2, max_queue=16, timeout=10):
+        self.method = method
+        self.workers = workers
+        self.timeout = timeout
+        self.slots = threading.BoundedSemaphore(max(workers, 1) + max_queue)
+        self.executor = None
+        self.pid = None
+        self.lock = threading.Lock()
+
+    def _get_executor(self):
+        # One pool per process: a pool inherited through fork is not usable
+        with self.lock:
+            if self.executor is None or self.pid != os.getpid():
+                self.executor = ProcessPoolExecutor(self.workers, mp_context=multiprocessing.get_context("spawn"))
+                self.pid = os.getpid()
+            return self.executor
+
+    def _discard_executor(self, executor):
+        with self.lock:
+            if self.executor is executor:
+                self.executor = None
+        executor.shutdown(wait=False, cancel_futures=True)
+
+    def _run(self, fn, *args):
+        if not self.slots.acquire(blocking=False):
+            raise HashingOverloaded()
+        try:
+            if self.workers <= 0:
+                return fn(*args)  # Inline mode (tests, single-threaded tools)
+            executor = self._get_executor()
+            future = executor.submit(fn, *args)
+            return future.result(timeout=self.timeout)
+        except TimeoutError as exc:
+            future.cancel()  # Only helps while it is still queued
+            raise HashingOverloaded() from exc
+        except BrokenProcessPool as exc:
+            # A pool process died (OOM killer, crash): start a fresh pool on the next call
+            self._discard_executor(executor)
+            raise HashingOverloaded() from exc
+        finally:
+            self.slots.release()
+
+    def hash(self, password):
+        return self._run(generate_password_hash, password, self.method)
+
+    def verify(self, stored_hash, password):
+        return self._run(check_password_hash, stored_hash, password)
+
+    def needs_rehash(self, stored_hash):
+        # Werkzeug stores the full method, e.g. "pbkdf2:sha256:1000000$salt$hash"
+        return stored_hash.split("$", 1)[0] != self.method
+
+
+def get_hasher():
+    hasher = current_app.extensions.get("password_hasher")
+    if hasher is None:
+        config = current_app.config
+        hasher = PasswordHasher(
+            config.get("PASSWORD_HASH_METHOD", "pbkdf2:sha256:1000000"),
+            config.get("PASSWORD_HASH_WORKERS", 2),
+            config.get("PASSWORD_HASH_MAX_QUEUE", 16),
+            config.get("PASSWORD_HASH_TIMEOUT", 10),
+        )
+        hasher = current_app.extensions.setdefault("password_hasher", hasher)
+    return hasher
@@ -0,0 +1,196 @@
+import threading
+from collections import OrderedDict
+
+from flask import current_app, has_app_context
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session
+
+from models import db, Application, Job
+from services.generations import get_generations
+
+GENERATION = "applicant_access"
+
+
+# Cached in place of an employer's applicant set when it is too large to keep
+TOO_MANY = object()
+
+
+class _LRU:
+    # Bounded by entry count and, with max_size, by the summed size of the values
+    def __init__(self, max_entries, max_size=None):
+        self.max_entries = max_entries
+        self.max_size = max_size
+        self.entries = OrderedDict()
+        self.sizes = {}
+        self.size = 0
+
+    def get(self, key):
+        value = self.entries.get(key)
+        if value is not None:
+            self.entries.move_to_end(key)
+        return value
+
+    def put(self, key, value, size=1):
+        self.size -= self.sizes.get(key, 0)
+        self.entries[key] = value
+        self.sizes[key] = size
+        self.size += size
+        self.entries.move_to_end(key)
+        self._evict()
+
+    def grow(self, key, size=1):
+        # The value of `key` got bigger in place
+        self.sizes[key] += size
+        self.size += size
+        self._evict()
+
+    def _evict(self):
+        while len(self.entries) > self.max_entries or (self.max_size is not None and self.size > self.max_size):
+            key, _ = self.entries.popitem(last=False)
+            self.size -= self.sizes.pop(key)
+
+    def clear(self):
+        self.entries.clear()
+        self.sizes.clear()
+        self.size = 0
+
+
+class ApplicantAccessIndex:
+    # Precomputed answers to "may this employer see this seeker / this job?":
+    #   employer id -> set of user ids that applied to any of the employer's jobs
+    #   job id      -> (employer id, title)
+    # The sets hold at most max_applicants ids in total. An employer with more than
+    # max_set_size applicants is cached as TOO_MANY and checked with one indexed
+    # lookup per request instead.
+    # Applications only ever add to a set, so apply_to_job updates it in place and a
+    # miss is re-checked against the database before saying no. Deleting a job can
+    # take access away, so it bumps a shared generation that empties the index in
+    # every worker.
+    def __init__(self, generations, max_employers=1024, max_jobs=10000, max_applicants=500000,
+                 max_set_size=50000):
+        self.generations = generations
+        self.max_set_size = min(max_set_size, max_applicants)
+        self.applicants = _LRU(max_employers, max_applicants)
+        self.jobs = _LRU(max_jobs)
+        self.generation = None
+        self.lock = threading.Lock()
+
+    def _check_generation(self):
+        generation = self.generations.get(GENERATION)
+        if generation != self.generation:
+            self.applicants.clear()
+            self.jobs.clear()
+            self.generation = generation
+
+    def job_info(self, job_id):
+        # (employer_id, title) for a job, or None if it does not exist
+        with self.lock:
+            self._check_generation()
+            info = self.jobs.get(job_id)
+        if info is None:
+            row = db.session.query(Job.employer_id, Job.title).filter(Job.id == job_id).first()
+            if row is None:
+                return None
+            info = (row.employer_id, row.title)
+            with self.lock:
+                self.jobs.put(job_id, info)
+        return info
+
+    def owns_job(self, employer_id, job_id):
+        info = self.job_info(job_id)
+        return info is not None and info[0] == int(employer_id)
+
+    def has_applicant(self, employer_id, seeker_id):
+        employer_id, seeker_id = int(employer_id), int(seeker_id)
+        with self.lock:
+            self._check_generation()
+            applicants = self.applicants.get(employer_id)
+            if applicants is not None and applicants is not TOO_MANY and seeker_id in applicants:
+                return True
+
+        if applicants is None:
+            rows = db.session.query(Application.user_id).join(Job, Application.job_id == Job.id) \
+                .filter(Job.employer_id == employer_id) \
+                .distinct() \
+                .limit(self.max_set_size + 1)
+            applicants = {row.user_id for row in rows}
+            if len(applicants) <= self.max_set_size:
+                with self.lock:
+                    self.applicants.put(employer_id, applicants, len(applicants))
+                return seeker_id in applicants
+            with self.lock:
+                self.applicants.put(employer_id, TOO_MANY)
+            if seeker_id in applicants:
+                return True
+
+        # Not in the cached set (the seeker may have applied through another worker), or
+        # the set is too large to cache
+        found = db.session.query(Application.id).join(Job, Application.job_id == Job.id) \
+            .filter(Application.user_id == seeker_id, Job.employer_id == employer_id) \
+            .first() is not None
+        if found:
+            self.record_application(employer_id, seeker_id)
+        return found
+
+    def record_application(self, employer_id, seeker_id):
+        # Called after an application commits
+        employer_id, seeker_id = int(employer_id), int(seeker_id)
+        with self.lock:
+            applicants = self.applicants.get(employer_id)
+            if applicants is None or applicants is TOO_MANY or seeker_id in applicants:
+                return
+            if len(applicants) >= self.max_set_size:
+                self.applicants.put(employer_id, TOO_MANY)
+                return
+            applicants.add(seeker_id)
+            self.applicants.grow(employer_id)
+
+    def invalidate(self):
+        self.generations.bump(GENERATION)
+
+
+def get_access_index():
+    index = current_app.extensions.get("applicant_access")
+    if index is None:
+        config = current_app.config
+        index = ApplicantAccessIndex(
+            get_generations(),
+            config.get("ACCESS_INDEX_MAX_EMPLOYERS", 1024),
+            config.get("ACCESS_INDEX_MAX_JOBS", 10000),
+            config.get("ACCESS_INDEX_MAX_APPLICANTS", 500000),
+            config.get("ACCESS_INDEX_MAX_SET_SIZE", 50000),
+        )
+        index = current_app.extensions.setdefault("applicant_access", index)
+    return index
+
+
+# --- Permission checks shared by the download and applicant-listing endpoints ---
+
+def can_access_resume(role, current_user_id, seeker_id):
+    if role == 'seeker':
+        # Seekers can only download their own resume
+        return int(current_user_id) == int(seeker_id)
+    if role == 'employer':
+        # Employers can download resumes of seekers who applied to one of their jobs
+        return get_access_index().has_applicant(current_user_id, seeker_id)
+    return False
+
+
+def owns_job(employer_id, job_id):
+    return get_access_index().owns_job(employer_id, job_id)
+
+
+# --- Invalidation when jobs are deleted (directly or through the employer cascade) ---
+
+@event.listens_for(Job, 'after_delete')
+def _job_deleted(mapper, connection, target):
+    session = inspect(target).session
+    if session is not None:
+        session.info['applicant_access_dirty'] = True
+
+
+@event.listens_for(Session, 'after_commit')
+def _invalidate_after_commit(session):
+    # Only after commit, so no worker can reload the old answers before the delete lands
+    if session.info.pop('applicant_access_dirty', False) and has_app_context():
+        get_access_index().invalidate()
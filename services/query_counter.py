@@ -0,0 +1,70 @@
+import threading
+from contextlib import contextmanager
+from functools import wraps
+
+from flask import current_app, g, has_app_context
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+# Statements run outside a request (CLI, tests) are counted here
+_local = threading.local()
+
+
+class QueryBudgetExceeded(AssertionError):
+    pass
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    counters = getattr(_local, "counters", None)
+    if counters:
+        for counter in counters:
+            counter.append(statement)
+    if has_app_context() and "sql_statements" in g:
+        g.sql_statements += 1
+
+
+def install_query_counter(app):
+    # Hook every engine once; counting is a list append / integer bump per statement
+    if not event.contains(Engine, "before_cursor_execute", _before_cursor_execute):
+        event.listen(Engine, "before_cursor_execute", _before_cursor_execute)
+
+    @app.before_request
+    def _start_counting():
+        g.sql_statements = 0
+
+    @app.after_request
+    def _report_count(response):
+        # Debug/test aid: expose the per-request count so N+1 regressions are visible
+        if app.debug or app.testing:
+            response.headers["X-SQL-Queries"] = str(g.get("sql_statements", 0))
+        return response
+
+
+@contextmanager
+def count_queries():
+    # with count_queries() as statements: ...; assert len(statements) <= 3
+    statements = []
+    counters = getattr(_local, "counters", None)
+    if counters is None:
+        counters = _local.counters = []
+    counters.append(statements)
+    try:
+        yield statements
+    finally:
+        counters.remove(statements)
+
+
+def query_budget(limit):
+    # Upper bound on SQL statements for one request. In debug/testing mode going over
+    # the budget fails the request, so an N+1 regression fails CI instead of production.
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            response = view(*args, **kwargs)
+            used = g.get("sql_statements", 0)
+            if used > limit and (current_app.debug or current_app.testing
+                                 or current_app.config.get("SQL_QUERY_BUDGET_STRICT")):
+                raise QueryBudgetExceeded(f"{view.__name__} ran {used} SQL statements (budget {limit})")
+            return response
+        return wrapper
+    return decorator
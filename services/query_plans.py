@@ -0,0 +1,163 @@
+from flask import current_app, has_request_context, request
+from flask_jwt_extended import create_access_token
+from sqlalchemy import event, func, select
+from sqlalchemy.engine import Engine
+
+from models import db, Application, Job, User
+
+# EXPLAIN check for the hot read paths (`flask --app app check-query-plans`). It replays
+# read-only requests through the test client, captures every SELECT they run and
+# asks the database for its plan. A full table scan that is not listed in
+# EXPECTED_SCANS fails the check, so a dropped index or a rewritten query that can no
+# longer use one is caught before it reaches production. Run it against a database
+# with realistic data (see benchmarks/generate.py); it never writes.
+
+# Databases whose plans explain() can read
+EXPLAIN_DIALECTS = ("sqlite", "mysql", "mariadb")
+
+# (endpoint, table) pairs where reading the whole table is the point. Only statements
+# without a WHERE clause qualify (see _expected_scan), so a filtered or cursor query on
+# the same endpoint that loses its index still fails the check.
+EXPECTED_SCANS = {
+    ('jobs.get_jobs', 'jobs'),      # Public listing / full export
+    ('jobs.search_jobs', 'jobs'),   # Unfiltered search pages through every job
+}
+
+
+def _hot_requests():
+    # (path, user id or None) for the GET endpoints in routes/, ids taken from the data
+    employer_id, job_id = db.session.query(Job.employer_id, Job.id).order_by(Job.id).first() or (None, None)
+    seeker_id = db.session.query(Application.user_id).order_by(Application.id).limit(1).scalar()
+    requests = [
+        ("/jobs/?page=2", None),
+        ("/jobs/search?page=2", None),
+        ("/jobs/search?title=engineer", None),
+        ("/jobs/search?title=engineer&cursor=", None),
+        ("/jobs/search?q=python+remote", None),
+    ]
+    if employer_id:
+        requests += [
+            ("/jobs/employer-dashboard", employer_id),
+            (f"/applications/job/{job_id}/applicants", employer_id),
+            (f"/applications/job/{job_id}/applicants/search?q=python", employer_id),
+        ]
+        if seeker_id:
+            requests.append((f"/applications/download-resume/{seeker_id}", employer_id))
+    if seeker_id:
+        requests += [
+            ("/applications/my-applications", seeker_id),
+            ("/jobs/recommended", seeker_id),
+            ("/seeker/download-my-resume", seeker_id),
+        ]
+    return requests
+
+
+def _write_path_queries():
+    # Lookups made by the write endpoints, which the check cannot replay
+    return [
+        ('applications.apply_to_job', select(Job.employer_id, Job.title).where(Job.id == 1)),
+        ('applications.update_application_status',
+         select(Application.id).join(Job, Application.job_id == Job.id)
+         .where(Application.id.in_([1, 2]), Job.employer_id == 1)),
+        ('applications.update_job_applications_status',
+         select(Application.id).where(Application.job_id == 1, Application.status == 'pending')),
+        ('applications.apply_to_jobs_batch',
+         select(Application.job_id).where(Application.user_id == 1, Application.job_id.in_([1, 2]))),
+        ('app_counters.adjust',
+         select(Application.job_id, Application.status, func.count(Application.id))
+         .where(Application.job_id.in_([1, 2]))
+         .group_by(Application.job_id, Application.status)),
+        ('auth.login', select(User.id).where(User.email == 'someone@example.com')),
+        ('commands.rebuild_counters',
+         select(Application.job_id, Application.status, func.count(Application.id))
+         .group_by(Application.job_id, Application.status)),
+    ]
+
+
+def capture_statements(app):
+    # (endpoint, statement, parameters) for every SELECT the hot requests run
+    captured = []
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        # Only statements run by the requests, not the id lookups made to build them
+        if has_request_context() and not executemany and statement.lstrip().upper().startswith("SELECT"):
+            captured.append((request.endpoint, statement, parameters))
+
+    client = app.test_client()
+    event.listen(Engine, "before_cursor_execute", before_cursor_execute)
+    try:
+        for path, user_id in _hot_requests():
+            headers = {}
+            if user_id:
+                role = db.session.get(User, user_id).role
+                token = create_access_token(identity=str(user_id), additional_claims={"role": role})
+                headers["Authorization"] = f"Bearer {token}"
+            client.get(path, headers=headers)
+    finally:
+        event.remove(Engine, "before_cursor_execute", before_cursor_execute)
+
+    dialect = db.engine.dialect
+    for endpoint, query in _write_path_queries():
+        compiled = query.compile(dialect=dialect, compile_kwargs={"render_postcompile": True})
+        parameters = compiled.params
+        if dialect.paramstyle == "qmark":
+            parameters = tuple(compiled.params[name] for name in compiled.positiontup)
+        captured.append((endpoint, str(compiled), parameters))
+    return captured
+
+
+def explain(statement, parameters):
+    # [(table, full_scan, detail)] for one statement
+    dialect = db.engine.dialect.name
+    with db.engine.connect() as connection:
+        if dialect == "sqlite":
+            rows = connection.exec_driver_sql("EXPLAIN QUERY PLAN " + statement, parameters).all()
+            plan = []
+            for row in rows:
+                detail = row[-1]
+                words = detail.split()
+                # "SCAN jobs" reads the whole table; "SEARCH ..." and "SCAN ... USING
+                # (COVERING) INDEX" do not, and subquery/temp steps are not tables
+                table = words[1] if len(words) > 1 else ""
+                full_scan = words[:1] == ["SCAN"] and table in db.metadata.tables and "INDEX" not in detail
+                plan.append((table, full_scan, detail))
+            return plan
+        if dialect in ("mysql", "mariadb"):
+            result = connection.exec_driver_sql("EXPLAIN " + statement, parameters)
+            min_rows = current_app.config.get("QUERY_PLAN_MIN_ROWS", 1000)
+            plan = []
+            for row in result.mappings():
+                # type=ALL is a full scan; tiny tables are scanned by choice, so ignore those
+                full_scan = row.get("type") == "ALL" and (row.get("rows") or 0) >= min_rows
+                plan.append((row.get("table") or "", full_scan,
+                             f"type={row.get('type')} key={row.get('key')} rows={row.get('rows')}"))
+            return plan
+    raise ValueError(f"No EXPLAIN support for {dialect}")
+
+
+def _expected_scan(endpoint, table, statement):
+    return (endpoint, table) in EXPECTED_SCANS and " WHERE " not in " ".join(statement.split()).upper()
+
+
+def supports_explain():
+    return db.engine.dialect.name in EXPLAIN_DIALECTS
+
+
+def check_query_plans(app, echo=print):
+    # Returns the number of unexpected full scans
+    failures = 0
+    seen = set()
+    for endpoint, statement, parameters in capture_statements(app):
+        if (endpoint, statement) in seen:
+            continue
+        seen.add((endpoint, statement))
+        for table, full_scan, detail in explain(statement, parameters):
+            if not full_scan:
+                continue
+            if _expected_scan(endpoint, table, statement):
+                echo(f"ok    {endpoint}: expected scan of {table}")
+                continue
+            failures += 1
+            echo(f"FAIL  {endpoint}: full scan of {table} ({detail})\n      {' '.join(statement.split())}")
+    echo(f"{len(seen)} statements checked, {failures} unexpected full scans")
+    return failures
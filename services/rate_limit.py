@@ -0,0 +1,245 @@
+import hashlib
+import logging
+import math
+import mmap
+import os
+import re
+import struct
+import threading
+import time
+from functools import wraps
+
+from flask import current_app, jsonify, request
+from flask_jwt_extended import get_jwt_identity, verify_jwt_in_request
+
+try:
+    import fcntl
+except ImportError:  # Windows: no byte-range locks, so the shared store is unavailable
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+# Rate limits per route (@rate_limit), checked before the view runs, so a throttled
+# request costs no database query and no password hash. Each limit is a sliding
+# window approximated from two fixed windows: the previous window's count, weighted
+# by how much of it still overlaps the sliding window, plus the current count. That is
+# O(1) time and three numbers per key.
+#
+# Counters live in a store: 'shared' (a memory-mapped slot table under
+# GENERATION_DIR, so a limit holds across every gunicorn worker on the host) or
+# 'local' (sharded dicts, per process; for the dev server and tests). Anything with
+# the same hit() method can be plugged in via RATE_LIMIT_BACKEND. Without fcntl
+# (Windows) 'shared' falls back to 'local'.
+
+
+LIMIT_PATTERN = re.compile(r"^\s*(\d+)\s*/\s*(\d*)\s*([a-z]+)\s*$")
+PERIODS = {"s": 1, "second": 1, "m": 60, "minute": 60, "h": 3600, "hour": 3600, "d": 86400, "day": 86400}
+
+
+def parse_limit(value):
+    # "10/minute", "100/hour", "5/30s" -> (count, period in seconds); empty or "0" disables
+    if not value or value.strip() in ("0", "off"):
+        return None
+    match = LIMIT_PATTERN.match(value.lower())
+    if not match or match.group(3) not in PERIODS:
+        raise ValueError(f"Invalid rate limit: {value!r}")
+    return int(match.group(1)), int(match.group(2) or 1) * PERIODS[match.group(3)]
+
+
+def _slide(window, current, previous, now, period):
+    # Roll stored (window, current, previous) forward to the window `now` falls in
+    index = int(now // period)
+    if window == index:
+        return index, current, previous
+    if window == index - 1:
+        return index, 0.0, current
+    return index, 0.0, 0.0
+
+
+def _decide(index, current, previous, now, period, limit, cost):
+    # (allowed, seconds until `cost` more would be allowed)
+    overlap = 1 - (now - index * period) / period
+    if previous * overlap + current + cost <= limit:
+        return True, 0.0
+    if current + cost <= limit and previous:
+        # The previous window's share has to decay far enough
+        needed = 1 - (limit - cost - current) / previous
+        return False, (needed - (1 - overlap)) * period
+    # Only possible once the current count has slid out as well
+    remaining = (index + 1) * period - now
+    needed = max(0.0, 1 - (limit - cost) / current) if current else 0.0
+    return False, remaining + needed * period
+
+
+# --- 1. STORES ---
+
+class LocalRateStore:
+    # Per-process counters, split over shards so concurrent threads rarely share a lock
+    def __init__(self, shards=16, max_keys_per_shard=65536):
+        self.shards = [({}, threading.Lock()) for _ in range(shards)]
+        self.max_keys_per_shard = max_keys_per_shard
+
+    def hit(self, key, limit, period, cost=1, now=None):
+        now = time.time() if now is None else now
+        counters, lock = self.shards[hash(key) % len(self.shards)]
+        with lock:
+            window, current, previous, _ = counters.get(key, (0, 0.0, 0.0, period))
+            index, current, previous = _slide(window, current, previous, now, period)
+            allowed, retry_after = _decide(index, current, previous, now, period, limit, cost)
+            if allowed:
+                current += cost
+            counters[key] = (index, current, previous, period)
+            if len(counters) > self.max_keys_per_shard:
+                self._evict(counters, now)
+        return allowed, retry_after
+
+    @staticmethod
+    def _evict(counters, now):
+        # Keys idle for two of their windows count nothing any more
+        stale = [key for key, (window, _, _, period) in counters.items() if window < int(now // period) - 1]
+        for key in stale:
+            del counters[key]
+
+
+class SharedRateStore:
+    # One memory-mapped file of fixed slots shared by every worker on the host. A key
+    # hashes to a run of PROBES slots; it takes the slot holding its fingerprint, else
+    # a stale one. When every slot in the run is busy with other keys they share the
+    # first one, which can only throttle early, never let extra requests through.
+    # Updates take a byte-range lock on the key's slots (fcntl, between processes) and
+    # a thread lock (fcntl locks do not exclude threads of one process).
+    SLOT = struct.Struct("QqddI4x")  # fingerprint, window, current, previous, period ms
+    PROBES = 4
+
+    def __init__(self, path, slots=131072):
+        self.slots = slots
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        size = self.SLOT.size * slots
+        self.fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o600)
+        if os.fstat(self.fd).st_size < size:
+            os.ftruncate(self.fd, size)
+        self.map = mmap.mmap(self.fd, size)
+        self.locks = [threading.Lock() for _ in range(64)]
+
+    def hit(self, key, limit, period, cost=1, now=None):
+        now = time.time() if now is None else now
+        digest = hashlib.blake2b(key.encode(), digest_size=8).digest()
+        fingerprint = int.from_bytes(digest, "little") or 1
+        first = fingerprint % self.slots
+        period_ms = int(period * 1000)
+        # The whole probe run is locked, so two workers cannot claim the same slot
+        offset = first * self.SLOT.size
+        length = min(self.PROBES, self.slots - first) * self.SLOT.size
+        with self.locks[first % len(self.locks)]:
+            fcntl.lockf(self.fd, fcntl.LOCK_EX, length, offset, os.SEEK_SET)
+            try:
+                slot, values, shared = self._find(first, length // self.SLOT.size, fingerprint, now)
+                owner, window, current, previous, stored_period = values
+                if not shared:
+                    if owner != fingerprint or stored_period != period_ms:
+                        window, current, previous = 0, 0.0, 0.0
+                    owner, stored_period = fingerprint, period_ms
+                index, current, previous = _slide(window, current, previous, now, period)
+                allowed, retry_after = _decide(index, current, previous, now, period, limit, cost)
+                if allowed:
+                    current += cost
+                self.SLOT.pack_into(self.map, slot * self.SLOT.size, owner, index, current, previous, stored_period)
+            finally:
+                fcntl.lockf(self.fd, fcntl.LOCK_UN, length, offset, os.SEEK_SET)
+        return allowed, retry_after
+
+    def _find(self, first, probes, fingerprint, now):
+        # (slot, stored values, shared with another key?)
+        slots = [(slot, self.SLOT.unpack_from(self.map, slot * self.SLOT.size)) for slot in range(first, first + probes)]
+        for slot, values in slots:
+            if values[0] == fingerprint:
+                return slot, values, False
+        for slot, values in slots:
+            period = values[4] / 1000
+            if not values[0] or not period or values[1] < int(now // period) - 1:
+                return slot, values, False
+        return slots[0][0], slots[0][1], True
+
+
+def get_rate_store():
+    store = current_app.extensions.get("rate_limit_store")
+    if store is None:
+        backend = current_app.config.get("RATE_LIMIT_BACKEND", "shared")
+        if backend == "shared" and fcntl is None:
+            logger.warning("RATE_LIMIT_BACKEND='shared' needs fcntl; limits are counted per process instead")
+            backend = "local"
+        if backend == "local":
+            store = LocalRateStore()
+        elif backend == "shared":
+            directory = current_app.config.get("GENERATION_DIR") \
+                or os.path.join(current_app.instance_path, "generations")
+            store = SharedRateStore(os.path.join(directory, "rate_limits.bin"))
+        elif isinstance(backend, str):
+            raise ValueError(f"Unknown RATE_LIMIT_BACKEND: {backend!r}")
+        else:
+            store = backend  # An object with hit(key, limit, period, cost), set in config
+        store = current_app.extensions.setdefault("rate_limit_store", store)
+    return store
+
+
+# --- 2. KEYS ---
+
+def client_ip():
+    # Behind a proxy, set PROXY_FIX_HOPS (create_app applies ProxyFix) so this is the client's address
+    return request.remote_addr or "unknown"
+
+
+def jwt_identity():
+    verify_jwt_in_request(optional=True)
+    identity = get_jwt_identity()
+    return f"user:{identity}" if identity is not None else f"ip:{client_ip()}"
+
+
+def json_email():
+    # The account being targeted (credential stuffing spreads over many IPs)
+    data = request.get_json(silent=True)
+    email = data.get("email") if isinstance(data, dict) else None
+    return email.strip().lower() if isinstance(email, str) and email.strip() else None
+
+
+# --- 3. DECORATOR ---
+
+def unauthorized(response):
+    return response.status_code == 401
+
+
+def rate_limit(setting, key=client_ip, charge=None):
+    # `setting` names a config entry such as RATE_LIMIT_LOGIN_IP = "10/minute"; `key`
+    # returns what is counted (IP, identity, email), or None to skip the check.
+    # With `charge` (a function of the response), only responses it accepts count,
+    # e.g. failed logins, so nobody can lock an account out by logging in as it
+    # successfully; the request is still refused once the limit is reached.
+    # Place it above the other decorators so nothing else runs for a throttled request.
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            config = current_app.config
+            policy = parse_limit(config.get(setting)) if config.get("RATE_LIMIT_ENABLED", True) else None
+            value = key() if policy else None
+            if value is None:
+                return view(*args, **kwargs)
+            limit, period = policy
+            store = get_rate_store()
+            if charge is None:
+                allowed, retry_after = store.hit(f"{setting}:{value}", limit, period)
+            else:
+                # Free peek: is there room for one more (count <= limit - 1)?
+                allowed, retry_after = store.hit(f"{setting}:{value}", limit - 1, period, cost=0)
+            if not allowed:
+                response = jsonify({"msg": "Too many requests, please retry later"})
+                response.status_code = 429
+                response.headers["Retry-After"] = str(max(1, math.ceil(retry_after)))
+                return response
+            if charge is None:
+                return view(*args, **kwargs)
+            response = current_app.make_response(view(*args, **kwargs))
+            if charge(response):
+                store.hit(f"{setting}:{value}", limit, period)
+            return response
+        return wrapper
+    return decorator
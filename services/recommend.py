@@ -0,0 +1,403 @@
+import logging
+import math
+import threading
+import time
+from array import array
+
+import numpy as np
+from flask import current_app
+from sqlalchemy import select
+
+from models import db, Application, Job
+from services.job_sync import JobSyncCursor
+from services.search import tokenize
+
+logger = logging.getLogger(__name__)
+
+# A title word counts as much as this many description words
+TITLE_WEIGHT = 2
+# Seeker profile: built from this many most recent applications, keeping the
+# strongest terms only (bounds the work per request)
+MAX_PROFILE_JOBS = 50
+MAX_PROFILE_TERMS = 64
+MIN_TOKEN_LENGTH = 2
+
+
+def term_counts(title, description):
+    counts = {}
+    for token in tokenize(title):
+        if len(token) >= MIN_TOKEN_LENGTH:
+            counts[token] = counts.get(token, 0) + TITLE_WEIGHT
+    for token in tokenize(description):
+        if len(token) >= MIN_TOKEN_LENGTH:
+            counts[token] = counts.get(token, 0) + 1
+    return counts
+
+
+# --- 1. TF-IDF MATRIX (NumPy, no database access) ---
+
+class TfidfIndex:
+    # Job postings as L2-normalised TF-IDF vectors, stored column-wise (CSC): for each
+    # term, the rows (jobs) that contain it and their weights. Scoring a profile is a
+    # sparse matrix x vector product: gather the columns of the profile's terms and
+    # sum them per row with np.bincount, then take the top k with argpartition.
+    #
+    # Postings added after a build go to a small delta (plain dicts) that is scored
+    # alongside the matrix and merged into it on a background thread once it holds
+    # `merge_threshold` jobs. IDF weights are those current when a job was added.
+    #
+    # Memory: 8 bytes per stored posting (int32 row + float32 weight), at most
+    # `max_terms` postings per job and `max_jobs` jobs (the newest are kept), plus the
+    # vocabulary dict and 8 bytes per job id. 500k jobs x 24 terms is about 100 MB.
+    def __init__(self, max_jobs=500000, max_terms=24, merge_threshold=5000):
+        self.max_jobs = max_jobs
+        self.max_terms = max_terms
+        self.merge_threshold = merge_threshold
+        self.lock = threading.RLock()
+        self.vocab = {}   # token -> term id
+        self.df = []      # term id -> number of jobs containing it
+        self.n_docs = 0
+        self.last_id = 0  # Highest job id read by build()
+        # Matrix part (replaced wholesale, never modified in place)
+        self.job_ids = np.zeros(0, np.int64)     # row -> job id, ascending
+        self.term_ptr = np.zeros(1, np.int64)    # term -> slice of post_rows/post_weights
+        self.post_rows = np.zeros(0, np.int32)
+        self.post_weights = np.zeros(0, np.float32)
+        # Delta part
+        self.delta_ids = []
+        self.delta_terms = []    # per delta job: [(term, weight)]
+        self.delta_postings = {}  # term -> [(delta index, weight)]
+        self.merging = False
+
+    def memory_bytes(self):
+        return self.job_ids.nbytes + self.term_ptr.nbytes + self.post_rows.nbytes + self.post_weights.nbytes
+
+    def _idf(self, term):
+        return math.log((1 + self.n_docs) / (1 + self.df[term])) + 1
+
+    def _term_ids(self, counts, grow):
+        ids = {}
+        for token, tf in counts.items():
+            term = self.vocab.get(token)
+            if term is None:
+                if not grow:
+                    continue
+                term = self.vocab[token] = len(self.df)
+                self.df.append(0)
+            ids[term] = tf
+        return ids
+
+    def _vector(self, tfs, limit):
+        # {term: tf} -> [(term, weight)], strongest `limit` terms, L2-normalised
+        weights = sorted(((term, (1 + math.log(tf)) * self._idf(term)) for term, tf in tfs.items()),
+                         key=lambda item: -item[1])[:limit]
+        norm = math.sqrt(sum(w * w for _, w in weights)) or 1.0
+        return [(term, w / norm) for term, w in weights]
+
+    # Building
+
+    def build(self, rows):
+        # rows: (job_id, title, description) in ascending id order
+        vocab, df = {}, []
+        coo_rows, coo_terms, coo_tf, ids = array('i'), array('i'), array('f'), array('q')
+        for row, (job_id, title, description) in enumerate(rows):
+            for token, tf in term_counts(title, description).items():
+                term = vocab.get(token)
+                if term is None:
+                    term = vocab[token] = len(df)
+                    df.append(0)
+                df[term] += 1
+                coo_rows.append(row)
+                coo_terms.append(term)
+                coo_tf.append(tf)
+            ids.append(job_id)
+
+        n_docs = len(ids)
+        rows_np = np.frombuffer(coo_rows, np.int32) if coo_rows else np.zeros(0, np.int32)
+        terms_np = np.frombuffer(coo_terms, np.int32) if coo_terms else np.zeros(0, np.int32)
+        tf_np = np.frombuffer(coo_tf, np.float32) if coo_tf else np.zeros(0, np.float32)
+        idf = (np.log((1 + n_docs) / (1 + np.asarray(df, np.float32))) + 1).astype(np.float32)
+        weights = (1 + np.log(tf_np)) * idf[terms_np] if len(tf_np) else tf_np
+        rows_np, terms_np, weights = _truncate_and_normalise(rows_np, terms_np, weights, self.max_terms, n_docs)
+        term_ptr, post_rows, post_weights = _to_csc(rows_np, terms_np, weights, len(df))
+
+        with self.lock:
+            self.vocab, self.df, self.n_docs = vocab, df, n_docs
+            self.job_ids = np.frombuffer(ids, np.int64).copy() if ids else np.zeros(0, np.int64)
+            self.term_ptr, self.post_rows, self.post_weights = term_ptr, post_rows, post_weights
+            self.delta_ids, self.delta_terms, self.delta_postings = [], [], {}
+            self.last_id = int(self.job_ids[-1]) if n_docs else 0
+
+    def add(self, job_id, title, description):
+        with self.lock:
+            if job_id <= self.last_id and (job_id in self.delta_ids or self._row_of(job_id) is not None):
+                return  # Already built; JobRecommender.cursor tracks what came after
+            tfs = self._term_ids(term_counts(title, description), grow=True)
+            for term in tfs:
+                self.df[term] += 1
+            self.n_docs += 1
+            vector = self._vector(tfs, self.max_terms)
+            index = len(self.delta_ids)
+            self.delta_ids.append(job_id)
+            self.delta_terms.append(vector)
+            for term, weight in vector:
+                self.delta_postings.setdefault(term, []).append((index, weight))
+            if len(self.delta_ids) >= self.merge_threshold and not self.merging:
+                self.merging = True
+                threading.Thread(target=self._merge, daemon=True).start()
+
+    def _row_of(self, job_id):
+        row = int(np.searchsorted(self.job_ids, job_id))
+        return row if row < len(self.job_ids) and self.job_ids[row] == job_id else None
+
+    def _merge(self):
+        try:
+            with self.lock:
+                count = len(self.delta_ids)
+                delta_ids, delta_terms = self.delta_ids[:count], self.delta_terms[:count]
+                job_ids, term_ptr = self.job_ids, self.term_ptr
+                post_rows, post_weights, n_terms = self.post_rows, self.post_weights, len(self.df)
+
+            # Matrix back to COO, append the delta, drop the oldest rows over max_jobs
+            base_terms = np.repeat(np.arange(len(term_ptr) - 1, dtype=np.int32), np.diff(term_ptr))
+            new_rows = np.repeat(np.arange(count, dtype=np.int32) + len(job_ids),
+                                 [len(vector) for vector in delta_terms])
+            new_terms = np.fromiter((term for vector in delta_terms for term, _ in vector), np.int32)
+            new_weights = np.fromiter((w for vector in delta_terms for _, w in vector), np.float32)
+            rows = np.concatenate([post_rows, new_rows])
+            terms = np.concatenate([base_terms, new_terms])
+            weights = np.concatenate([post_weights, new_weights])
+            all_ids = np.concatenate([job_ids, np.asarray(delta_ids, np.int64)])
+            if len(all_ids) > 1 and (all_ids[1:] < all_ids[:-1]).any():
+                # A local posting can be added before a lower id from another worker
+                order = np.argsort(all_ids, kind="stable")
+                position = np.empty_like(order, dtype=np.int32)
+                position[order] = np.arange(len(order), dtype=np.int32)
+                rows, all_ids = position[rows], all_ids[order]
+            excess = len(all_ids) - self.max_jobs
+            if excess > 0:
+                keep = rows >= excess
+                rows, terms, weights = rows[keep] - excess, terms[keep], weights[keep]
+                all_ids = all_ids[excess:]
+            term_ptr, post_rows, post_weights = _to_csc(rows, terms, weights, n_terms)
+
+            with self.lock:
+                self.job_ids, self.term_ptr = all_ids, term_ptr
+                self.post_rows, self.post_weights = post_rows, post_weights
+                # Jobs added while merging stay in the delta
+                self.delta_ids = self.delta_ids[count:]
+                self.delta_terms = self.delta_terms[count:]
+                self.delta_postings = {}
+                for index, vector in enumerate(self.delta_terms):
+                    for term, weight in vector:
+                        self.delta_postings.setdefault(term, []).append((index, weight))
+        except Exception:
+            logger.exception("Merging recommendation postings failed")
+        finally:
+            self.merging = False
+
+    # Querying
+
+    def profile(self, documents):
+        # Sum of the (normalised) vectors of the jobs a seeker applied to
+        with self.lock:
+            profile = {}
+            for title, description in documents:
+                tfs = self._term_ids(term_counts(title, description), grow=False)
+                for term, weight in self._vector(tfs, MAX_PROFILE_TERMS):
+                    profile[term] = profile.get(term, 0.0) + weight
+        return sorted(profile.items(), key=lambda item: -item[1])[:MAX_PROFILE_TERMS]
+
+    def recommend(self, profile, exclude_ids=(), k=10):
+        # [(job_id, score)] best first
+        if not profile:
+            return []
+        with self.lock:
+            job_ids, term_ptr = self.job_ids, self.term_ptr
+            post_rows, post_weights = self.post_rows, self.post_weights
+            delta_ids = list(self.delta_ids)
+            delta_postings = {term: list(self.delta_postings.get(term, ())) for term, _ in profile}
+
+        candidates = []
+        n_rows = len(job_ids)
+        if n_rows:
+            # One batched sparse product over every posting of every profile term
+            n_terms = len(term_ptr) - 1
+            spans = [(int(term_ptr[term]), int(term_ptr[term + 1]), weight)
+                     for term, weight in profile if term < n_terms]
+            spans = [span for span in spans if span[1] > span[0]]
+            if spans:
+                rows = np.concatenate([post_rows[start:end] for start, end, _ in spans])
+                weights = np.concatenate([post_weights[start:end] * np.float32(weight) for start, end, weight in spans])
+                scores = np.bincount(rows, weights=weights, minlength=n_rows)
+                if len(exclude_ids):
+                    excluded = np.asarray(list(exclude_ids), np.int64)
+                    positions = np.searchsorted(job_ids, excluded)
+                    positions = positions[positions < n_rows]
+                    scores[positions[np.isin(job_ids[positions], excluded)]] = 0
+                # Select among the rows that share a term only: argpartition is slow
+                # over long runs of equal (zero) scores
+                touched = np.flatnonzero(scores)
+                top = min(k, len(touched))
+                best = touched[np.argpartition(scores[touched], len(touched) - top)[len(touched) - top:]] \
+                    if top else touched
+                candidates = list(zip(job_ids[best].tolist(), scores[best].tolist()))
+
+        if delta_ids:
+            excluded = set(exclude_ids)
+            delta_scores = {}
+            for term, weight in profile:
+                for index, w in delta_postings[term]:
+                    delta_scores[index] = delta_scores.get(index, 0.0) + weight * w
+            candidates += [(delta_ids[index], score) for index, score in delta_scores.items()
+                           if delta_ids[index] not in excluded]
+
+        # Best first; newer postings win ties
+        candidates.sort(key=lambda item: (-item[1], -item[0]))
+        return candidates[:k]
+
+
+def _truncate_and_normalise(rows, terms, weights, max_terms, n_docs):
+    # Keep each job's `max_terms` strongest terms, then scale every row to unit length
+    if not len(rows):
+        return rows, terms, weights
+    order = np.lexsort((-weights, rows))
+    rows, terms, weights = rows[order], terms[order], weights[order]
+    rank = np.arange(len(rows)) - np.searchsorted(rows, rows)
+    keep = rank < max_terms
+    rows, terms, weights = rows[keep], terms[keep], weights[keep]
+    norms = np.sqrt(np.bincount(rows, weights=weights.astype(np.float64) ** 2, minlength=n_docs))
+    norms[norms == 0] = 1
+    return rows, terms, (weights / norms[rows]).astype(np.float32)
+
+
+def _to_csc(rows, terms, weights, n_terms):
+    order = np.argsort(terms, kind="stable")
+    counts = np.bincount(terms, minlength=n_terms) if len(terms) else np.zeros(n_terms, np.int64)
+    term_ptr = np.concatenate([[0], np.cumsum(counts)]).astype(np.int64)
+    return term_ptr, rows[order].astype(np.int32), weights[order].astype(np.float32)
+
+
+# --- 2. PER-WORKER RECOMMENDER (built in the background, kept in step with new jobs) ---
+
+class JobRecommender:
+    def __init__(self, app, index, sync_interval=2.0):
+        self.app = app
+        self.index = index
+        self.sync_interval = sync_interval
+        self.state = "empty"  # empty -> building -> ready
+        self.cursor = JobSyncCursor()  # Which jobs the index has, see services/job_sync.py
+        self.last_sync = 0.0
+        self.lock = threading.Lock()
+        self.sync_lock = threading.Lock()
+
+    def ensure_ready(self):
+        # Building 500k postings takes a while, so it never happens inside a request
+        with self.lock:
+            if self.state == "empty":
+                self.state = "building"
+                threading.Thread(target=self._build, daemon=True).start()
+        return self.state == "ready"
+
+    def _build(self):
+        with self.app.app_context():
+            try:
+                started = time.monotonic()
+                self.index.build(_job_rows(self.index.max_jobs))
+                self.cursor.start(self.index.last_id)
+                self.state = "ready"
+                self.last_sync = time.monotonic()
+                logger.info("Recommendation index: %s jobs, %.1f MB, built in %.1fs", len(self.index.job_ids),
+                            self.index.memory_bytes() / 2 ** 20, time.monotonic() - started)
+            except Exception:
+                logger.exception("Building the recommendation index failed")
+                self.state = "empty"
+            finally:
+                db.session.remove()
+
+    def sync(self, force=False):
+        # Pull in postings created by other workers, including ids that committed late.
+        # force reads everything new at once (after a bulk import), not one batch.
+        now = time.monotonic()
+        if not force and now - self.last_sync < self.sync_interval or not self.sync_lock.acquire(blocking=force):
+            return
+        try:
+            self.last_sync = now
+            while True:
+                rows = self.cursor.query(Job.id, Job.title, Job.description) \
+                    .limit(self.index.merge_threshold) \
+                    .all()
+                for row in self.cursor.advance(rows):
+                    self.index.add(row.id, row.title, row.description)
+                if not force or len(rows) < self.index.merge_threshold:
+                    break
+        finally:
+            self.sync_lock.release()
+
+    def add(self, job):
+        # A posting from this worker; ids from other workers may still be below it, so
+        # the cursor's last_id is left for sync() to move
+        with self.lock:
+            if self.state != "ready" or not self.cursor.add(job.id):
+                return
+        self.index.add(job.id, job.title, job.description)
+
+
+def _job_rows(max_jobs):
+    # The newest `max_jobs` postings, oldest first
+    floor = db.session.query(Job.id).order_by(Job.id.desc()).offset(max_jobs - 1).limit(1).scalar() or 0
+    query = db.session.query(Job.id, Job.title, Job.description) \
+        .filter(Job.id >= floor) \
+        .order_by(Job.id) \
+        .yield_per(5000)
+    return ((row.id, row.title, row.description) for row in query)
+
+
+def get_recommender():
+    recommender = current_app.extensions.get("job_recommender")
+    if recommender is None:
+        config = current_app.config
+        index = TfidfIndex(
+            config.get("RECOMMEND_MAX_JOBS", 500000),
+            config.get("RECOMMEND_MAX_TERMS", 24),
+            config.get("RECOMMEND_MERGE_THRESHOLD", 5000),
+        )
+        recommender = JobRecommender(current_app._get_current_object(), index,
+                                     config.get("SEARCH_SYNC_INTERVAL", 2.0))
+        recommender = current_app.extensions.setdefault("job_recommender", recommender)
+    return recommender
+
+
+def recommend_for_seeker(user_id, k=10):
+    # Returns [(job_id, score)], or None while this worker's index is still building
+    # or the seeker has not applied anywhere yet
+    recommender = get_recommender()
+    if not recommender.ensure_ready():
+        return None
+    recommender.sync()
+
+    history = db.session.query(Job.id, Job.title, Job.description) \
+        .join(Application, Application.job_id == Job.id) \
+        .filter(Application.user_id == user_id) \
+        .order_by(Application.id.desc()) \
+        .limit(MAX_PROFILE_JOBS) \
+        .all()
+    if not history:
+        return None
+    profile = recommender.index.profile((row.title, row.description) for row in history)
+    # Every job applied to is excluded, not just the MAX_PROFILE_JOBS in the profile
+    # (ids only, from the (user_id, job_id) unique index)
+    applied = db.session.scalars(select(Application.job_id).where(Application.user_id == user_id)).all()
+    return recommender.index.recommend(profile, applied, k)
+
+
+def add_job(job):
+    # Called right after create_job commits so this worker can recommend it at once
+    get_recommender().add(job)
+
+
+def add_new_jobs():
+    # Called after a bulk import commits, so this worker can recommend the new postings at once
+    recommender = get_recommender()
+    if recommender.state == "ready":
+        recommender.sync(force=True)
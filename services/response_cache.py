@@ -0,0 +1,118 @@
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from functools import wraps
+
+from flask import Response, current_app, make_response, request
+
+from services.generations import get_generations
+
+
+class ResponseCache:
+    # LRU of rendered response bodies, bounded by entry count and total bytes.
+    # Entries also expire after `ttl` seconds as a safety net; normal invalidation
+    # happens through the generation number that is part of every key.
+    def __init__(self, max_entries=1024, max_bytes=64 * 1024 * 1024, ttl=30):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.entries = OrderedDict()  # key -> (expires_at, body, mimetype, etag)
+        self.size = 0
+        self.lock = threading.Lock()
+
+    def get(self, key):
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                return None
+            if entry[0] < time.monotonic():
+                self._drop(key)
+                return None
+            self.entries.move_to_end(key)
+            return entry
+
+    def put(self, key, body, mimetype, etag):
+        if len(body) > self.max_bytes:
+            return
+        with self.lock:
+            if key in self.entries:
+                self._drop(key)
+            self.entries[key] = (time.monotonic() + self.ttl, body, mimetype, etag)
+            self.size += len(body)
+            while len(self.entries) > self.max_entries or self.size > self.max_bytes:
+                self._drop(next(iter(self.entries)))
+
+    def _drop(self, key):
+        entry = self.entries.pop(key)
+        self.size -= len(entry[1])
+
+
+def get_response_cache():
+    cache = current_app.extensions.get("response_cache")
+    if cache is None:
+        config = current_app.config
+        cache = ResponseCache(
+            config.get("RESPONSE_CACHE_MAX_ENTRIES", 1024),
+            config.get("RESPONSE_CACHE_MAX_BYTES", 64 * 1024 * 1024),
+            config.get("RESPONSE_CACHE_TTL", 30),
+        )
+        cache = current_app.extensions.setdefault("response_cache", cache)
+    return cache
+
+
+def _normalized_args(case_insensitive):
+    # Same search, same key: ?Location=berlin&title=Dev == ?title=dev&location=Berlin
+    args = []
+    for name, value in request.args.items(multi=True):
+        value = value.strip()
+        if name in case_insensitive:
+            value = value.lower()
+        args.append((name, value))
+    return tuple(sorted(args))
+
+
+def cached_response(generation, case_insensitive=(), vary=()):
+    # Cache 200 responses of a public GET view, keyed on its normalized query string.
+    # Writes that change the underlying data bump `generation`, which retires every
+    # cached page at once in all workers. Responses carry a strong ETag and answer
+    # If-None-Match with 304 Not Modified.
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            if not current_app.config.get("RESPONSE_CACHE_ENABLED", True):
+                return view(*args, **kwargs)
+
+            key = (
+                request.endpoint,
+                _normalized_args(case_insensitive),
+                tuple(request.headers.get(header, "") for header in vary),
+                get_generations().get(generation),
+            )
+            cache = get_response_cache()
+            entry = cache.get(key)
+
+            if entry is None:
+                response = make_response(view(*args, **kwargs))
+                # Streams, errors and anything not fully buffered pass straight through
+                if response.status_code != 200 or response.is_streamed or response.direct_passthrough:
+                    return response
+                body = response.get_data()
+                etag = hashlib.sha256(body).hexdigest()[:32]
+                cache.put(key, body, response.mimetype, etag)
+            else:
+                _, body, mimetype, etag = entry
+                response = Response(body, mimetype=mimetype)
+
+            response.set_etag(etag)
+            response.headers["Cache-Control"] = "public, no-cache"
+            if vary:
+                response.vary.update(vary)
+            return response.make_conditional(request)
+        return wrapper
+    return decorator
+
+
+def invalidate(generation):
+    # Call after committing a write that changes what cached views return
+    get_generations().bump(generation)
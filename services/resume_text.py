@@ -0,0 +1,228 @@
+import logging
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+
+from flask import current_app
+from sqlalchemy import func
+from sqlalchemy.exc import IntegrityError
+
+from models import db, Application, ResumeBlob, ResumeDocument, ResumeTerm, User
+from services.storage import get_storage
+from services.text_extract import extract_terms, terms_from_text
+
+logger = logging.getLogger(__name__)
+
+terms_table = ResumeTerm.__table__
+
+
+# --- 1. WORK TRACKING (one ResumeDocument row per file content) ---
+
+def register_resume(sha256):
+    # Called in the upload transaction. Content that was already extracted (the same
+    # file uploaded before, by anyone) needs no work: returns False.
+    document = db.session.get(ResumeDocument, sha256)
+    if document is None:
+        try:
+            with db.session.begin_nested():
+                db.session.add(ResumeDocument(sha256=sha256))
+        except IntegrityError:
+            return False
+        return True
+    return document.status != 'done'
+
+
+def _save_terms(sha256, terms):
+    # Idempotent: re-running an extraction replaces the terms for that content
+    db.session.execute(terms_table.delete().where(terms_table.c.sha256 == sha256))
+    if terms:
+        db.session.execute(terms_table.insert(), [{"sha256": sha256, "term": term} for term in terms])
+    document = db.session.get(ResumeDocument, sha256) or ResumeDocument(sha256=sha256)
+    document.status = 'done'
+    document.error = None
+    document.updated_at = datetime.utcnow()
+    db.session.add(document)
+    db.session.commit()
+
+
+def _record_failure(sha256, error, give_up):
+    document = db.session.get(ResumeDocument, sha256) or ResumeDocument(sha256=sha256)
+    document.attempts = (document.attempts or 0) + 1
+    document.status = 'failed' if give_up else 'pending'
+    document.error = str(error)[:255]
+    document.updated_at = datetime.utcnow()
+    db.session.add(document)
+    db.session.commit()
+
+
+# --- 2. BACKGROUND PIPELINE (bounded process pool, never blocks a web worker) ---
+
+class ExtractionPipeline:
+    # At most `max_pending` files are queued or running per web worker. When the pool
+    # is full a submission is simply left as 'pending' in resume_documents and picked
+    # up later by sweep(), which runs whenever an extraction finishes (or from
+    # `flask extract-resumes`), so upload bursts never make a request wait.
+    def __init__(self, app, workers=2, max_pending=32, max_attempts=3, retry_delay=30.0):
+        self.app = app
+        self.workers = workers
+        self.max_pending = max_pending
+        self.max_attempts = max_attempts
+        self.retry_delay = retry_delay
+        self.slots = threading.BoundedSemaphore(max_pending)
+        self.in_flight = set()
+        self.retrying = set()  # Failed, waiting for their next attempt
+        self.executor = None
+        self.pid = None
+        self.lock = threading.Lock()
+
+    def _get_executor(self):
+        # One pool per process: a pool inherited through fork is not usable
+        with self.lock:
+            if self.executor is None or self.pid != os.getpid():
+                self.executor = ProcessPoolExecutor(self.workers, mp_context=multiprocessing.get_context("spawn"))
+                self.pid = os.getpid()
+            return self.executor
+
+    def submit(self, sha256, path, attempt=1):
+        with self.lock:
+            if sha256 in self.in_flight:
+                return True
+            if not self.slots.acquire(blocking=False):
+                logger.info("Resume extraction queue full, deferring %s", sha256)
+                return False
+            self.in_flight.add(sha256)
+        try:
+            future = self._get_executor().submit(extract_terms, get_storage().abspath(path))
+        except Exception:
+            self._release(sha256)
+            raise
+        future.add_done_callback(lambda f: self._done(f, sha256, path, attempt))
+        return True
+
+    def _release(self, sha256):
+        with self.lock:
+            self.in_flight.discard(sha256)
+        self.slots.release()
+
+    def _done(self, future, sha256, path, attempt):
+        self._release(sha256)
+        with self.app.app_context():
+            try:
+                error = future.exception()
+                if error is None:
+                    _save_terms(sha256, future.result())
+                    self.sweep()
+                    return
+                give_up = attempt >= self.max_attempts
+                logger.warning("Resume extraction failed for %s (attempt %s): %s", sha256, attempt, error)
+                _record_failure(sha256, error, give_up)
+                if not give_up:
+                    self._retry_later(sha256, path, attempt + 1)
+            except Exception:
+                logger.exception("Could not record resume extraction for %s", sha256)
+            finally:
+                db.session.remove()
+
+    def _retry_later(self, sha256, path, attempt):
+        # Back off instead of failing a broken file max_attempts times in a row: the
+        # delay doubles per attempt, and sweep() leaves the document alone meanwhile
+        with self.lock:
+            self.retrying.add(sha256)
+        timer = threading.Timer(self.retry_delay * 2 ** (attempt - 2), self._retry, (sha256, path, attempt))
+        timer.daemon = True
+        timer.start()
+
+    def _retry(self, sha256, path, attempt):
+        with self.lock:
+            self.retrying.discard(sha256)
+        with self.app.app_context():
+            try:
+                self.submit(sha256, path, attempt)
+            except Exception:
+                logger.exception("Could not resubmit resume extraction for %s", sha256)
+            finally:
+                db.session.remove()
+
+    def sweep(self, limit=None):
+        # Re-submit deferred work (pending documents whose file is still referenced),
+        # continuing from the attempts already recorded
+        rows = _pending_documents(limit or self.max_pending)
+        with self.lock:
+            busy = self.in_flight | self.retrying
+        return sum(
+            1 for row in rows
+            if row.sha256 not in busy and self.submit(row.sha256, row.path, (row.attempts or 0) + 1)
+        )
+
+
+def _pending_documents(limit):
+    path = func.min(ResumeBlob.path).label('path')
+    return db.session.query(ResumeDocument.sha256, ResumeDocument.attempts, path) \
+        .join(ResumeBlob, ResumeBlob.sha256 == ResumeDocument.sha256) \
+        .filter(ResumeDocument.status == 'pending') \
+        .group_by(ResumeDocument.sha256, ResumeDocument.attempts) \
+        .limit(limit) \
+        .all()
+
+
+def extract_pending(limit=100):
+    # Synchronous catch-up for the CLI: extract deferred resumes in this process
+    done = 0
+    for row in _pending_documents(limit):
+        try:
+            _save_terms(row.sha256, extract_terms(get_storage().abspath(row.path)))
+            done += 1
+        except Exception as error:
+            db.session.rollback()
+            _record_failure(row.sha256, error, give_up=True)
+    return done
+
+
+def get_pipeline():
+    pipeline = current_app.extensions.get("resume_extraction")
+    if pipeline is None:
+        config = current_app.config
+        pipeline = ExtractionPipeline(
+            current_app._get_current_object(),
+            config.get("RESUME_EXTRACT_WORKERS", 2),
+            config.get("RESUME_EXTRACT_MAX_PENDING", 32),
+            config.get("RESUME_EXTRACT_MAX_ATTEMPTS", 3),
+            config.get("RESUME_EXTRACT_RETRY_DELAY", 30.0),
+        )
+        pipeline = current_app.extensions.setdefault("resume_extraction", pipeline)
+    return pipeline
+
+
+def queue_extraction(sha256, path):
+    # Call after the upload has committed
+    if current_app.config.get("RESUME_EXTRACT_EAGER"):
+        # Tests and one-off scripts: extract inline, no pool. The upload has already
+        # committed, so an unreadable file is recorded rather than failing the request.
+        try:
+            _save_terms(sha256, extract_terms(get_storage().abspath(path)))
+        except Exception as error:
+            db.session.rollback()
+            _record_failure(sha256, error, give_up=True)
+        return True
+    return get_pipeline().submit(sha256, path)
+
+
+# --- 3. KEYWORD SEARCH OVER A JOB'S APPLICANTS ---
+
+def search_applicants(job_id, query, columns):
+    # Applicants to `job_id` whose resume mentions every term in `query`, as rows of
+    # `columns` (labelled application/user columns, see services/serialization.py)
+    terms = terms_from_text(query or "")
+    if not terms:
+        return []
+    return db.session.query(*columns) \
+        .select_from(Application) \
+        .join(User, Application.user_id == User.id) \
+        .join(ResumeBlob, ResumeBlob.path == User.resume_path) \
+        .join(ResumeTerm, ResumeTerm.sha256 == ResumeBlob.sha256) \
+        .filter(Application.job_id == job_id, ResumeTerm.term.in_(terms)) \
+        .group_by(Application.id, *(column.element for column in columns)) \
+        .having(func.count(ResumeTerm.term) == len(terms)) \
+        .all()
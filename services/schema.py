@@ -0,0 +1,123 @@
+from sqlalchemy import and_, func, inspect, select, text
+from sqlalchemy.schema import CreateColumn
+
+from models import db, Job, FULLTEXT_INDEXES, fulltext_index_ddl
+from services import app_counters
+
+
+class DuplicateRowsError(RuntimeError):
+    # Raised before any change when a unique index would have to delete rows to be built
+    def __init__(self, duplicates):
+        self.duplicates = duplicates  # {index name: (columns, groups, extra rows, sample keys)}
+        super().__init__(f"Duplicate rows block unique indexes: {', '.join(duplicates)}")
+
+
+def sync_indexes(dedupe=False):
+    # Bring an existing database up to the columns and indexes declared in models.py.
+    # There is no migrations directory in this repo, so this is the explicit, idempotent
+    # upgrade step (`flask --app app sync-indexes`); new databases get them from init-db.
+    # Duplicate rows that block a new unique index are only deleted with dedupe=True;
+    # otherwise DuplicateRowsError reports them and nothing is changed.
+    inspector = inspect(db.engine)
+    if not dedupe:
+        duplicates = find_duplicates(inspector)
+        if duplicates:
+            raise DuplicateRowsError(duplicates)
+    changed, removed = [], 0
+    for table in db.metadata.sorted_tables:
+        if not inspector.has_table(table.name):
+            continue
+        changed += _add_missing_columns(inspector, table)
+        existing = {index['name']: index for index in inspector.get_indexes(table.name)}
+        for index in sorted(table.indexes, key=lambda index: index.name):
+            current = existing.get(index.name)
+            if current is not None and bool(current.get('unique')) == bool(index.unique):
+                continue
+            if index.unique:
+                removed += _remove_duplicates(table, [column.name for column in index.columns])
+            if current is not None:
+                index.drop(db.engine)
+            index.create(db.engine)
+            changed.append(index.name)
+    changed += _add_fulltext_indexes(inspector)
+    if removed:
+        app_counters.rebuild()
+    return changed, removed
+
+
+def _add_missing_columns(inspector, table):
+    # New nullable columns only; anything else needs a hand-written migration
+    existing = {column['name'] for column in inspector.get_columns(table.name)}
+    added = []
+    for column in table.columns:
+        if column.name in existing:
+            continue
+        if not column.nullable:
+            raise RuntimeError(f"Cannot add NOT NULL column {table.name}.{column.name} automatically")
+        spec = CreateColumn(column).compile(dialect=db.engine.dialect)
+        with db.engine.begin() as connection:
+            connection.execute(text(f"ALTER TABLE {table.name} ADD COLUMN {spec}"))
+        added.append(f"{table.name}.{column.name}")
+    return added
+
+
+def _add_fulltext_indexes(inspector):
+    # MySQL only; they are DDL in models.py rather than part of db.metadata
+    if db.engine.dialect.name not in ('mysql', 'mariadb') or not inspector.has_table(Job.__tablename__):
+        return []
+    missing = missing_fulltext_indexes(inspector)
+    if missing:
+        with db.engine.begin() as connection:
+            connection.execute(text(fulltext_index_ddl(missing)))
+    return missing
+
+
+def missing_fulltext_indexes(inspector=None):
+    existing = {index['name'] for index in (inspector or inspect(db.engine)).get_indexes(Job.__tablename__)}
+    return [name for name in FULLTEXT_INDEXES if name not in existing]
+
+
+def _pending_unique_indexes(inspector):
+    # (table, index) for unique indexes sync_indexes() would create on existing columns
+    for table in db.metadata.sorted_tables:
+        if not inspector.has_table(table.name):
+            continue
+        existing = {index['name']: index for index in inspector.get_indexes(table.name)}
+        columns = {column['name'] for column in inspector.get_columns(table.name)}
+        for index in sorted(table.indexes, key=lambda index: index.name):
+            current = existing.get(index.name)
+            if not index.unique or (current is not None and current.get('unique')):
+                continue
+            # A column added by this run holds only NULLs, which never conflict
+            if all(column.name in columns for column in index.columns):
+                yield table, index
+
+
+def find_duplicates(inspector=None, sample=5):
+    # {index name: (columns, groups, extra rows, first sample keys)} for unique indexes
+    # that cannot be built until duplicate rows are removed
+    duplicates = {}
+    for table, index in _pending_unique_indexes(inspector or inspect(db.engine)):
+        key = list(index.columns)
+        not_null = and_(*(column.is_not(None) for column in key))
+        groups = select(*key, func.count().label('n')).where(not_null).group_by(*key) \
+            .having(func.count() > 1).subquery()
+        count, extra = db.session.execute(
+            select(func.count(), func.coalesce(func.sum(groups.c.n - 1), 0))
+        ).one()
+        if count:
+            keys = db.session.execute(select(*(groups.c[column.name] for column in key)).limit(sample)).all()
+            duplicates[index.name] = ([column.name for column in key], count, extra, [tuple(row) for row in keys])
+    return duplicates
+
+
+def _remove_duplicates(table, columns):
+    # A unique index cannot be built over duplicate rows: keep the oldest (lowest id)
+    # of each group. Rows with a NULL in the key never conflict, so they are left
+    # alone. The derived table keeps MySQL from rejecting a self-referencing DELETE.
+    key = [table.c[name] for name in columns]
+    not_null = and_(*(column.is_not(None) for column in key))
+    keep = select(func.min(table.c.id).label('id')).where(not_null).group_by(*key).subquery()
+    result = db.session.execute(table.delete().where(not_null, table.c.id.not_in(select(keep.c.id))))
+    db.session.commit()
+    return result.rowcount
@@ -0,0 +1,381 @@
+import heapq
+import logging
+import math
+import re
+import threading
+import time
+from bisect import bisect_left, insort
+from collections import OrderedDict
+
+from flask import current_app
+from flask_sqlalchemy.pagination import Pagination
+from sqlalchemy import text
+
+from models import db, Job
+from services.generations import get_generations
+from services.job_sync import JobSyncCursor
+from services.schema import missing_fulltext_indexes
+
+logger = logging.getLogger(__name__)
+
+# Relative weight of a hit in each indexed field (a title match beats a description match)
+FIELD_WEIGHTS = {"title": 3.0, "location": 2.0, "description": 1.0}
+ALL_FIELDS = ("title", "description", "location")
+
+# A very short prefix like "a*" could expand to most of the vocabulary; it is limited
+# to the tokens found in the most jobs
+MAX_PREFIX_EXPANSIONS = 64
+
+TOKEN_RE = re.compile(r"[a-z0-9]+")
+
+
+def tokenize(value):
+    return TOKEN_RE.findall((value or "").lower())
+
+
+def parse_query(query):
+    # Returns a list of (term, is_prefix).
+    # "term*" asks for a prefix match, and the last term is always treated as one
+    # so that half-typed queries ("react dev") still find "developer".
+    terms = []
+    for word in (query or "").lower().split():
+        tokens = tokenize(word)
+        for i, token in enumerate(tokens):
+            terms.append((token, word.endswith("*") and i == len(tokens) - 1))
+    if terms:
+        terms[-1] = (terms[-1][0], True)
+    return terms
+
+
+def build_clauses(title=None, location=None, q=None):
+    # Every clause must match (AND). Each clause is (fields, terms).
+    clauses = []
+    for fields, query in ((("title",), title), (("location",), location), (ALL_FIELDS, q)):
+        terms = parse_query(query)
+        if terms:
+            clauses.append((fields, terms))
+    return clauses
+
+
+# --- 1. PORTABLE IN-PROCESS INDEX (SQLite, tests, any database) ---
+class InMemoryJobIndex:
+    def __init__(self, sync_interval=2.0):
+        self.lock = threading.RLock()
+        self.sync_interval = sync_interval
+        # field -> token -> {job_id: term frequency}
+        self.postings = {field: {} for field in FIELD_WEIGHTS}
+        # field -> sorted list of tokens, used for prefix expansion
+        self.vocab = {field: [] for field in FIELD_WEIGHTS}
+        # job_id -> {field: {token: tf}} so a job can be re-indexed
+        self.doc_terms = {}
+        # Which jobs sync() has read, including ids that committed out of order
+        self.cursor = JobSyncCursor()
+        self.last_sync = 0.0
+        # Moves whenever the indexed jobs change (part of the ranked result cache key)
+        self.version = 0
+
+    def add(self, job_id, title, description, location):
+        with self.lock:
+            self.cursor.add(job_id)
+            self._index(job_id, title, description, location)
+
+    def _index(self, job_id, title, description, location):
+        with self.lock:
+            self.remove(job_id)
+            self.version += 1
+            fields = {"title": title, "description": description, "location": location}
+            doc = {}
+            for field, value in fields.items():
+                counts = {}
+                for token in tokenize(value):
+                    counts[token] = counts.get(token, 0) + 1
+                postings = self.postings[field]
+                for token, tf in counts.items():
+                    if token not in postings:
+                        postings[token] = {}
+                        insort(self.vocab[field], token)
+                    postings[token][job_id] = tf
+                doc[field] = counts
+            self.doc_terms[job_id] = doc
+
+    def remove(self, job_id):
+        with self.lock:
+            doc = self.doc_terms.pop(job_id, None)
+            if not doc:
+                return
+            self.version += 1
+            for field, counts in doc.items():
+                postings = self.postings[field]
+                for token in counts:
+                    docs = postings.get(token)
+                    if docs is None:
+                        continue
+                    docs.pop(job_id, None)
+                    if not docs:
+                        del postings[token]
+                        vocab = self.vocab[field]
+                        vocab.pop(bisect_left(vocab, token))
+
+    def sync(self, force=False):
+        # Pull in postings created by other workers since the last sync
+        now = time.monotonic()
+        if not force and now - self.last_sync < self.sync_interval:
+            return
+        with self.lock:
+            rows = self.cursor.query(Job.id, Job.title, Job.description, Job.location).yield_per(1000)
+            for row in self.cursor.advance(rows):
+                self._index(row.id, row.title, row.description, row.location)
+            self.last_sync = now
+
+    def _expand(self, field, term, prefix):
+        if not prefix:
+            return [term] if term in self.postings[field] else []
+        # Tokens are [a-z0-9], so every token starting with `term` sorts below term + "~"
+        vocab = self.vocab[field]
+        matches = vocab[bisect_left(vocab, term):bisect_left(vocab, term + "~")]
+        if len(matches) > MAX_PREFIX_EXPANSIONS:
+            # Keep the tokens in the most jobs, not the alphabetically first ones
+            postings = self.postings[field]
+            matches = heapq.nlargest(MAX_PREFIX_EXPANSIONS, matches, key=lambda token: len(postings[token]))
+        return matches
+
+    def _term_scores(self, fields, term, prefix, n_docs):
+        scores = {}
+        for field in fields:
+            weight = FIELD_WEIGHTS[field]
+            postings = self.postings[field]
+            for token in self._expand(field, term, prefix):
+                docs = postings[token]
+                idf = math.log(1 + n_docs / len(docs))
+                for job_id, tf in docs.items():
+                    scores[job_id] = scores.get(job_id, 0.0) + weight * idf * tf / (tf + 1.2)
+        return scores
+
+    def search(self, clauses):
+        self.sync()
+        with self.lock:
+            n_docs = len(self.doc_terms) or 1
+            result = None
+            for fields, terms in clauses:
+                for term, prefix in terms:
+                    scores = self._term_scores(fields, term, prefix, n_docs)
+                    if result is None:
+                        result = scores
+                    else:
+                        result = {job_id: s + scores[job_id] for job_id, s in result.items() if job_id in scores}
+                    if not result:
+                        return []
+        # Best match first; newer postings win ties
+        return sorted(result.items(), key=lambda item: (-item[1], -item[0]))
+
+
+# --- 2. NATIVE FULL-TEXT (MySQL FULLTEXT indexes, see models.py) ---
+# InnoDB's defaults, used when the server settings cannot be read
+INNODB_MIN_TOKEN_SIZE = 3
+INNODB_DEFAULT_STOPWORDS = frozenset(
+    "a about an are as at be by com de en for from how i in is it la of on or that the this to was what "
+    "when where who will with und www".split()
+)
+
+
+class MySQLFullTextSearch:
+    version = 0  # The database changes under it; the ranked cache relies on generations
+
+    def __init__(self):
+        self.min_token_size = None
+        self.stopwords = None
+
+    def _load_settings(self):
+        # Tokens shorter than innodb_ft_min_token_size and stopwords are never written
+        # to a FULLTEXT index, so "+go" or "+it" would match nothing
+        try:
+            row = db.session.execute(text(
+                "SELECT @@innodb_ft_min_token_size AS min_size, @@innodb_ft_enable_stopword AS enabled, "
+                "@@innodb_ft_server_stopword_table AS stopword_table"
+            )).one()
+            stopwords = frozenset()
+            if row.enabled:
+                # The table name comes from the server's own configuration ("db/table")
+                source = "INFORMATION_SCHEMA.INNODB_FT_DEFAULT_STOPWORD"
+                if row.stopword_table:
+                    source = ".".join(f"`{part}`" for part in row.stopword_table.split("/"))
+                values = db.session.scalars(text(f"SELECT value FROM {source}"))
+                stopwords = frozenset(value.lower() for value in values)
+            self.min_token_size, self.stopwords = int(row.min_size), stopwords
+        except Exception:
+            logger.warning("Could not read the InnoDB full-text settings; assuming the defaults", exc_info=True)
+            self.min_token_size, self.stopwords = INNODB_MIN_TOKEN_SIZE, INNODB_DEFAULT_STOPWORDS
+
+    def indexed(self, term):
+        if self.min_token_size is None:
+            self._load_settings()
+        return len(term) >= self.min_token_size and term not in self.stopwords
+
+    def build_query(self, clauses):
+        # Column lists must match the FULLTEXT indexes created in models.py exactly.
+        # Terms the index cannot hold ("go", "c", "it") are matched at word starts with
+        # REGEXP instead; they still must all match, but only MATCH() scores.
+        matches, filters, params = [], [], {}
+        for i, (fields, terms) in enumerate(clauses):
+            words = []
+            for j, (term, prefix) in enumerate(terms):
+                if self.indexed(term):
+                    words.append(f"+{term}*" if prefix else f"+{term}")
+                    continue
+                # Tokens are [a-z0-9], so the pattern needs no escaping
+                params[f"r{i}_{j}"] = rf"\b{term}" if prefix else rf"\b{term}\b"
+                filters.append("(" + " OR ".join(f"{field} REGEXP :r{i}_{j}" for field in fields) + ")")
+            if words:
+                params[f"q{i}"] = " ".join(words)
+                matches.append(f"MATCH({', '.join(fields)}) AGAINST(:q{i} IN BOOLEAN MODE)")
+        sql = text(
+            f"SELECT id, {' + '.join(matches) or '0'} AS score FROM jobs "
+            f"WHERE {' AND '.join(matches + filters)} ORDER BY score DESC, id DESC"
+        )
+        return sql, params
+
+    def search(self, clauses):
+        sql, params = self.build_query(clauses)
+        return [(row.id, row.score) for row in db.session.execute(sql, params)]
+
+    def add(self, job_id, title, description, location):
+        # The database keeps FULLTEXT indexes in step on commit
+        pass
+
+    def sync(self, force=False):
+        pass
+
+
+def get_search_backend():
+    backend = current_app.extensions.get("job_search")
+    if backend is None:
+        choice = current_app.config.get("SEARCH_BACKEND", "auto")
+        if choice == "auto":
+            choice = "mysql" if db.engine.dialect.name in ("mysql", "mariadb") else "memory"
+        if choice == "mysql":
+            # Checked once per worker: restart the workers after adding the indexes
+            missing = missing_fulltext_indexes()
+            if missing:
+                logger.warning("FULLTEXT indexes %s are missing (run `flask --app app sync-indexes`); "
+                               "searching the in-process index instead", ", ".join(missing))
+                choice = "memory"
+        if choice == "mysql":
+            backend = MySQLFullTextSearch()
+        else:
+            backend = InMemoryJobIndex(current_app.config.get("SEARCH_SYNC_INTERVAL", 2.0))
+        backend = current_app.extensions.setdefault("job_search", backend)
+    return backend
+
+
+# --- 3. RANKED RESULT CACHE (paging through one search runs it once) ---
+class RankedResultCache:
+    # LRU of ranked [(job_id, score)] lists, bounded by entry count and by the total
+    # number of ids held. The key includes the jobs generation (bumped by every posting
+    # and import on this host) and the in-process index version, so each page of a
+    # cursor walk or ?page=N reads the same list instead of searching again. Entries
+    # expire after `ttl` seconds for postings written on other hosts.
+    def __init__(self, max_entries=256, max_ids=1000000, ttl=30):
+        self.max_entries = max_entries
+        self.max_ids = max_ids
+        self.ttl = ttl
+        self.entries = OrderedDict()  # key -> (expires_at, ranked)
+        self.size = 0
+        self.lock = threading.Lock()
+
+    def get(self, key):
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                return None
+            if entry[0] < time.monotonic():
+                self._drop(key)
+                return None
+            self.entries.move_to_end(key)
+            return entry[1]
+
+    def put(self, key, ranked):
+        if len(ranked) > self.max_ids:
+            return
+        with self.lock:
+            if key in self.entries:
+                self._drop(key)
+            self.entries[key] = (time.monotonic() + self.ttl, ranked)
+            self.size += len(ranked)
+            while len(self.entries) > self.max_entries or self.size > self.max_ids:
+                self._drop(next(iter(self.entries)))
+
+    def _drop(self, key):
+        _, ranked = self.entries.pop(key)
+        self.size -= len(ranked)
+
+
+def get_ranked_cache():
+    cache = current_app.extensions.get("ranked_results")
+    if cache is None:
+        config = current_app.config
+        cache = RankedResultCache(
+            config.get("SEARCH_CACHE_MAX_ENTRIES", 256),
+            config.get("SEARCH_CACHE_MAX_IDS", 1000000),
+            config.get("SEARCH_CACHE_TTL", 30),
+        )
+        cache = current_app.extensions.setdefault("ranked_results", cache)
+    return cache
+
+
+def search_jobs_ranked(title=None, location=None, q=None):
+    # Returns [(job_id, score)] best first, or None when there is nothing to search for
+    clauses = build_clauses(title, location, q)
+    if not clauses:
+        return None
+    backend = get_search_backend()
+    # Sync first, so the version read below covers everything the search will see
+    backend.sync()
+    key = (
+        tuple((fields, tuple(terms)) for fields, terms in clauses),
+        get_generations().get("jobs"),
+        backend.version,
+    )
+    cache = get_ranked_cache()
+    ranked = cache.get(key)
+    if ranked is None:
+        ranked = tuple(backend.search(clauses))
+        cache.put(key, ranked)
+    return ranked
+
+
+def search_job_ids(title=None, location=None, q=None):
+    ranked = search_jobs_ranked(title, location, q)
+    return None if ranked is None else [job_id for job_id, _ in ranked]
+
+
+def index_new_jobs():
+    # Called after a bulk import commits, so this worker can find the new postings at once
+    get_search_backend().sync(force=True)
+
+
+def index_job(job):
+    # Called right after create_job commits so this worker sees the posting immediately
+    get_search_backend().add(job.id, job.title, job.description, job.location)
+
+
+def load_jobs_in_order(ids, chunk_size=500, options=()):
+    # Fetch jobs by primary key, keeping the ranked order of `ids`
+    jobs = {}
+    for start in range(0, len(ids), chunk_size):
+        chunk = ids[start:start + chunk_size]
+        for job in Job.query.options(*options).filter(Job.id.in_(chunk)):
+            jobs[job.id] = job
+    return [jobs[job_id] for job_id in ids if job_id in jobs]
+
+
+class RankedPagination(Pagination):
+    # Same interface as query.paginate(), but pages through an already ranked id list
+    def _query_items(self):
+        ids = self._query_args["ids"]
+        return load_jobs_in_order(
+            ids[self._query_offset:self._query_offset + self.per_page],
+            options=self._query_args.get("options", ())
+        )
+
+    def _query_count(self):
+        return len(self._query_args["ids"])
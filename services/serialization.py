@@ -0,0 +1,206 @@
+import threading
+from datetime import date, datetime, timezone
+from operator import attrgetter, itemgetter
+
+from flask import abort, jsonify, make_response
+from flask.json.provider import DefaultJSONProvider
+from sqlalchemy import DateTime, inspect
+from sqlalchemy.orm import joinedload, load_only
+from werkzeug.http import http_date
+
+try:
+    import orjson
+except ImportError:  # Optional: the stdlib encoder is used instead
+    orjson = None
+
+# Shared serialization for the JSON views:
+#   * Projection: the fields a view can return, ?fields= parsing, and the matching
+#     column-only SELECT list (row queries) or load_only/joinedload options (ORM
+#     queries), so columns nobody asked for are never read from the database.
+#   * serializer(): a dict builder made once per field set from item/attrgetters,
+#     so a row costs one C-level fetch of its plain columns; no per-row loops over
+#     field lists.
+#   * OrjsonProvider: app.json backed by orjson when it is installed (JSON_BACKEND).
+
+
+class Related:
+    # A column reached through a many-to-one relationship, e.g. Related(Job, 'employer', User.email).
+    # ORM queries only: it becomes joinedload(relationship).load_only(column). The
+    # relationship is named, not passed, because backrefs only exist once mappers
+    # are configured.
+    def __init__(self, entity, relationship, column):
+        self.entity = entity
+        self.relationship = relationship
+        self.column = column
+
+
+class Computed:
+    # A field derived from other fields of the same projection, e.g. a URL built
+    # from an id. `func` gets the row; the fields it `needs` are loaded with it.
+    def __init__(self, func, *needs):
+        self.func = func
+        self.needs = needs
+
+
+class Projection:
+    # `fields`: {output name: column | Related | Computed}, in output order.
+    # `default`: what a view returns without ?fields=. `required`: loaded whether or
+    # not they are returned (e.g. the id a paginated query orders by). `internal`:
+    # only there for Computed fields to use, never returned.
+    def __init__(self, fields, default=None, required=(), internal=()):
+        self.fields = fields
+        self.internal = frozenset(internal)
+        self.default = tuple(default or (name for name in fields if name not in self.internal))
+        self.required = tuple(required)
+        self._serializers = {}
+        self._lock = threading.Lock()
+
+    def requested(self, args):
+        # ?fields=id,title -> ('id', 'title'); unknown names are a 400
+        raw = args.get('fields')
+        if not raw:
+            return self.default
+        names = tuple(dict.fromkeys(name.strip() for name in raw.split(',') if name.strip()))
+        unknown = [name for name in names if name not in self.fields or name in self.internal]
+        if unknown or not names:
+            abort(make_response(jsonify({
+                "msg": f"Unknown fields: {', '.join(unknown)}" if unknown else "No fields requested",
+                "fields": [name for name in self.fields if name not in self.internal]
+            }), 400))
+        return names
+
+    def _loaded(self, names):
+        loaded = dict.fromkeys(self.required)
+        for name in names:
+            field = self.fields[name]
+            if isinstance(field, Computed):
+                loaded.update(dict.fromkeys(field.needs))
+            else:
+                loaded[name] = None
+        return [name for name in loaded if not isinstance(self.fields[name], Computed)]
+
+    def columns(self, names):
+        # SELECT list for a row query; each column is labelled with its field name
+        return [self.fields[name].label(name) for name in self._loaded(names)]
+
+    def load_options(self, names):
+        # Loader options for an ORM query over the projection's entity
+        own, options = [], []
+        for name in self._loaded(names):
+            field = self.fields[name]
+            if isinstance(field, Related):
+                # Through the mapper: a backref (Job.employer) only exists once mappers are configured
+                relationship = inspect(field.entity).relationships[field.relationship]
+                options.append(joinedload(relationship.class_attribute).load_only(field.column))
+            else:
+                own.append(field)
+        return [load_only(*own)] + options if own else options
+
+    def serializer(self, names, objects=False):
+        # row -> dict with exactly `names`. Rows must come from a query over
+        # columns(names), whose order they are read in; ORM objects (objects=True)
+        # are read by attribute/relationship.
+        key = (names, objects)
+        serialize = self._serializers.get(key)
+        if serialize is None:
+            with self._lock:
+                serialize = self._serializers.get(key) or self._compile(names, objects)
+                self._serializers[key] = serialize
+        return serialize
+
+    def _compile(self, names, objects):
+        # Rows from columns() are read by position (a Row attribute lookup costs more
+        # than building the dict), ORM objects by attribute path; one itemgetter or
+        # attrgetter fetches every plain field at once. Dates and Computed fields are
+        # then slotted in at their place in `names`.
+        positions = {name: index for index, name in enumerate(self._loaded(names))}
+        plain, converted = [], []
+        for index, name in enumerate(names):
+            field = self.fields[name]
+            if isinstance(field, Computed):
+                converted.append((index, field.func))
+                continue
+            column = field.column if isinstance(field, Related) else field
+            if not objects:
+                key = positions[name]
+            elif isinstance(field, Related):
+                key = f"{field.relationship}.{column.key}"
+            else:
+                key = field.key
+            if isinstance(column.type, DateTime):
+                converted.append((index, _then(_getter(objects, key), _date)))
+            else:
+                plain.append(key)
+
+        fetch = _getter(objects, *plain) if plain else (lambda row: ())
+        if len(plain) == 1:
+            fetch = _then(fetch, lambda value: (value,))
+        if not converted:
+            return lambda row: dict(zip(names, fetch(row)))
+
+        def serialize(row):
+            values = list(fetch(row))
+            for index, get in converted:
+                values.insert(index, get(row))
+            return dict(zip(names, values))
+        return serialize
+
+
+def _getter(objects, *keys):
+    return attrgetter(*keys) if objects else itemgetter(*keys)
+
+
+def _then(get, convert):
+    return lambda row: convert(get(row))
+
+
+_DAYS = ("Mon", "Tue", "Wed", "Thu", "Fri", "Sat", "Sun")
+_MONTHS = (None, "Jan", "Feb", "Mar", "Apr", "May", "Jun", "Jul", "Aug", "Sep", "Oct", "Nov", "Dec")
+
+
+def _date(value):
+    # Same output as Flask's JSON provider (werkzeug http_date, RFC 822 in GMT; naive
+    # datetimes are UTC), formatted directly since it runs for every row
+    if isinstance(value, datetime):
+        if value.tzinfo is not None:
+            value = value.astimezone(timezone.utc)
+        return "%s, %02d %s %04d %02d:%02d:%02d GMT" % (
+            _DAYS[value.weekday()], value.day, _MONTHS[value.month], value.year, value.hour, value.minute, value.second)
+    return http_date(value) if isinstance(value, date) else value
+
+
+# --- JSON BACKEND ---
+
+class OrjsonProvider(DefaultJSONProvider):
+    # Drop-in app.json: same output as the default provider (sorted keys, datetimes
+    # as HTTP dates, indented in debug), encoded by orjson. Non-ASCII text is written
+    # as UTF-8 rather than \u escapes.
+    def _options(self, kwargs):
+        option = orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_NON_STR_KEYS
+        if kwargs.get("sort_keys", self.sort_keys):
+            option |= orjson.OPT_SORT_KEYS
+        if kwargs.get("indent"):
+            option |= orjson.OPT_INDENT_2
+        return option
+
+    def dumps(self, obj, **kwargs):
+        return orjson.dumps(obj, default=kwargs.get("default", self.default), option=self._options(kwargs)).decode()
+
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
+
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        indent = (self.compact is None and self._app.debug) or self.compact is False
+        body = orjson.dumps(obj, default=self.default,
+                            option=self._options({"indent": indent}) | orjson.OPT_APPEND_NEWLINE)
+        return self._app.response_class(body, mimetype=self.mimetype)
+
+
+def install_json_provider(app):
+    # JSON_BACKEND: 'auto' (orjson if installed), 'orjson' or 'json' (stdlib)
+    backend = app.config.get("JSON_BACKEND", "auto")
+    if backend == "orjson" and orjson is None:
+        raise RuntimeError("JSON_BACKEND=orjson but orjson is not installed")
+    if backend in ("auto", "orjson") and orjson is not None:
+        app.json = OrjsonProvider(app)
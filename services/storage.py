@@ -0,0 +1,227 @@
+import hashlib
+import os
+import tempfile
+import threading
+import zlib
+from contextlib import contextmanager
+
+from flask import Response, current_app, send_file
+from sqlalchemy import event, select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from models import db, ResumeBlob
+
+try:
+    import fcntl
+except ImportError:  # Windows: only threads of one process are serialized
+    fcntl = None
+
+CHUNK_SIZE = 64 * 1024
+LOCK_STRIPES = 256  # Stored paths share this many lock files
+
+blobs_table = ResumeBlob.__table__
+
+
+class LocalResumeStorage:
+    # Content-addressed files on the local disk:
+    #   <root>/ab/cd/abcd...ef.pdf  (sha256 of the content, sharded two levels deep)
+    # Uploads are streamed to a temp file while hashing, then renamed into place, so
+    # readers never see a half-written file and identical uploads share one file.
+    def __init__(self, root, base_path):
+        self.root = root            # as stored in the database, e.g. 'uploads/resumes'
+        self.base_path = base_path  # directory relative paths are resolved against
+        self.thread_locks = [threading.Lock() for _ in range(LOCK_STRIPES)]
+
+    def abspath(self, path):
+        return path if os.path.isabs(path) else os.path.join(self.base_path, path)
+
+    def lock_key(self, path):
+        return zlib.crc32(path.encode()) % LOCK_STRIPES
+
+    def lock(self, key):
+        # Blocks until this process holds stripe `key`; returns the function that releases
+        # it. flock on a file opened per holder excludes other threads as well as other
+        # workers on this host.
+        if fcntl is None:
+            lock = self.thread_locks[key]
+            lock.acquire()
+            return lock.release
+        lock_dir = os.path.join(self.abspath(self.root), "locks")
+        os.makedirs(lock_dir, exist_ok=True)
+        lock_file = open(os.path.join(lock_dir, f"{key:02x}.lock"), "a")
+        try:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+        except BaseException:
+            lock_file.close()
+            raise
+        return lock_file.close
+
+    def save(self, stream, extension, before_replace=None):
+        # before_replace(path) runs just before the file is moved into place (store_resume
+        # takes the path's lock there)
+        tmp_dir = os.path.join(self.abspath(self.root), "tmp")
+        os.makedirs(tmp_dir, exist_ok=True)
+
+        digest, size = hashlib.sha256(), 0
+        fd, tmp_path = tempfile.mkstemp(dir=tmp_dir)
+        try:
+            with os.fdopen(fd, "wb") as out:
+                while True:
+                    chunk = stream.read(CHUNK_SIZE)
+                    if not chunk:
+                        break
+                    digest.update(chunk)
+                    out.write(chunk)
+                    size += len(chunk)
+                out.flush()
+                os.fsync(out.fileno())
+
+            sha256 = digest.hexdigest()
+            path = os.path.join(self.root, sha256[:2], sha256[2:4], f"{sha256}.{extension}")
+            final_path = self.abspath(path)
+            os.makedirs(os.path.dirname(final_path), exist_ok=True)
+            if before_replace is not None:
+                before_replace(path)
+            # Atomic; if the same content is already stored this just replaces it in place
+            os.replace(tmp_path, final_path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+        return path, sha256, size
+
+    def delete(self, path):
+        try:
+            os.remove(self.abspath(path))
+        except FileNotFoundError:
+            pass
+
+    def exists(self, path):
+        return os.path.exists(self.abspath(path))
+
+    def open(self, path):
+        # Binary file object for reading in CHUNK_SIZE pieces (archive exports)
+        return open(self.abspath(path), "rb")
+
+    def send(self, path, download_name, as_attachment=False):
+        # Range requests (resume previews) are handled by send_file's conditional mode.
+        # With RESUME_SENDFILE='x-accel' nginx streams the file instead of this worker;
+        # 'x-sendfile' (Apache, lighttpd) goes through Flask's USE_X_SENDFILE.
+        if current_app.config.get("RESUME_SENDFILE") == "x-accel":
+            internal = os.path.relpath(path, self.root).replace(os.sep, "/")
+            response = Response(mimetype=_mimetype(path))
+            response.headers["X-Accel-Redirect"] = current_app.config["RESUME_ACCEL_PREFIX"].rstrip("/") + "/" + internal
+            response.headers["Content-Disposition"] = \
+                f'{"attachment" if as_attachment else "inline"}; filename="{download_name}"'
+            return response
+
+        return send_file(
+            self.abspath(path),
+            download_name=download_name,
+            as_attachment=as_attachment,
+            conditional=True
+        )
+
+
+def _mimetype(path):
+    return {
+        ".pdf": "application/pdf",
+        ".doc": "application/msword",
+        ".docx": "application/vnd.openxmlformats-officedocument.wordprocessingml.document",
+    }.get(os.path.splitext(path)[1].lower(), "application/octet-stream")
+
+
+def get_storage():
+    storage = current_app.extensions.get("resume_storage")
+    if storage is None:
+        storage = LocalResumeStorage(current_app.config["UPLOAD_FOLDER"], current_app.root_path)
+        storage = current_app.extensions.setdefault("resume_storage", storage)
+    return storage
+
+
+# --- Reference counting (one ResumeBlob row per stored file) ---
+
+def _add_reference(path, sha256, size):
+    result = db.session.execute(
+        blobs_table.update().where(blobs_table.c.path == path).values(ref_count=blobs_table.c.ref_count + 1)
+    )
+    if result.rowcount:
+        return
+    try:
+        with db.session.begin_nested():
+            db.session.execute(blobs_table.insert().values(path=path, sha256=sha256, size=size, ref_count=1))
+    except IntegrityError:
+        # Someone else stored the same content at the same moment
+        db.session.execute(
+            blobs_table.update().where(blobs_table.c.path == path).values(ref_count=blobs_table.c.ref_count + 1)
+        )
+
+
+def store_resume(stream, extension):
+    # Writes the file and takes a reference in the current transaction.
+    # Returns (path, sha256).
+    path, sha256, size = get_storage().save(stream, extension, before_replace=_lock_until_transaction_end)
+    _add_reference(path, sha256, size)
+    return path, sha256
+
+
+def _lock_until_transaction_end(path):
+    # From the rename until the reference commits, a delete_unreferenced() of the same
+    # path in another request would see no reference and remove the file just written
+    storage = get_storage()
+    key = storage.lock_key(path)
+    held = db.session.info.setdefault("resume_locks", {})
+    if key not in held:
+        if not db.session().in_transaction():
+            db.session.begin()  # So the lock is released even if nothing else runs
+        held[key] = storage.lock(key)
+
+
+@event.listens_for(Session, "after_transaction_end")
+def _release_resume_locks(session, transaction):
+    if transaction.parent is None:
+        for release in session.info.pop("resume_locks", {}).values():
+            release()
+
+
+def release_resume(path):
+    # Drops one reference in the current transaction. Returns True when nothing else
+    # uses the file, in which case the caller should delete it *after* committing.
+    if not _is_tracked(path):
+        # Uploaded before content addressing: the file belongs to this user alone
+        return True
+    db.session.execute(
+        blobs_table.update().where(blobs_table.c.path == path).values(ref_count=blobs_table.c.ref_count - 1)
+    )
+    deleted = db.session.execute(
+        blobs_table.delete().where(blobs_table.c.path == path, blobs_table.c.ref_count <= 0)
+    )
+    return bool(deleted.rowcount)
+
+
+def delete_unreferenced(path):
+    # After commit: remove the file unless a concurrent upload of the same content
+    # has re-referenced it in the meantime. The path's lock waits for an upload that
+    # already moved the file into place to commit its reference.
+    with _locked(path):
+        if not _is_tracked(path):
+            get_storage().delete(path)
+
+
+@contextmanager
+def _locked(path):
+    storage = get_storage()
+    key = storage.lock_key(path)
+    if key in db.session.info.get("resume_locks", {}):
+        yield  # This transaction stored a file under the same lock
+        return
+    release = storage.lock(key)
+    try:
+        yield
+    finally:
+        release()
+
+
+def _is_tracked(path):
+    return db.session.execute(select(blobs_table.c.path).where(blobs_table.c.path == path)).first() is not None
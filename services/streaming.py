@@ -0,0 +1,64 @@
+from flask import Response, current_app, stream_with_context
+
+from models import db
+
+
+def iter_rows(columns, id_column, batch_size, ids=None, filters=()):
+    # Yield plain rows (no ORM objects, nothing kept in the session) one batch at a time.
+    # Without `ids` the table is walked by primary key (restricted by `filters`); with
+    # `ids` (e.g. ranked search results) rows come back in that order.
+    if ids is None:
+        last_id = 0
+        while True:
+            batch = db.session.query(*columns) \
+                .filter(id_column > last_id, *filters) \
+                .order_by(id_column) \
+                .limit(batch_size) \
+                .all()
+            if not batch:
+                return
+            yield from batch
+            last_id = batch[-1].id
+    else:
+        for start in range(0, len(ids), batch_size):
+            chunk = ids[start:start + batch_size]
+            rows = {row.id: row for row in db.session.query(*columns).filter(id_column.in_(chunk))}
+            for row_id in chunk:
+                if row_id in rows:
+                    yield rows[row_id]
+
+
+def _ndjson(records):
+    dumps = current_app.json.dumps
+    for record in records:
+        yield dumps(record) + "\n"
+
+
+def _json_array(records):
+    dumps = current_app.json.dumps
+    yield "["
+    first = True
+    for record in records:
+        yield dumps(record) if first else "," + dumps(record)
+        first = False
+    yield "]"
+
+
+def stream_records(records, fmt):
+    # `records` is a generator of dicts; nothing is materialized, so memory stays flat
+    # and the first bytes go out as soon as the first batch is fetched.
+    if fmt == "ndjson":
+        body, mimetype = _ndjson(records), "application/x-ndjson"
+    else:
+        body, mimetype = _json_array(records), "application/json"
+    return Response(stream_with_context(body), mimetype=mimetype)
+
+
+def requested_stream_format(request):
+    # ?stream=ndjson|json, or an Accept header asking for NDJSON
+    fmt = request.args.get("stream")
+    if fmt in ("ndjson", "json"):
+        return fmt
+    if request.accept_mimetypes.best == "application/x-ndjson":
+        return "ndjson"
+    return None
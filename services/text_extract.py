@@ -0,0 +1,74 @@
+import html
+import os
+import re
+import zipfile
+import zlib
+
+# Runs inside the extraction worker processes (see services/resume_text.py), so this
+# module must stay importable on its own: standard library only, no Flask, no models.
+
+TERM_RE = re.compile(r"[a-z0-9][a-z0-9+#]*")
+MAX_TERM_LENGTH = 64
+MAX_TERMS = 5000
+
+PDF_STREAM_RE = re.compile(rb"stream\r?\n(.*?)\r?\nendstream", re.S)
+PDF_TEXT_RE = re.compile(rb"\((.*?)(?<!\\)\)\s*(?:Tj|'|\")|\[(.*?)\]\s*TJ", re.S)
+PDF_STRING_RE = re.compile(rb"\((.*?)(?<!\\)\)", re.S)
+DOCX_TEXT_RE = re.compile(r"<w:t(?:\s[^>]*)?>([^<]*)</w:t>")
+PRINTABLE_RUN_RE = re.compile(rb"[\x20-\x7e]{4,}")
+
+
+def terms_from_text(text):
+    terms = set()
+    for term in TERM_RE.findall(text.lower()):
+        if len(term) <= MAX_TERM_LENGTH:
+            terms.add(term)
+            if len(terms) >= MAX_TERMS:
+                break
+    return sorted(terms)
+
+
+def _pdf_text(data):
+    try:
+        from pypdf import PdfReader  # Optional, much better on complex PDFs
+    except ImportError:
+        PdfReader = None
+    if PdfReader is not None:
+        import io
+        return "\n".join(page.extract_text() or "" for page in PdfReader(io.BytesIO(data)).pages)
+
+    # Fallback: inflate content streams and collect the strings shown by Tj/TJ
+    chunks = []
+    for raw in PDF_STREAM_RE.findall(data):
+        try:
+            content = zlib.decompress(raw)
+        except zlib.error:
+            content = raw
+        for single, array in PDF_TEXT_RE.findall(content):
+            parts = [single] if single else PDF_STRING_RE.findall(array)
+            chunks.append(b"".join(parts).decode("latin-1"))
+    return " ".join(chunks)
+
+
+def _docx_text(data_path):
+    with zipfile.ZipFile(data_path) as archive:
+        xml = archive.read("word/document.xml").decode("utf-8", "ignore")
+    return html.unescape(" ".join(DOCX_TEXT_RE.findall(xml)))
+
+
+def _doc_text(data):
+    # Legacy binary .doc: keep runs of printable text (ASCII and UTF-16LE)
+    runs = [run.decode("ascii") for run in PRINTABLE_RUN_RE.findall(data)]
+    runs += [run.decode("ascii") for run in PRINTABLE_RUN_RE.findall(data[::2])]
+    return " ".join(runs)
+
+
+def extract_terms(path):
+    extension = os.path.splitext(path)[1].lower()
+    if extension == ".docx":
+        text = _docx_text(path)
+    else:
+        with open(path, "rb") as f:
+            data = f.read()
+        text = _pdf_text(data) if extension == ".pdf" else _doc_text(data)
+    return terms_from_text(text)
@@ -0,0 +1,117 @@
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime
+
+from flask import current_app
+
+from models import db, TokenBlocklist
+from services.generations import get_generations
+
+GENERATION = "token_blocklist"
+
+
+class RevocationCache:
+    # Layered check in front of the token_blocklist table:
+    #   1. revoked jtis seen by this worker (kept until the token itself expires, or
+    #      evicted oldest first beyond max_entries)
+    #   2. jtis verified as valid, trusted while the blocklist generation is unchanged
+    #      and for at most `valid_ttl` seconds
+    #   3. the database, only on a miss
+    # logout bumps the shared generation after committing, which invalidates (2) in
+    # every worker on this host at once, so a revoked token is rejected on its very next
+    # request there. The generation is per host: other hosts notice within valid_ttl.
+    def __init__(self, generations, max_entries=100000, valid_ttl=5.0):
+        self.generations = generations
+        self.max_entries = max_entries
+        self.valid_ttl = valid_ttl
+        self.revoked = OrderedDict()  # jti -> token expiry (epoch seconds), oldest first
+        self.valid = OrderedDict()    # jti -> (generation, monotonic time) it was verified at
+        self.lock = threading.Lock()
+        self.last_pruned = 0.0
+
+    def is_revoked(self, jti, expires_at=None):
+        if jti in self.revoked:
+            return True
+
+        # Read the generation *before* asking the database, so a logout that commits
+        # while we look is never cached as valid
+        generation = self.generations.get(GENERATION)
+        now = time.monotonic()
+        with self.lock:
+            verified = self.valid.get(jti)
+            if verified is not None and verified[0] == generation and now - verified[1] < self.valid_ttl:
+                self.valid.move_to_end(jti)
+                return False
+
+        revoked = db.session.query(TokenBlocklist.id).filter_by(jti=jti).first() is not None
+
+        with self.lock:
+            if revoked:
+                self.valid.pop(jti, None)
+                self._remember_revoked(jti, expires_at)
+            else:
+                self.valid[jti] = (generation, now)
+                self.valid.move_to_end(jti)
+                while len(self.valid) > self.max_entries:
+                    self.valid.popitem(last=False)
+        return revoked
+
+    def revoke(self, jti, expires_at=None):
+        # Call after the TokenBlocklist row is committed
+        with self.lock:
+            self.valid.pop(jti, None)
+            self._remember_revoked(jti, expires_at)
+        self.generations.bump(GENERATION)
+
+    def _remember_revoked(self, jti, expires_at):
+        # Bounded like `valid`: expired entries go first, then the oldest ones (which only
+        # sends their next check to the database). A tenth is freed at a time so the
+        # expiry scan is not repeated on every insert once the cache is full.
+        self.revoked[jti] = expires_at or 0
+        self.revoked.move_to_end(jti)
+        if len(self.revoked) > self.max_entries:
+            self.prune()
+            while len(self.revoked) > self.max_entries - self.max_entries // 10:
+                self.revoked.popitem(last=False)
+
+    def prune(self, now=None):
+        # Expired tokens are rejected by the JWT check anyway, so forget them
+        now = now or time.time()
+        for jti, expires_at in list(self.revoked.items()):
+            if expires_at and expires_at < now:
+                del self.revoked[jti]
+
+
+def get_revocation_cache():
+    cache = current_app.extensions.get("revocation_cache")
+    if cache is None:
+        config = current_app.config
+        cache = RevocationCache(
+            get_generations(),
+            config.get("JWT_BLOCKLIST_CACHE_SIZE", 100000),
+            config.get("JWT_BLOCKLIST_VALID_TTL", 5.0),
+        )
+        cache = current_app.extensions.setdefault("revocation_cache", cache)
+    return cache
+
+
+def prune_blocklist():
+    # No token can outlive the refresh token lifetime, so older rows can never match
+    cutoff = datetime.utcnow() - current_app.config["JWT_REFRESH_TOKEN_EXPIRES"]
+    deleted = TokenBlocklist.query.filter(TokenBlocklist.created_at < cutoff).delete(synchronize_session=False)
+    db.session.commit()
+    cache = get_revocation_cache()
+    with cache.lock:
+        cache.prune()
+    return deleted
+
+
+def maybe_prune_blocklist():
+    # Opportunistic pruning from logout, at most once per interval per worker
+    cache = get_revocation_cache()
+    interval = current_app.config.get("JWT_BLOCKLIST_PRUNE_INTERVAL", 3600)
+    now = time.monotonic()
+    if now - cache.last_pruned >= interval:
+        cache.last_pruned = now
+        prune_blocklist()
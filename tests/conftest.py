@@ -0,0 +1,75 @@
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import create_app  # noqa: E402
+from config import Config  # noqa: E402
+from models import db  # noqa: E402
+
+
+def make_config(tmp_path, **settings):
+    # Config for one test: its own SQLite files and process-local stores under tmp_path
+    class TestConfig(Config):
+        TESTING = True
+        SQLALCHEMY_DATABASE_URI = f"sqlite:///{tmp_path / 'primary.db'}"
+        SQLALCHEMY_ENGINE_OPTIONS = {}
+        SQLALCHEMY_BINDS = {}
+        REPLICA_BIND_KEYS = []
+        JWT_SECRET_KEY = "test-secret-key-for-the-test-suite-only"
+        SECRET_KEY = "test"
+        PASSWORD_HASH_METHOD = "pbkdf2:sha256:1000"
+        PASSWORD_HASH_WORKERS = 0
+        RATE_LIMIT_ENABLED = False
+        RATE_LIMIT_BACKEND = "local"
+        GENERATION_BACKEND = "local"
+        EVENTS_BROKER = "local"
+        METRICS_ENABLED = False
+        RESUME_EXTRACT_EAGER = True
+        UPLOAD_FOLDER = str(tmp_path / "uploads")
+
+    for name, value in settings.items():
+        setattr(TestConfig, name, value)
+    return TestConfig
+
+
+@pytest.fixture
+def make_app(tmp_path):
+    # make_app(**config overrides) -> app with the primary's tables created
+    apps = []
+
+    def make_app(**settings):
+        app = create_app(make_config(tmp_path, **settings))
+        with app.app_context():
+            db.create_all(bind_key=None)
+        apps.append(app)
+        return app
+
+    yield make_app
+    for app in apps:
+        with app.app_context():
+            db.session.remove()
+            for engine in db.engines.values():
+                engine.dispose()
+
+
+@pytest.fixture
+def app(make_app):
+    return make_app()
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+
+@pytest.fixture
+def login():
+    # login(client, email, role) registers the account and returns its Authorization header
+    def login(client, email, role):
+        client.post("/auth/register", json={"email": email, "password": "pw", "role": role})
+        response = client.post("/auth/login", json={"email": email, "password": "pw"})
+        return {"Authorization": f"Bearer {response.get_json()['access_token']}"}
+    return login
@@ -0,0 +1,54 @@
+from models import db, JobApplicationCount
+from services import app_counters
+
+
+def dashboard_counts(client, employer):
+    job = client.get("/jobs/employer-dashboard", headers=employer).get_json()[0]
+    return job["total_applications"], job["pending_reviews"]
+
+
+def setup_job(client, login, applicants):
+    employer = login(client, "employer@example.com", "employer")
+    job_id = client.post("/jobs/", json={"title": "Developer", "description": "Python"},
+                         headers=employer).get_json()["job_id"]
+    seekers = [login(client, f"seeker{i}@example.com", "seeker") for i in range(applicants)]
+    for seeker in seekers[:-1]:
+        assert client.post(f"/applications/apply/{job_id}", headers=seeker).status_code == 201
+    return employer, job_id, seekers[-1]
+
+
+def forget_counters(app):
+    # A database from before the counters existed
+    with app.app_context():
+        JobApplicationCount.query.delete()
+        db.session.commit()
+
+
+def test_missing_counter_starts_from_the_applications_table(app, client, login):
+    employer, job_id, last_seeker = setup_job(client, login, 3)
+    forget_counters(app)
+    assert dashboard_counts(client, employer) == (0, 0)
+
+    assert client.post(f"/applications/apply/{job_id}", headers=last_seeker).status_code == 201
+    assert dashboard_counts(client, employer) == (3, 3)
+
+
+def test_backfill_counts_jobs_without_counters(app, client, login):
+    employer, job_id, _ = setup_job(client, login, 3)
+    forget_counters(app)
+
+    with app.app_context():
+        assert app_counters.backfill() == 1
+        assert app_counters.backfill() == 0
+    assert dashboard_counts(client, employer) == (2, 2)
+
+
+def test_drifted_counter_never_goes_negative(app, client, login):
+    employer, job_id, _ = setup_job(client, login, 2)
+    with app.app_context():
+        JobApplicationCount.query.filter_by(job_id=job_id, status="pending").update({"count": 0})
+        db.session.commit()
+
+    response = client.put(f"/applications/job/{job_id}/status", json={"status": "accepted"}, headers=employer)
+    assert response.get_json()["updated"] == 1
+    assert dashboard_counts(client, employer) == (1, 0)
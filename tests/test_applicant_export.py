@@ -0,0 +1,39 @@
+import csv
+import io
+import zipfile
+
+PDF = b"%PDF-1.4\n" + b"resume body " * 5000
+
+
+def test_export_zips_the_applicant_list_and_resumes(client, login):
+    employer = login(client, "employer@example.com", "employer")
+    job_id = client.post("/jobs/", json={"title": "Developer", "description": "Python"},
+                         headers=employer).get_json()["job_id"]
+    with_resume = login(client, "alice@example.com", "seeker")
+    without_resume = login(client, "bob@example.com", "seeker")
+    assert client.post("/seeker/upload-resume", data={"resume": (io.BytesIO(PDF), "cv.pdf")},
+                       headers=with_resume, content_type="multipart/form-data").status_code == 200
+    for seeker in (with_resume, without_resume):
+        assert client.post(f"/applications/apply/{job_id}", headers=seeker).status_code == 201
+
+    response = client.get(f"/applications/job/{job_id}/applicants/export", headers=employer)
+    assert response.status_code == 200
+    assert response.mimetype == "application/zip"
+    assert response.headers["Content-Disposition"].startswith("attachment;")
+
+    archive = zipfile.ZipFile(io.BytesIO(response.get_data()))
+    assert archive.testzip() is None
+    rows = list(csv.DictReader(io.StringIO(archive.read("applicants.csv").decode("utf-8-sig"))))
+    assert [(row["email"], row["status"]) for row in rows] == [("alice@example.com", "pending"),
+                                                               ("bob@example.com", "pending")]
+    assert rows[1]["resume_file"] == ""
+    assert archive.read(rows[0]["resume_file"]) == PDF
+    assert sorted(archive.namelist()) == ["applicants.csv", rows[0]["resume_file"]]
+
+
+def test_export_is_only_for_the_job_owner(client, login):
+    employer = login(client, "employer@example.com", "employer")
+    job_id = client.post("/jobs/", json={"title": "Developer", "description": "Python"},
+                         headers=employer).get_json()["job_id"]
+    other = login(client, "other@example.com", "employer")
+    assert client.get(f"/applications/job/{job_id}/applicants/export", headers=other).status_code == 404
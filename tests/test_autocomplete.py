@@ -0,0 +1,64 @@
+import time
+
+from models import db, Job, User
+from services.autocomplete import _suggest_from_database, get_autocomplete
+
+
+def wait_until_ready(app):
+    with app.app_context():
+        autocomplete = get_autocomplete()
+        autocomplete.ensure_ready()
+    deadline = time.monotonic() + 10
+    while autocomplete.state != "ready":
+        assert time.monotonic() < deadline, "autocomplete index did not build"
+        time.sleep(0.02)
+    autocomplete.sync_interval = 0
+    return autocomplete
+
+
+def add_job(job_id, title, location="Remote"):
+    # A posting committed by another worker, bypassing this worker's add_job()
+    db.session.add(Job(id=job_id, title=title, description=title.lower(), location=location, employer_id=1))
+    db.session.commit()
+
+
+def suggestions(client, q, field="title"):
+    body = client.get(f"/jobs/autocomplete?field={field}&q={q}").get_json()
+    return {item["value"]: item["count"] for item in body["suggestions"]}
+
+
+def test_sync_picks_up_jobs_that_commit_out_of_id_order(app, client):
+    with app.app_context():
+        db.session.add(User(id=1, email="employer@example.com", password="x", role="employer"))
+        add_job(1, "Python Developer")
+        add_job(4, "Python Developer")
+    wait_until_ready(app)
+    assert suggestions(client, "pyth") == {"Python Developer": 2}
+
+    with app.app_context():
+        add_job(6, "Python Developer")
+        add_job(3, "Python Developer")  # Committed after 4, inside the window read by the build
+    assert suggestions(client, "pyth") == {"Python Developer": 4}
+
+    with app.app_context():
+        add_job(5, "Python Developer")  # Committed after 6 was read
+    assert suggestions(client, "pyth") == {"Python Developer": 5}
+
+
+def test_database_fallback_matches_word_starts_like_the_index(app):
+    with app.app_context():
+        db.session.add(User(id=1, email="employer@example.com", password="x", role="employer"))
+        add_job(1, "Senior React Developer")
+        add_job(2, "React Native Engineer")
+        add_job(3, "Reactor Operator")
+        add_job(4, "Preact Developer")
+
+        assert sorted(_suggest_from_database("title", "rea", 10)) == [
+            ("React Native Engineer", 1), ("Reactor Operator", 1), ("Senior React Developer", 1)
+        ]
+        assert _suggest_from_database("title", "react dev", 10) == [("Senior React Developer", 1)]
+        assert _suggest_from_database("title", "100%", 10) == []
+
+        index = wait_until_ready(app)
+        assert sorted(value for value, _ in index.indexes["title"].suggest("rea", 10)) == \
+            sorted(value for value, _ in _suggest_from_database("title", "rea", 10))
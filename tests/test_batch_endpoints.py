@@ -0,0 +1,140 @@
+import sqlite3
+
+from sqlalchemy import event
+
+from models import db, User
+
+# JSON true/false must not pass for ids: bool is an int subclass in Python, and True
+# would otherwise act on id 1.
+
+
+def test_apply_batch_rejects_bool_job_ids(client, login):
+    employer = login(client, "employer@example.com", "employer")
+    seeker = login(client, "seeker@example.com", "seeker")
+    job_id = client.post("/jobs/", json={"title": "Developer", "description": "Python"},
+                         headers=employer).get_json()["job_id"]
+    assert job_id == 1
+
+    response = client.post("/applications/apply/batch", json={"job_ids": [True, job_id]}, headers=seeker)
+    results = response.get_json()["results"]
+    assert results[0] == {"job_id": True, "ok": False, "msg": "Invalid job id"}
+    assert results[1]["ok"] is True
+
+
+def test_status_batch_rejects_bool_app_ids(client, login):
+    employer = login(client, "employer@example.com", "employer")
+    seeker = login(client, "seeker@example.com", "seeker")
+    job_id = client.post("/jobs/", json={"title": "Developer", "description": "Python"},
+                         headers=employer).get_json()["job_id"]
+    assert client.post(f"/applications/apply/{job_id}", headers=seeker).status_code == 201
+
+    response = client.put("/applications/update-status/batch",
+                          json={"updates": [{"app_id": True, "status": "accepted"}]}, headers=employer)
+    assert response.get_json()["results"][0]["ok"] is False
+    statuses = client.get("/applications/my-applications", headers=seeker).get_json()
+    assert [row["status"] for row in statuses] == ["pending"]
+
+
+def _post_job(client, headers, title="Developer"):
+    return client.post("/jobs/", json={"title": title, "description": "Python"}, headers=headers).get_json()["job_id"]
+
+
+def _apply(client, seeker, job_id):
+    assert client.post(f"/applications/apply/{job_id}", headers=seeker).status_code == 201
+    rows = client.get("/applications/my-applications?fields=application_id,job_id", headers=seeker).get_json()
+    return next(row["application_id"] for row in rows if row["job_id"] == job_id)
+
+
+def _statuses(client, seeker):
+    rows = client.get("/applications/my-applications?fields=job_id,status", headers=seeker).get_json()
+    return {row["job_id"]: row["status"] for row in rows}
+
+
+def test_status_batch_partial_success_and_ownership(client, login):
+    employer = login(client, "employer@example.com", "employer")
+    other = login(client, "other@example.com", "employer")
+    seeker = login(client, "seeker@example.com", "seeker")
+    own_job, other_job = _post_job(client, employer), _post_job(client, other)
+    own_app = _apply(client, seeker, own_job)
+    other_app = _apply(client, seeker, other_job)
+
+    response = client.put("/applications/update-status/batch", json={"updates": [
+        {"app_id": own_app, "status": "accepted"},
+        {"app_id": other_app, "status": "rejected"},
+        {"app_id": 999, "status": "rejected"},
+        {"app_id": own_app, "status": "bogus"},
+    ]}, headers=employer)
+    results = response.get_json()["results"]
+    assert [result["ok"] for result in results] == [True, False, False, False]
+    assert results[1]["msg"] == results[2]["msg"] == "Application not found"
+    assert _statuses(client, seeker) == {own_job: "accepted", other_job: "pending"}
+
+
+def test_status_batch_applies_first_of_duplicate_app_ids(client, login):
+    employer = login(client, "employer@example.com", "employer")
+    seeker = login(client, "seeker@example.com", "seeker")
+    job_id = _post_job(client, employer)
+    app_id = _apply(client, seeker, job_id)
+
+    response = client.put("/applications/update-status/batch", json={"updates": [
+        {"app_id": app_id, "status": "accepted"},
+        {"app_id": app_id, "status": "rejected"},
+    ]}, headers=employer)
+    assert response.get_json()["results"] == [
+        {"app_id": app_id, "ok": True, "status": "accepted"},
+        {"app_id": app_id, "ok": False, "msg": "Duplicate app_id in this batch"},
+    ]
+    assert _statuses(client, seeker) == {job_id: "accepted"}
+
+
+def test_job_status_update_with_filter_keeps_counters(client, login):
+    employer = login(client, "employer@example.com", "employer")
+    seekers = [login(client, f"seeker{i}@example.com", "seeker") for i in range(3)]
+    job_id = _post_job(client, employer)
+    app_ids = [_apply(client, seeker, job_id)
+               for seeker in seekers]
+    client.put(f"/applications/update-status/{app_ids[0]}", json={"status": "accepted"}, headers=employer)
+
+    response = client.put(f"/applications/job/{job_id}/status",
+                          json={"status": "rejected", "filter": {"status": "pending"}}, headers=employer)
+    assert response.get_json()["updated"] == 2
+    assert [_statuses(client, seeker)[job_id] for seeker in seekers] == ["accepted", "rejected", "rejected"]
+    dashboard = client.get("/jobs/employer-dashboard", headers=employer).get_json()
+    assert (dashboard[0]["total_applications"], dashboard[0]["pending_reviews"]) == (3, 0)
+
+    other = login(client, "other@example.com", "employer")
+    assert client.put(f"/applications/job/{job_id}/status", json={"status": "pending"},
+                      headers=other).status_code == 404
+
+
+def test_apply_batch_reports_concurrent_applications_per_item(app, client, login, monkeypatch):
+    employer = login(client, "employer@example.com", "employer")
+    seeker = login(client, "seeker@example.com", "seeker")
+    first, second = _post_job(client, employer), _post_job(client, employer, "Designer")
+
+    # Another request of the same seeker commits an application to `first` between the
+    # duplicate check and the batch INSERT
+    with app.app_context():
+        engine = db.engine
+        seeker_id = db.session.query(User.id).filter_by(email="seeker@example.com").scalar()
+    raced = []
+
+    def apply_concurrently(conn, cursor, statement, parameters, context, executemany):
+        if statement.startswith("INSERT INTO applications") and not raced:
+            raced.append(True)
+            with sqlite3.connect(engine.url.database) as other:
+                other.execute("INSERT INTO applications (user_id, job_id, status) VALUES (?, ?, 'pending')",
+                              (seeker_id, first))
+
+    event.listen(engine, "before_cursor_execute", apply_concurrently)
+    try:
+        response = client.post("/applications/apply/batch", json={"job_ids": [first, second]}, headers=seeker)
+    finally:
+        event.remove(engine, "before_cursor_execute", apply_concurrently)
+
+    assert response.status_code == 201
+    assert response.get_json()["results"] == [
+        {"job_id": first, "ok": False, "msg": "You have already applied for this job"},
+        {"job_id": second, "ok": True},
+    ]
+    assert _statuses(client, seeker) == {first: "pending", second: "pending"}
@@ -0,0 +1,42 @@
+import gzip
+import json
+
+from models import db, Job, User
+
+
+def seed_jobs(app, count):
+    with app.app_context():
+        db.session.add(User(id=1, email="employer@example.com", password="x", role="employer"))
+        for job_id in range(1, count + 1):
+            db.session.add(Job(id=job_id, title=f"Python Developer {job_id}", description="Flask " * 20,
+                               location="Remote", employer_id=1))
+        db.session.commit()
+
+
+def test_listing_is_gzipped_and_the_compressed_body_reused(app, client):
+    seed_jobs(app, 20)
+
+    response = client.get("/jobs/", headers={"Accept-Encoding": "gzip"})
+    assert response.headers["Content-Encoding"] == "gzip"
+    assert "Accept-Encoding" in response.headers["Vary"]
+    jobs = json.loads(gzip.decompress(response.get_data()))
+    assert len(jobs) == 20
+    etag = response.headers["ETag"]
+    assert etag.startswith('W/')
+
+    again = client.get("/jobs/", headers={"Accept-Encoding": "gzip"})
+    assert again.get_data() == response.get_data()
+    assert len(app.extensions["compressed_bodies"].entries) == 1
+
+    # The weak validator still matches the cached listing
+    assert client.get("/jobs/", headers={"Accept-Encoding": "gzip", "If-None-Match": etag}).status_code == 304
+
+
+def test_small_or_unaccepted_responses_are_sent_as_they_are(app, client):
+    seed_jobs(app, 20)
+    plain = client.get("/jobs/", headers={"Accept-Encoding": "identity"})
+    assert "Content-Encoding" not in plain.headers
+    assert len(plain.get_json()) == 20
+
+    small = client.get("/jobs/?fields=id&q=developer%201", headers={"Accept-Encoding": "gzip"})
+    assert "Content-Encoding" not in small.headers
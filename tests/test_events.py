@@ -0,0 +1,64 @@
+from collections import namedtuple
+
+from models import db, ApplicationEvent, User
+from services.events import Subscription, event_stream
+
+Row = namedtuple("Row", "id type data")
+THREADED = {"wsgi.multithread": True}
+
+
+class FakeHub:
+    def unsubscribe(self, subscription):
+        pass
+
+
+def stream_ids(chunks):
+    return [line[4:] for chunk in chunks for line in chunk.splitlines() if line.startswith("id: ")]
+
+
+def test_stream_id_stays_below_an_event_that_commits_late():
+    subscription = Subscription(1, 10)
+    # Event 5 is read while 4 is still uncommitted (the hub's watermark is 3); 4 follows
+    subscription.queue.put((Row(5, "status", "{}"), 3))
+    subscription.queue.put((Row(4, "status", "{}"), 5))
+    subscription.queue.put((Row(5, "status", "{}"), 5))  # Already sent: skipped
+    ids = stream_ids(event_stream(FakeHub(), subscription, 3, None, [], 1000, 0.01, 0.2))
+    # ready, then 5 (resume point 3 plus 5), then 4 (everything up to 5)
+    assert ids == ["3", "3.5", "5"]
+
+
+def test_reconnect_replays_only_what_the_client_lacks(make_app, login):
+    app = make_app(EVENTS_MAX_STREAM_SECONDS=0)
+    client = app.test_client()
+    seeker = login(client, "seeker@example.com", "seeker")
+    with app.app_context():
+        user_id = db.session.query(User.id).filter_by(email="seeker@example.com").scalar()
+        for _ in range(4):
+            db.session.add(ApplicationEvent(user_id=user_id, type="status", data="{}"))
+        db.session.commit()
+
+    # The client had everything up to 1, and 3
+    response = client.get("/applications/events", headers=dict(seeker, **{"Last-Event-ID": "1.3"}),
+                          environ_overrides=THREADED)
+    assert response.status_code == 200
+    assert stream_ids([response.get_data(as_text=True)]) == ["1.2.3", "1.2.3.4", "4"]
+
+    assert client.get("/applications/events", headers=dict(seeker, **{"Last-Event-ID": "x"}),
+                      environ_overrides=THREADED).status_code == 400
+
+
+def test_query_string_token_must_be_an_events_token(make_app, login):
+    app = make_app(EVENTS_MAX_STREAM_SECONDS=0)
+    client = app.test_client()
+    seeker = login(client, "seeker@example.com", "seeker")
+    access_token = seeker["Authorization"].split()[1]
+
+    assert client.get(f"/applications/events?jwt={access_token}", environ_overrides=THREADED).status_code == 401
+
+    body = client.post("/applications/events/token", headers=seeker).get_json()
+    assert body["expires_in"] == 60
+    response = client.get(f"/applications/events?jwt={body['token']}", environ_overrides=THREADED)
+    assert response.status_code == 200
+    # Only good for the live feed
+    scoped = {"Authorization": f"Bearer {body['token']}"}
+    assert client.get("/applications/my-applications", headers=scoped).status_code != 200
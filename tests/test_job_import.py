@@ -0,0 +1,77 @@
+import time
+
+from sqlalchemy import event
+
+from models import db, Job, User
+from services.autocomplete import get_autocomplete
+
+CSV = (
+    "external_key,title,description,location\n"
+    "a1,Python Developer,Flask and SQL,Berlin\n"
+    "a2,,No title,Berlin\n"
+    "a1,Python Developer,Same key again,Berlin\n"
+    "a3,Data Engineer,Pipelines,\n"
+)
+
+
+def import_csv(client, headers, body):
+    return client.post("/jobs/import", data=body, headers=dict(headers, **{"Content-Type": "text/csv"}))
+
+
+def test_import_summary_and_reimport(client, login):
+    employer = login(client, "employer@example.com", "employer")
+
+    response = import_csv(client, employer, CSV)
+    assert response.status_code == 201
+    report = response.get_json()
+    assert (report["rows"], report["created"], report["skipped"], report["failed"]) == (4, 2, 0, 2)
+    assert [(error["line"], error["external_key"]) for error in report["errors"]] == [(3, "a2"), (4, "a1")]
+
+    report = import_csv(client, employer, CSV).get_json()
+    assert (report["created"], report["skipped"], report["failed"]) == (0, 2, 2)
+
+
+def test_keys_imported_concurrently_are_reported_per_row(app, client, login):
+    employer = login(client, "employer@example.com", "employer")
+    with app.app_context():
+        employer_id = db.session.query(User.id).filter_by(email="employer@example.com").scalar()
+        db.session.add(Job(title="Python Developer", description="x", location="Berlin",
+                           employer_id=employer_id, external_key="a1"))
+        db.session.commit()
+        engine = db.engine
+
+    # Another import of the same file committed "a1" after this one's transaction took
+    # its snapshot (MySQL REPEATABLE READ): the key lookups do not see it, only the
+    # unique index does
+    def import_concurrently(conn, cursor, statement, parameters, context, executemany):
+        if statement.startswith("SELECT jobs.external_key"):
+            return statement + " AND 0", parameters
+        return statement, parameters
+
+    event.listen(engine, "before_cursor_execute", import_concurrently, retval=True)
+    try:
+        response = import_csv(client, employer, CSV)
+    finally:
+        event.remove(engine, "before_cursor_execute", import_concurrently)
+
+    assert response.status_code == 201
+    report = response.get_json()
+    assert (report["created"], report["failed"]) == (1, 3)
+    assert report["errors"][-1] == {"line": 2, "external_key": "a1",
+                                    "errors": ["external_key was imported concurrently"]}
+
+
+def test_imported_jobs_are_suggested_at_once(app, client, login):
+    employer = login(client, "employer@example.com", "employer")
+    with app.app_context():
+        autocomplete = get_autocomplete()
+        autocomplete.ensure_ready()
+    deadline = time.monotonic() + 10
+    while autocomplete.state != "ready":
+        assert time.monotonic() < deadline, "autocomplete index did not build"
+        time.sleep(0.02)
+
+    # Well within SEARCH_SYNC_INTERVAL, so only the import itself can have synced
+    import_csv(client, employer, CSV)
+    body = client.get("/jobs/autocomplete?field=title&q=data").get_json()
+    assert [item["value"] for item in body["suggestions"]] == ["Data Engineer"]
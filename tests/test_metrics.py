@@ -0,0 +1,39 @@
+import re
+
+
+def scrape(client, remote_addr="127.0.0.1", **headers):
+    return client.get("/metrics", headers=headers, environ_base={"REMOTE_ADDR": remote_addr})
+
+
+def counter(body, name, endpoint):
+    match = re.search(rf'^{name}{{endpoint="{re.escape(endpoint)}"}} (\d+)$', body, re.M)
+    return int(match.group(1)) if match else 0
+
+
+def test_without_a_token_only_localhost_may_scrape(make_app, tmp_path):
+    client = make_app(METRICS_ENABLED=True, METRICS_DIR=str(tmp_path / "metrics")).test_client()
+    assert scrape(client).status_code == 200
+    assert scrape(client, "::1").status_code == 200
+    assert scrape(client, "10.0.0.7").status_code == 403
+
+
+def test_a_token_is_required_from_every_host(make_app, tmp_path):
+    client = make_app(METRICS_ENABLED=True, METRICS_DIR=str(tmp_path / "metrics"), METRICS_TOKEN="s3cret").test_client()
+    assert scrape(client).status_code == 401
+    assert scrape(client, "10.0.0.7", Authorization="Bearer wrong").status_code == 401
+    assert scrape(client, "10.0.0.7", Authorization="Bearer s3cret").status_code == 200
+
+
+def test_streamed_responses_count_the_bytes_sent(make_app, tmp_path, login):
+    client = make_app(METRICS_ENABLED=True, METRICS_DIR=str(tmp_path / "metrics")).test_client()
+    employer = login(client, "employer@example.com", "employer")
+    for i in range(3):
+        client.post("/jobs/", json={"title": f"Job {i}", "description": "x" * 100}, headers=employer)
+
+    response = client.get("/jobs/?stream=ndjson")
+    assert response.is_streamed
+    body = response.get_data()
+    response.close()
+
+    assert len(body.splitlines()) == 3
+    assert counter(scrape(client).get_data(as_text=True), "http_response_bytes_total", "jobs.get_jobs") == len(body)
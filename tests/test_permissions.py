@@ -0,0 +1,43 @@
+from models import db, Application, Job, User
+from services.generations import LocalGenerations
+from services.permissions import TOO_MANY, ApplicantAccessIndex
+
+
+def seed():
+    # Employer 1 has seekers 10-14 as applicants, employer 2 has seekers 10-12
+    db.session.add_all([User(id=i, email=f"user{i}@example.com", password="x",
+                             role="employer" if i < 10 else "seeker") for i in (1, 2, *range(10, 16))])
+    db.session.add_all([Job(id=1, title="A", description="a", employer_id=1),
+                        Job(id=2, title="B", description="b", employer_id=2)])
+    db.session.add_all([Application(user_id=i, job_id=1) for i in range(10, 15)]
+                       + [Application(user_id=i, job_id=2) for i in range(10, 13)])
+    db.session.commit()
+
+
+def test_total_cached_applicant_ids_are_bounded(app):
+    with app.app_context():
+        seed()
+        index = ApplicantAccessIndex(LocalGenerations(), max_applicants=6)
+        assert index.has_applicant(1, 14)
+        assert index.has_applicant(2, 12)
+        # 5 + 3 ids do not fit in 6: the least recently used employer is dropped
+        assert list(index.applicants.entries) == [2]
+        assert index.applicants.size == 3
+
+
+def test_employers_with_too_many_applicants_are_not_cached(app):
+    with app.app_context():
+        seed()
+        index = ApplicantAccessIndex(LocalGenerations(), max_set_size=4)
+        assert index.has_applicant(1, 14)
+        assert index.applicants.get(1) is TOO_MANY
+        assert index.applicants.size == 1
+        assert index.has_applicant(1, 10)
+        assert not index.has_applicant(1, 15)
+
+        # A set that outgrows the limit through new applications is dropped as well
+        assert index.has_applicant(2, 10)
+        index.record_application(2, 13)
+        assert index.applicants.get(2) == {10, 11, 12, 13}
+        index.record_application(2, 14)
+        assert index.applicants.get(2) is TOO_MANY
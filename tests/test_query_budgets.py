@@ -0,0 +1,81 @@
+import pytest
+from flask import Flask
+from sqlalchemy import create_engine, text
+
+from services.query_counter import QueryBudgetExceeded, install_query_counter, query_budget
+
+# The hot read endpoints under TESTING=True, where going over a @query_budget raises
+# instead of only being reported. Enough jobs and applicants that a query per row
+# (N+1) would exceed every budget, and the per-worker caches are emptied first so the
+# token and job-owner checks hit the database too (a fresh worker's worst case).
+
+JOBS = 5
+SEEKERS = 6
+
+
+@pytest.fixture
+def portal(client, login):
+    employer = login(client, "employer@example.com", "employer")
+    job_ids = [
+        client.post("/jobs/", json={"title": f"Developer {i}", "description": "Python", "location": "Berlin"},
+                    headers=employer).get_json()["job_id"]
+        for i in range(JOBS)
+    ]
+    seekers = [login(client, f"seeker{i}@example.com", "seeker") for i in range(SEEKERS)]
+    for seeker in seekers:
+        for job_id in job_ids:
+            assert client.post(f"/applications/apply/{job_id}", headers=seeker).status_code == 201
+    return employer, seekers, job_ids
+
+
+def cold_get(app, client, url, headers):
+    for name in ("revocation_cache", "applicant_access"):
+        app.extensions.pop(name, None)
+    return client.get(url, headers=headers)
+
+
+def sql_statements(response):
+    return int(response.headers["X-SQL-Queries"])
+
+
+def test_employer_dashboard_within_budget(app, client, portal):
+    employer, _, _ = portal
+    response = cold_get(app, client, "/jobs/employer-dashboard", employer)
+    assert response.status_code == 200
+    assert len(response.get_json()) == JOBS
+    assert all(job["total_applications"] == SEEKERS for job in response.get_json())
+    assert sql_statements(response) <= 3
+
+
+def test_job_applicants_within_budget(app, client, portal):
+    employer, _, job_ids = portal
+    response = cold_get(app, client, f"/applications/job/{job_ids[0]}/applicants", employer)
+    assert response.status_code == 200
+    assert len(response.get_json()["applicants"]) == SEEKERS
+    assert sql_statements(response) <= 3
+
+
+def test_my_applications_within_budget(app, client, portal):
+    _, seekers, _ = portal
+    response = cold_get(app, client, "/applications/my-applications", seekers[0])
+    assert response.status_code == 200
+    assert len(response.get_json()) == JOBS
+    assert sql_statements(response) <= 2
+
+
+def test_budget_overrun_fails_under_testing():
+    app = Flask(__name__)
+    app.config["TESTING"] = True
+    install_query_counter(app)
+    engine = create_engine("sqlite://")
+
+    @app.route("/n-plus-one")
+    @query_budget(2)
+    def n_plus_one():
+        with engine.connect() as connection:
+            for i in range(3):
+                connection.execute(text("SELECT :i"), {"i": i})
+        return "ok"
+
+    with pytest.raises(QueryBudgetExceeded):
+        app.test_client().get("/n-plus-one")
@@ -0,0 +1,47 @@
+from sqlalchemy import select
+
+from models import db, Application, Job, User
+from services import query_plans
+from services.query_plans import check_query_plans
+
+
+def seed(count=40):
+    # A few employers, seekers, jobs and applications: enough rows for every hot request to run
+    db.session.add_all(
+        [User(id=i, email=f"employer{i}@example.com", password="x", role="employer") for i in range(1, 4)]
+        + [User(id=i, email=f"seeker{i}@example.com", password="x", role="seeker") for i in range(4, 10)]
+    )
+    db.session.add_all(
+        Job(id=i, title=f"Python Engineer {i}", description="python flask remote", location="Remote",
+            employer_id=1 + i % 3)
+        for i in range(1, count + 1)
+    )
+    db.session.add_all(
+        Application(user_id=user_id, job_id=job_id, status="pending")
+        for user_id in range(4, 10) for job_id in range(user_id, count + 1, 5)
+    )
+    db.session.commit()
+
+
+def test_hot_queries_use_indexes(app):
+    lines = []
+    with app.app_context():
+        seed()
+        failures = check_query_plans(app, lines.append)
+
+    assert failures == 0, "\n".join(lines)
+    assert not lines[-1].startswith("0 statements")
+
+
+def test_filtered_scan_on_a_listing_endpoint_fails(app, monkeypatch):
+    # The unfiltered listing may scan jobs, a filtered query on the same endpoint may not
+    unindexed = ('jobs.search_jobs', select(Job.id).where(Job.description == 'python'))
+    write_path_queries = query_plans._write_path_queries
+    monkeypatch.setattr(query_plans, "_write_path_queries", lambda: write_path_queries() + [unindexed])
+    lines = []
+    with app.app_context():
+        seed()
+        failures = check_query_plans(app, lines.append)
+
+    assert failures == 1
+    assert any(line.startswith("FAIL  jobs.search_jobs: full scan of jobs") for line in lines)
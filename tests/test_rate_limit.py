@@ -0,0 +1,40 @@
+import pytest
+
+
+@pytest.fixture
+def app(make_app):
+    return make_app(RATE_LIMIT_ENABLED=True, RATE_LIMIT_LOGIN_IP="100/minute", RATE_LIMIT_LOGIN_EMAIL="3/minute",
+                    RATE_LIMIT_REGISTER_IP="", RATE_LIMIT_SEARCH_IP="5/minute")
+
+
+def log_in(client, password, email="seeker@example.com"):
+    return client.post("/auth/login", json={"email": email, "password": password})
+
+
+@pytest.fixture
+def account(client):
+    client.post("/auth/register", json={"email": "seeker@example.com", "password": "pw", "role": "seeker"})
+
+
+def test_throttled_requests_get_429_with_retry_after(client):
+    statuses = [client.get("/jobs/search?q=python").status_code for _ in range(6)]
+    assert statuses == [200] * 5 + [429]
+
+    response = client.get("/jobs/search?q=python")
+    assert response.get_json() == {"msg": "Too many requests, please retry later"}
+    # Until enough of the sliding window has passed: at most two windows
+    assert 1 <= int(response.headers["Retry-After"]) <= 120
+
+
+def test_successful_logins_do_not_count_against_the_account(client, account):
+    assert [log_in(client, "pw").status_code for _ in range(6)] == [200] * 6
+
+
+def test_failed_logins_lock_the_account_until_the_window_slides(client, account):
+    assert [log_in(client, "wrong").status_code for _ in range(3)] == [401] * 3
+
+    response = log_in(client, "pw")
+    assert response.status_code == 429
+    assert int(response.headers["Retry-After"]) >= 1
+    # Other accounts are not affected
+    assert log_in(client, "wrong", email="other@example.com").status_code == 401
@@ -0,0 +1,99 @@
+import time
+
+import pytest
+
+from models import db, Job
+from services import recommend
+from services.recommend import get_recommender
+
+
+def wait_until_ready(app):
+    with app.app_context():
+        recommender = get_recommender()
+        recommender.ensure_ready()
+    deadline = time.monotonic() + 10
+    while recommender.state != "ready":
+        assert time.monotonic() < deadline, "recommendation index did not build"
+        time.sleep(0.02)
+    recommender.sync_interval = 0
+    return recommender
+
+
+@pytest.fixture
+def postings(client, login):
+    employer = login(client, "employer@example.com", "employer")
+    post = lambda title, description: client.post(  # noqa: E731
+        "/jobs/", json={"title": title, "description": description}, headers=employer).get_json()["job_id"]
+    python = [post(f"Python Developer {i}", "python django postgres backend") for i in range(6)]
+    other = [post(f"Pastry Chef {i}", "bakery croissant pastry kitchen") for i in range(3)]
+    return python, other
+
+
+def test_newest_postings_without_history(app, client, login, postings):
+    python, other = postings
+    seeker = login(client, "seeker@example.com", "seeker")
+    wait_until_ready(app)
+
+    body = client.get("/jobs/recommended?limit=3", headers=seeker).get_json()
+    assert body["personalized"] is False
+    assert [job["id"] for job in body["jobs"]] == sorted(python + other, reverse=True)[:3]
+
+
+def test_ranks_similar_jobs_first(app, client, login, postings):
+    python, other = postings
+    seeker = login(client, "seeker@example.com", "seeker")
+    client.post(f"/applications/apply/{python[0]}", headers=seeker)
+    wait_until_ready(app)
+
+    body = client.get("/jobs/recommended?limit=5", headers=seeker).get_json()
+    assert body["personalized"] is True
+    assert {job["id"] for job in body["jobs"]} == set(python[1:])
+
+
+def test_excludes_every_applied_job_beyond_the_profile(app, client, login, postings, monkeypatch):
+    python, _ = postings
+    monkeypatch.setattr(recommend, "MAX_PROFILE_JOBS", 2)
+    seeker = login(client, "seeker@example.com", "seeker")
+    for job_id in python[:4]:
+        client.post(f"/applications/apply/{job_id}", headers=seeker)
+    wait_until_ready(app)
+
+    body = client.get("/jobs/recommended?limit=10", headers=seeker).get_json()
+    recommended = {job["id"] for job in body["jobs"]}
+    assert recommended.isdisjoint(python[:4])
+    assert set(python[4:]) <= recommended
+
+
+def test_new_posting_from_another_worker_is_recommended(app, client, login, postings):
+    python, _ = postings
+    seeker = login(client, "seeker@example.com", "seeker")
+    client.post(f"/applications/apply/{python[0]}", headers=seeker)
+    wait_until_ready(app)
+
+    with app.app_context():
+        job = Job(title="Python Engineer", description="python django backend", location="Remote", employer_id=1)
+        db.session.add(job)
+        db.session.commit()
+        job_id = job.id
+
+    body = client.get("/jobs/recommended?limit=10", headers=seeker).get_json()
+    assert job_id in {job["id"] for job in body["jobs"]}
+
+
+def test_jobs_committed_out_of_id_order_are_recommended(app, client, login, postings):
+    python, _ = postings
+    seeker = login(client, "seeker@example.com", "seeker")
+    client.post(f"/applications/apply/{python[0]}", headers=seeker)
+    recommender = wait_until_ready(app)
+
+    late, early = python[-1] + 10, python[-1] + 5
+    with app.app_context():
+        for job_id in (late, early):  # `early` was handed out first but commits last
+            db.session.add(Job(id=job_id, title="Python Engineer", description="python django backend",
+                               location="Remote", employer_id=1))
+            db.session.commit()
+            client.get("/jobs/recommended?limit=10", headers=seeker)
+
+    body = client.get("/jobs/recommended?limit=10", headers=seeker).get_json()
+    assert {late, early} <= {job["id"] for job in body["jobs"]}
+    assert early not in recommender.cursor.gaps
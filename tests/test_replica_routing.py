@@ -0,0 +1,92 @@
+import shutil
+import sqlite3
+import time
+
+import pytest
+
+from models import db, User
+from services.db_routing import get_recent_writes
+
+# Two SQLite files stand in for a primary and its replica: the replica is a copy of
+# the primary taken after the setup, so whatever a test writes afterwards shows where
+# a response was read from. @read_replica views read the copy unless the current user
+# (or a table the view lists) was written within REPLICA_LAG_TOLERANCE seconds.
+
+
+@pytest.fixture
+def replicated(tmp_path, make_app, login):
+    app = make_app(
+        SQLALCHEMY_BINDS={"replica1": f"sqlite:///{tmp_path / 'replica.db'}"},
+        REPLICA_BIND_KEYS=["replica1"],
+        REPLICA_LAG_TOLERANCE=2,
+    )
+    client = app.test_client()
+    employer = login(client, "employer@example.com", "employer")
+    job_id = client.post("/jobs/", json={"title": "Developer", "description": "Python"},
+                         headers=employer).get_json()["job_id"]
+    seekers = [login(client, f"seeker{i}@example.com", "seeker") for i in range(2)]
+    with app.app_context():
+        db.session.remove()
+        db.engines[None].dispose()
+        shutil.copyfile(tmp_path / "primary.db", tmp_path / "replica.db")
+        # As if the setup had happened long enough ago to have reached the replica
+        get_recent_writes().values.clear()
+    return app, client, employer, seekers, job_id
+
+
+def apply_on_primary_only(app, tmp_path, email, job_id):
+    # A row the replica has not caught up with, written without marking a recent write
+    with app.app_context():
+        user_id = db.session.query(User.id).filter_by(email=email).scalar()
+    with sqlite3.connect(tmp_path / "primary.db") as connection:
+        connection.execute(
+            "INSERT INTO applications (user_id, job_id, status, applied_on) VALUES (?, ?, 'pending', ?)",
+            (user_id, job_id, "2026-01-01 00:00:00")
+        )
+
+
+def my_job_ids(client, headers):
+    response = client.get("/applications/my-applications?fields=job_id", headers=headers)
+    assert response.status_code == 200
+    return [row["job_id"] for row in response.get_json()]
+
+
+def test_reads_go_to_the_replica(tmp_path, replicated):
+    app, client, _, seekers, job_id = replicated
+    apply_on_primary_only(app, tmp_path, "seeker1@example.com", job_id)
+
+    assert my_job_ids(client, seekers[1]) == []
+
+
+def test_own_recent_write_falls_back_to_the_primary(replicated):
+    app, client, _, seekers, job_id = replicated
+    assert client.post(f"/applications/apply/{job_id}", headers=seekers[0]).status_code == 201
+
+    assert my_job_ids(client, seekers[0]) == [job_id]
+
+
+def test_back_to_the_replica_after_the_lag_tolerance(replicated):
+    app, client, _, seekers, job_id = replicated
+    assert client.post(f"/applications/apply/{job_id}", headers=seekers[0]).status_code == 201
+    with app.app_context():
+        recent = get_recent_writes()
+        for key in list(recent.values):
+            recent.values[key] = time.time() - 3
+
+    assert my_job_ids(client, seekers[0]) == []  # The copy predates the application
+
+
+def test_table_write_falls_back_to_the_primary(replicated):
+    app, client, employer, _, _ = replicated
+    client.post("/jobs/", json={"title": "Designer", "description": "Figma"}, headers=employer)
+
+    # /jobs/ depends on 'jobs', so every client's listing has the new posting
+    assert {job["title"] for job in client.get("/jobs/").get_json()} == {"Developer", "Designer"}
+
+
+def test_negative_tolerance_disables_replica_reads(tmp_path, replicated):
+    app, client, _, seekers, job_id = replicated
+    app.config["REPLICA_LAG_TOLERANCE"] = -1
+    apply_on_primary_only(app, tmp_path, "seeker1@example.com", job_id)
+
+    assert my_job_ids(client, seekers[1]) == [job_id]
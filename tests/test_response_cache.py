@@ -0,0 +1,33 @@
+def post_job(client, headers, title):
+    return client.post("/jobs/", json={"title": title, "description": "Python"}, headers=headers)
+
+
+def test_listing_etag_answers_304_until_a_job_is_posted(client, login):
+    employer = login(client, "employer@example.com", "employer")
+    post_job(client, employer, "Developer")
+
+    first = client.get("/jobs/")
+    etag = first.headers["ETag"]
+    assert first.status_code == 200
+    assert "Accept" in first.headers["Vary"]
+
+    cached = client.get("/jobs/", headers={"If-None-Match": etag})
+    assert cached.status_code == 304
+    assert cached.get_data() == b""
+
+    post_job(client, employer, "Designer")
+    fresh = client.get("/jobs/", headers={"If-None-Match": etag})
+    assert fresh.status_code == 200
+    assert fresh.headers["ETag"] != etag
+    assert len(fresh.get_json()) == 2
+
+
+def test_search_cache_key_ignores_case_and_argument_order(client, login):
+    employer = login(client, "employer@example.com", "employer")
+    post_job(client, employer, "Developer")
+
+    etag = client.get("/jobs/search?title=Dev&location=remote").headers["ETag"]
+    same = client.get("/jobs/search?location=Remote&title=dev", headers={"If-None-Match": etag})
+    assert same.status_code == 304
+    other = client.get("/jobs/search?title=designer", headers={"If-None-Match": etag})
+    assert other.status_code == 200
@@ -0,0 +1,44 @@
+import time
+from concurrent.futures import Future
+
+from models import db, ResumeBlob, ResumeDocument, ResumeTerm
+from services.resume_text import ExtractionPipeline
+
+
+class FlakyExecutor:
+    # Stands in for the process pool: fails the first `failures` extractions
+    def __init__(self, failures):
+        self.failures = failures
+        self.calls = []
+
+    def submit(self, fn, path):
+        self.calls.append(time.monotonic())
+        future = Future()
+        if len(self.calls) <= self.failures:
+            future.set_exception(OSError("unreadable"))
+        else:
+            future.set_result({"python", "flask"})
+        return future
+
+
+def test_failed_extraction_is_retried_after_a_delay(app):
+    pipeline = ExtractionPipeline(app, workers=1, max_pending=4, max_attempts=3, retry_delay=0.2)
+    executor = FlakyExecutor(failures=1)
+    pipeline._get_executor = lambda: executor
+    with app.app_context():
+        db.session.add_all([ResumeDocument(sha256="abc"), ResumeBlob(path="abc.pdf", sha256="abc", size=1)])
+        db.session.commit()
+
+        assert pipeline.submit("abc", "abc.pdf")
+        assert db.session.get(ResumeDocument, "abc").attempts == 1
+        # Waiting for its retry: a sweep must not resubmit it at once
+        assert pipeline.retrying == {"abc"}
+        assert pipeline.sweep() == 0
+
+        deadline = time.monotonic() + 5
+        while db.session.get(ResumeDocument, "abc", populate_existing=True).status != "done":
+            assert time.monotonic() < deadline, "extraction was not retried"
+            db.session.rollback()
+            time.sleep(0.02)
+        assert {term.term for term in ResumeTerm.query.filter_by(sha256="abc")} == {"python", "flask"}
+    assert executor.calls[1] - executor.calls[0] >= 0.2
@@ -0,0 +1,45 @@
+import time
+
+from services.generations import LocalGenerations
+from services.token_blocklist import RevocationCache
+
+
+def test_logged_out_token_is_rejected_on_its_next_request(client, login):
+    headers = login(client, "seeker@example.com", "seeker")
+    assert client.get("/applications/my-applications", headers=headers).status_code == 200
+
+    assert client.delete("/auth/logout", headers=headers).status_code == 200
+    response = client.get("/applications/my-applications", headers=headers)
+    assert response.status_code == 401
+
+
+def test_logout_is_seen_by_a_worker_that_cached_the_token_as_valid(app, client, login):
+    headers = login(client, "seeker@example.com", "seeker")
+    assert client.get("/applications/my-applications", headers=headers).status_code == 200
+    cache = app.extensions["revocation_cache"]
+    assert len(cache.valid) == 1
+
+    client.delete("/auth/logout", headers=headers)
+    # What another worker sees: the token is cached as valid, and only the shared
+    # generation has moved
+    cache.revoked.clear()
+    assert client.get("/applications/my-applications", headers=headers).status_code == 401
+
+
+def test_revoked_entries_stay_bounded_without_expiry():
+    cache = RevocationCache(LocalGenerations(), max_entries=100)
+    for i in range(1000):
+        cache.revoke(f"jti-{i}")  # No expiry known
+    assert len(cache.revoked) <= 100
+    assert "jti-999" in cache.revoked
+    assert "jti-0" not in cache.revoked
+
+
+def test_expired_entries_are_evicted_before_live_ones():
+    cache = RevocationCache(LocalGenerations(), max_entries=10)
+    now = time.time()
+    cache.revoke("live", now + 3600)
+    for i in range(10):
+        cache.revoke(f"expired-{i}", now - 1)
+    assert "live" in cache.revoked
+    assert not any(jti.startswith("expired") for jti in cache.revoked)
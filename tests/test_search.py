@@ -0,0 +1,142 @@
+from models import db, Job, User
+from services import search
+from services.search import get_search_backend, search_job_ids
+
+
+def add_job(job_id, title, location="Remote"):
+    # A posting committed by another worker, bypassing this worker's index_job()
+    db.session.add(Job(id=job_id, title=title, description=title.lower(), location=location, employer_id=1))
+    db.session.commit()
+
+
+def test_sync_picks_up_jobs_that_commit_out_of_id_order(app):
+    with app.app_context():
+        db.session.add(User(id=1, email="employer@example.com", password="x", role="employer"))
+        add_job(1, "Python Developer")
+        add_job(4, "Python Engineer")
+        index = get_search_backend()
+        index.sync(force=True)
+        assert sorted(search_job_ids(q="python")) == [1, 4]
+
+        # Ids 2 and 3 were handed out before 4 but commit after it was read
+        add_job(3, "Python Architect")
+        index.sync(force=True)
+        assert sorted(search_job_ids(q="python")) == [1, 3, 4]
+
+        add_job(2, "Python Analyst")
+        add_job(5, "Python Intern")
+        index.sync(force=True)
+        assert sorted(search_job_ids(q="python")) == [1, 2, 3, 4, 5]
+        assert not index.cursor.gaps
+
+
+def test_gaps_from_rolled_back_inserts_expire(app):
+    with app.app_context():
+        db.session.add(User(id=1, email="employer@example.com", password="x", role="employer"))
+        add_job(1, "Python Developer")
+        add_job(3, "Python Engineer")
+        index = get_search_backend()
+        index.sync(force=True)
+        assert set(index.cursor.gaps) == {2}
+
+        index.cursor.gap_timeout = 0
+        index.sync(force=True)
+        assert not index.cursor.gaps
+
+
+def test_jobs_indexed_by_this_worker_are_not_read_again(app, client, login):
+    employer = login(client, "employer@example.com", "employer")
+    job_id = client.post("/jobs/", json={"title": "Go Developer", "description": "go"},
+                         headers=employer).get_json()["job_id"]
+    with app.app_context():
+        index = get_search_backend()
+        assert job_id in index.cursor.added
+        add_job(job_id + 1, "Rust Developer")
+        index.sync(force=True)
+        assert not index.cursor.added
+        assert index.cursor.last_id == job_id + 1
+        assert sorted(search_job_ids(title="developer")) == [job_id, job_id + 1]
+
+
+def test_short_prefix_keeps_the_most_common_expansions(app, monkeypatch):
+    monkeypatch.setattr(search, "MAX_PREFIX_EXPANSIONS", 2)
+    with app.app_context():
+        db.session.add(User(id=1, email="employer@example.com", password="x", role="employer"))
+        # "daa" and "dab" sort first but are rare; "developer" is in most jobs
+        add_job(1, "Daa Specialist")
+        add_job(2, "Dab Specialist")
+        for job_id in range(3, 6):
+            add_job(job_id, "Developer")
+        add_job(6, "Designer")
+        add_job(7, "Designer")
+
+        assert sorted(search_job_ids(title="d")) == [3, 4, 5, 6, 7]
+
+
+def test_mysql_query_matches_short_words_and_stopwords_without_fulltext():
+    backend = search.MySQLFullTextSearch()
+    backend.min_token_size, backend.stopwords = 3, search.INNODB_DEFAULT_STOPWORDS
+    sql, params = backend.build_query(search.build_clauses(title="go developer", q="it"))
+    sql = " ".join(str(sql).split())
+
+    assert params == {"r0_0": r"\bgo\b", "q0": "+developer*", "r1_0": r"\bit"}
+    assert "MATCH(title) AGAINST(:q0 IN BOOLEAN MODE) AS score" in sql
+    assert "(title REGEXP :r0_0)" in sql
+    assert "(title REGEXP :r1_0 OR description REGEXP :r1_0 OR location REGEXP :r1_0)" in sql
+
+
+def test_mysql_query_of_only_short_words_has_no_match():
+    backend = search.MySQLFullTextSearch()
+    backend.min_token_size, backend.stopwords = 3, frozenset()
+    sql, params = backend.build_query(search.build_clauses(title="c"))
+
+    assert params == {"r0_0": r"\bc"}
+    assert " ".join(str(sql).split()) == \
+        "SELECT id, 0 AS score FROM jobs WHERE (title REGEXP :r0_0) ORDER BY score DESC, id DESC"
+
+
+def test_listing_filters_match_words_and_word_starts_not_substrings(client, login):
+    employer = login(client, "employer@example.com", "employer")
+    for title, location in (("Senior Python Developer", "Berlin"), ("React Developer (Remote)", "New York")):
+        client.post("/jobs/", json={"title": title, "description": "x", "location": location}, headers=employer)
+
+    def titles(query):
+        return sorted(job["title"] for job in client.get(f"/jobs/?{query}").get_json())
+
+    assert titles("title=velop") == []              # Inside a word
+    assert titles("title=DEV") == ["React Developer (Remote)", "Senior Python Developer"]
+    assert titles("title=python dev") == ["Senior Python Developer"]
+    assert titles("title=pyth developer") == []     # Only the last word is a prefix...
+    assert titles("title=pyth* developer") == ["Senior Python Developer"]  # ...unless it ends in *
+    assert titles("title=remote") == ["React Developer (Remote)"]
+    assert titles("location=york") == ["React Developer (Remote)"]
+    assert titles("location=ork") == []
+
+
+def test_cursor_pages_reuse_the_ranked_results(app, client, login, monkeypatch):
+    with app.app_context():
+        db.session.add(User(id=1, email="employer@example.com", password="x", role="employer"))
+        for job_id in range(1, 8):
+            add_job(job_id, f"Python Developer {job_id}")
+        index = get_search_backend()
+        index.sync(force=True)
+    searches = []
+
+    def counting_search(clauses):
+        searches.append(clauses)
+        return search.InMemoryJobIndex.search(index, clauses)
+    monkeypatch.setattr(index, "search", counting_search)
+
+    ids, cursor = [], ""
+    while cursor is not None:
+        body = client.get(f"/jobs/search?q=python&per_page=3&cursor={cursor}").get_json()
+        ids += [job["id"] for job in body["jobs"]]
+        cursor = body["next_cursor"]
+    assert sorted(ids) == list(range(1, 8))
+    assert len(searches) == 1
+
+    # A new posting changes the results
+    client.post("/jobs/", json={"title": "Python Lead", "description": "x"},
+                headers=login(client, "other@example.com", "employer"))
+    assert client.get("/jobs/search?q=python&per_page=3&cursor=").get_json()["total_jobs"] == 8
+    assert len(searches) == 2
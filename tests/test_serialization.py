@@ -0,0 +1,41 @@
+from services.query_counter import count_queries
+
+
+def post_job(client, headers):
+    return client.post("/jobs/", json={"title": "Python Developer", "description": "Flask", "location": "Berlin"},
+                       headers=headers).get_json()["job_id"]
+
+
+def test_fields_select_only_the_requested_columns(app, client, login):
+    employer = login(client, "employer@example.com", "employer")
+    post_job(client, employer)
+
+    with count_queries() as statements:
+        jobs = client.get("/jobs/?fields=id,title").get_json()
+    assert jobs == [{"id": 1, "title": "Python Developer"}]
+    job_selects = [statement for statement in statements if "FROM jobs" in statement]
+    assert job_selects and all("description" not in statement for statement in job_selects)
+
+    response = client.get("/jobs/?fields=id,salary")
+    assert response.status_code == 400
+    assert response.get_json()["msg"] == "Unknown fields: salary"
+    assert "title" in response.get_json()["fields"]
+
+
+def test_related_and_computed_fields(client, login):
+    employer = login(client, "employer@example.com", "employer")
+    job_id = post_job(client, employer)
+    seeker = login(client, "seeker@example.com", "seeker")
+    client.post(f"/applications/apply/{job_id}", headers=seeker)
+
+    # Default search fields include the employer's email, joined in
+    result = client.get("/jobs/search?q=python").get_json()["jobs"][0]
+    assert result == {"id": job_id, "title": "Python Developer", "location": "Berlin",
+                      "employer": "employer@example.com"}
+
+    # resume_url is built from seeker_id, which is loaded for it but not returned
+    applicants = client.get(f"/applications/job/{job_id}/applicants?fields=resume_url,applied_on",
+                            headers=employer).get_json()["applicants"]
+    assert set(applicants[0]) == {"resume_url", "applied_on"}
+    assert applicants[0]["resume_url"].startswith("/applications/download-resume/")
+    assert applicants[0]["applied_on"].endswith("GMT")
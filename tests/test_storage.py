@@ -0,0 +1,89 @@
+import io
+import threading
+
+from models import db, ResumeBlob, User
+from routes import seekers
+from services.storage import delete_unreferenced, get_storage, release_resume, store_resume
+
+PDF = b"%PDF-1.4\n1 0 obj\n<< /Length 0 >>\nstream\nBT (python flask) Tj ET\nendstream\nendobj\n%%EOF\n"
+
+
+def upload(client, headers, content=PDF, name="cv.pdf"):
+    return client.post("/seeker/upload-resume", data={"resume": (io.BytesIO(content), name)},
+                       headers=headers, content_type="multipart/form-data")
+
+
+def test_identical_uploads_share_one_file(app, client, login):
+    alice = login(client, "alice@example.com", "seeker")
+    bob = login(client, "bob@example.com", "seeker")
+    path = upload(client, alice).get_json()["path"]
+    assert upload(client, bob).get_json()["path"] == path
+
+    with app.app_context():
+        storage = get_storage()
+        assert db.session.get(ResumeBlob, path).ref_count == 2
+
+        assert client.delete("/seeker/delete-resume", headers=alice).status_code == 200
+        assert storage.exists(path)
+        assert db.session.get(ResumeBlob, path).ref_count == 1
+
+        # Replacing the last reference removes the old file once the new one is committed
+        new_path = upload(client, bob, PDF + b"\n").get_json()["path"]
+        assert new_path != path
+        assert not storage.exists(path)
+        assert db.session.get(ResumeBlob, path) is None
+        assert storage.exists(new_path)
+
+
+def test_delete_waits_for_an_upload_of_the_same_content_to_commit(app):
+    stored, proceed = threading.Event(), threading.Event()
+    paths = []
+
+    def upload_and_commit():
+        with app.app_context():
+            path, _ = store_resume(io.BytesIO(PDF), "pdf")
+            paths.append(path)
+            stored.set()
+            proceed.wait(5)
+            db.session.commit()
+
+    uploader = threading.Thread(target=upload_and_commit)
+    uploader.start()
+    assert stored.wait(5)
+
+    # The file is in place but its reference is not committed yet: a delete of the
+    # previous (last) reference to the same content must not remove it
+    deleted = threading.Event()
+
+    def delete():
+        with app.app_context():
+            delete_unreferenced(paths[0])
+            deleted.set()
+
+    deleter = threading.Thread(target=delete)
+    deleter.start()
+    assert not deleted.wait(0.2)
+    proceed.set()
+    uploader.join(5)
+    deleter.join(5)
+
+    with app.app_context():
+        assert deleted.is_set()
+        assert get_storage().exists(paths[0])
+        assert db.session.get(ResumeBlob, paths[0]).ref_count == 1
+
+
+def test_failed_delete_rolls_back(app, client, login, monkeypatch):
+    alice = login(client, "alice@example.com", "seeker")
+    path = upload(client, alice).get_json()["path"]
+
+    def release_then_fail(path):
+        release_resume(path)
+        raise OSError("disk on fire")
+    monkeypatch.setattr(seekers, "release_resume", release_then_fail)
+
+    assert client.delete("/seeker/delete-resume", headers=alice).status_code == 500
+    with app.app_context():
+        assert db.session.get(ResumeBlob, path).ref_count == 1
+        assert db.session.query(User.resume_path).filter_by(email="alice@example.com").scalar() == path
+        assert get_storage().exists(path)
@@ -0,0 +1,40 @@
+import json
+
+from models import db, Job, User
+
+
+def seed_jobs(app, titles):
+    with app.app_context():
+        db.session.add(User(id=1, email="employer@example.com", password="x", role="employer"))
+        for job_id, title in enumerate(titles, 1):
+            db.session.add(Job(id=job_id, title=title, description="d", location="Remote", employer_id=1))
+        db.session.commit()
+
+
+def test_ndjson_and_json_streams_match_the_plain_listing(make_app):
+    app = make_app(STREAM_BATCH_SIZE=2)
+    seed_jobs(app, [f"Job {i}" for i in range(5)])
+    client = app.test_client()
+
+    plain = client.get("/jobs/").get_json()
+    response = client.get("/jobs/?stream=ndjson")
+    assert response.mimetype == "application/x-ndjson"
+    assert [json.loads(line) for line in response.get_data(as_text=True).splitlines()] == plain
+    assert len(plain) == 5
+
+    assert json.loads(client.get("/jobs/?stream=json").get_data(as_text=True)) == plain
+    accept = client.get("/jobs/", headers={"Accept": "application/x-ndjson"})
+    assert accept.mimetype == "application/x-ndjson"
+
+
+def test_stream_keeps_the_ranked_order_and_selected_fields(make_app):
+    app = make_app(STREAM_BATCH_SIZE=2)
+    seed_jobs(app, ["Python Developer", "Designer", "Python", "Python Python Lead"])
+    client = app.test_client()
+
+    ranked = [job["id"] for job in client.get("/jobs/?q=python").get_json()]
+    lines = client.get("/jobs/?q=python&stream=ndjson&fields=id,title").get_data(as_text=True).splitlines()
+    records = [json.loads(line) for line in lines]
+    assert [record["id"] for record in records] == ranked
+    assert sorted(ranked) == [1, 3, 4]
+    assert all(set(record) == {"id", "title"} for record in records)
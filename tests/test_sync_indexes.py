@@ -0,0 +1,51 @@
+from sqlalchemy import inspect, text
+
+from models import db, Application, Job, User
+
+
+def old_database_with_duplicates():
+    # An applications table from before the unique (user_id, job_id) index, holding a
+    # duplicate application
+    db.session.execute(text("DROP INDEX uq_applications_user_job"))
+    db.session.add_all([
+        User(id=1, email="employer@example.com", password="x", role="employer"),
+        User(id=2, email="seeker@example.com", password="x", role="seeker"),
+        Job(id=1, title="Python Developer", description="python", location="Remote", employer_id=1),
+    ])
+    db.session.add_all([Application(id=i, user_id=2, job_id=1, status="pending") for i in (1, 2, 3)])
+    db.session.commit()
+
+
+def unique_indexes():
+    return {index["name"] for index in inspect(db.engine).get_indexes("applications") if index["unique"]}
+
+
+def test_reports_duplicates_and_changes_nothing(app):
+    with app.app_context():
+        old_database_with_duplicates()
+        result = app.test_cli_runner().invoke(args=["sync-indexes"])
+
+        assert result.exit_code == 1
+        assert "uq_applications_user_job: 2 duplicate rows in 1 groups of (user_id, job_id)" in result.output
+        assert "--dedupe" in result.output
+        assert db.session.query(Application).count() == 3
+        assert "uq_applications_user_job" not in unique_indexes()
+
+
+def test_dedupe_keeps_the_oldest_row(app):
+    with app.app_context():
+        old_database_with_duplicates()
+        result = app.test_cli_runner().invoke(args=["sync-indexes", "--dedupe"])
+
+        assert result.exit_code == 0, result.output
+        assert "Removed 2 duplicate rows" in result.output
+        assert [row.id for row in db.session.query(Application)] == [1]
+        assert "uq_applications_user_job" in unique_indexes()
+
+
+def test_up_to_date_database_is_left_alone(app):
+    with app.app_context():
+        result = app.test_cli_runner().invoke(args=["sync-indexes"])
+
+    assert result.exit_code == 0, result.output
+    assert "Created 0 columns/indexes" in result.output